@@ -1,6 +1,6 @@
 from fastapi import APIRouter
 
-from app.api.api_v1.endpoints import auth, users, employments, verification_codes, access_logs
+from app.api.api_v1.endpoints import auth, users, employments, verification_codes, access_logs, api_keys, maintenance
 
 api_router = APIRouter()
 
@@ -10,3 +10,5 @@ api_router.include_router(users.router, prefix="/users", tags=["users"])
 api_router.include_router(employments.router, prefix="/employments", tags=["employments"])
 api_router.include_router(verification_codes.router, prefix="/verification-codes", tags=["verification-codes"])
 api_router.include_router(access_logs.router, prefix="/access-logs", tags=["access-logs"])
+api_router.include_router(api_keys.router, prefix="/api-keys", tags=["api-keys"])
+api_router.include_router(maintenance.router, prefix="/maintenance", tags=["maintenance"])
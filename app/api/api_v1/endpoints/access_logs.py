@@ -1,12 +1,24 @@
-from typing import Any, List
-from fastapi import APIRouter, Depends, HTTPException
+from datetime import datetime, timedelta, timezone
+from typing import Any, List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 
 from app.api import deps
+from app.core.config import settings
+from app.core.pubsub import pubsub
 from app.db.session import get_db
-from app.models.user import User, UserType
-from app.schemas.access_log import AccessLog, AccessLogWithDetails
+from app.models.user import UserType
+from app.schemas.user import UserPrincipal
+from app.schemas.access_log import (
+    AccessHistogram,
+    AccessLog,
+    AccessLogWithDetails,
+    AccessStats,
+    ApprovalEvents,
+)
 from app.crud import crud_access_log
+from app.crud.crud_access_log import approval_decisions_channel, approval_requests_channel
+from app.utils.time_buckets import BUCKETS, bucket_starts
 
 router = APIRouter()
 
@@ -14,7 +26,7 @@ router = APIRouter()
 @router.get("/", response_model=List[AccessLogWithDetails])
 def read_access_logs(
     db: Session = Depends(get_db),
-    current_user: User = Depends(deps.get_current_user),
+    current_user: UserPrincipal = Depends(deps.get_current_user),
     skip: int = 0,
     limit: int = 100,
 ) -> Any:
@@ -35,12 +47,123 @@ def read_access_logs(
     return logs
 
 
+@router.get("/stats", response_model=AccessStats)
+def read_access_stats(
+    db: Session = Depends(get_db),
+    current_user: UserPrincipal = Depends(deps.get_current_user),
+) -> Any:
+    """Get access statistics for current user"""
+    if current_user.user_type == UserType.EMPLOYEE:
+        return crud_access_log.get_access_stats(db, employee_id=current_user.id)
+    elif current_user.user_type == UserType.EMPLOYER:
+        return crud_access_log.get_access_stats(db, employer_id=current_user.id)
+    else:
+        raise HTTPException(status_code=403, detail="Invalid user type")
+
+
+@router.get("/histogram", response_model=AccessHistogram)
+def read_access_histogram(
+    db: Session = Depends(get_db),
+    current_user: UserPrincipal = Depends(deps.get_current_user),
+    bucket: str = Query("day", pattern=f"^({'|'.join(BUCKETS)})$"),
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+) -> Any:
+    """
+    Get the current user's access log counts per hour, day, week or month
+    (UTC), from the bucket holding `start` (default: 30 days before `end`)
+    through the one holding `end` (default: now)
+    """
+    end = end or datetime.now(timezone.utc)
+    start = start or end - timedelta(days=30)
+    try:
+        # Ranges snap to whole buckets, so repeated calls share cached buckets
+        starts, end = bucket_starts(start, end, bucket, settings.ACCESS_HISTOGRAM_MAX_BUCKETS)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    if current_user.user_type == UserType.EMPLOYEE:
+        return crud_access_log.get_access_histogram(
+            db, bucket=bucket, starts=starts, end=end, employee_id=current_user.id
+        )
+    elif current_user.user_type == UserType.EMPLOYER:
+        return crud_access_log.get_access_histogram(
+            db, bucket=bucket, starts=starts, end=end, employer_id=current_user.id
+        )
+    else:
+        raise HTTPException(status_code=403, detail="Invalid user type")
+
+
+@router.get("/pending", response_model=List[AccessLog])
+def read_pending_approvals(
+    db: Session = Depends(get_db),
+    current_user: UserPrincipal = Depends(deps.get_current_user),
+    skip: int = 0,
+    limit: int = 100,
+) -> Any:
+    """Get access requests waiting for the current employee's approval"""
+    if current_user.user_type != UserType.EMPLOYEE:
+        raise HTTPException(
+            status_code=403, 
+            detail="Only employees can approve access requests"
+        )
+    
+    return crud_access_log.get_pending_approvals(
+        db, employee_id=current_user.id, skip=skip, limit=limit
+    )
+
+
+@router.get("/pending/events", response_model=ApprovalEvents)
+async def wait_for_approval_requests(
+    since: Optional[int] = None,
+    timeout: float = Query(25, ge=0, le=settings.APPROVAL_LONG_POLL_MAX_SECONDS),
+    current_user: UserPrincipal = Depends(deps.get_long_poll_user),
+) -> Any:
+    """
+    Long-poll for new access requests needing the current employee's
+    approval. Pass the returned cursor as `since` on the next call.
+    """
+    if current_user.user_type != UserType.EMPLOYEE:
+        raise HTTPException(
+            status_code=403, 
+            detail="Only employees can approve access requests"
+        )
+    
+    events, cursor = await pubsub.wait(
+        approval_requests_channel(current_user.id), since, timeout
+    )
+    return ApprovalEvents(events=events, cursor=cursor)
+
+
+@router.get("/decisions/events", response_model=ApprovalEvents)
+async def wait_for_approval_decisions(
+    since: Optional[int] = None,
+    timeout: float = Query(25, ge=0, le=settings.APPROVAL_LONG_POLL_MAX_SECONDS),
+    current_user: UserPrincipal = Depends(deps.get_long_poll_verifier),
+) -> Any:
+    """
+    Long-poll for decisions on the current employer's pending requests;
+    approvals carry the shared data. Pass the returned cursor as `since`
+    on the next call.
+    """
+    if current_user.user_type != UserType.EMPLOYER:
+        raise HTTPException(
+            status_code=403, 
+            detail="Only employers can wait for approval decisions"
+        )
+    
+    events, cursor = await pubsub.wait(
+        approval_decisions_channel(current_user.id), since, timeout
+    )
+    return ApprovalEvents(events=events, cursor=cursor)
+
+
 @router.get("/{log_id}", response_model=AccessLogWithDetails)
 def read_access_log(
     *,
     db: Session = Depends(get_db),
     log_id: int,
-    current_user: User = Depends(deps.get_current_user),
+    current_user: UserPrincipal = Depends(deps.get_current_user),
 ) -> Any:
     """Get access log by ID"""
     log = crud_access_log.get_with_details(db, id=log_id)
@@ -50,8 +173,12 @@ def read_access_log(
     # Check permissions
     can_access = False
     if current_user.user_type == UserType.EMPLOYEE:
-        # Check if this log is for the employee's verification code
-        can_access = log.verification_code.employee_id == current_user.id
+        # Check if this log is for the employee's verification code (logs
+        # of unknown codes belong to no employee)
+        can_access = (
+            log.verification_code is not None
+            and log.verification_code.employee_id == current_user.id
+        )
     elif current_user.user_type == UserType.EMPLOYER:
         # Check if this log is for the employer's request
         can_access = log.employer_id == current_user.id
@@ -70,7 +197,7 @@ def read_access_logs_by_code(
     *,
     db: Session = Depends(get_db),
     code_id: int,
-    current_user: User = Depends(deps.get_current_user),
+    current_user: UserPrincipal = Depends(deps.get_current_user),
     skip: int = 0,
     limit: int = 100,
 ) -> Any:
@@ -97,7 +224,7 @@ def approve_access_request(
     *,
     db: Session = Depends(get_db),
     log_id: int,
-    current_user: User = Depends(deps.get_current_user),
+    current_user: UserPrincipal = Depends(deps.get_current_user),
 ) -> Any:
     """Approve an access request (for approval workflows)"""
     if current_user.user_type != UserType.EMPLOYEE:
@@ -111,12 +238,18 @@ def approve_access_request(
         raise HTTPException(status_code=404, detail="Access log not found")
     
     # Check if this is the employee's verification code
-    if log.verification_code.employee_id != current_user.id:
+    if log.verification_code is None or log.verification_code.employee_id != current_user.id:
         raise HTTPException(
             status_code=403, 
             detail="Not enough permissions"
         )
     
+    if log.approval_status != "pending":
+        raise HTTPException(
+            status_code=400, 
+            detail="Access request is not pending approval"
+        )
+    
     log = crud_access_log.approve_request(db, log_id=log_id, approver_id=current_user.id)
     return {"message": "Access request approved"}
 
@@ -126,7 +259,7 @@ def deny_access_request(
     *,
     db: Session = Depends(get_db),
     log_id: int,
-    current_user: User = Depends(deps.get_current_user),
+    current_user: UserPrincipal = Depends(deps.get_current_user),
 ) -> Any:
     """Deny an access request (for approval workflows)"""
     if current_user.user_type != UserType.EMPLOYEE:
@@ -140,11 +273,17 @@ def deny_access_request(
         raise HTTPException(status_code=404, detail="Access log not found")
     
     # Check if this is the employee's verification code
-    if log.verification_code.employee_id != current_user.id:
+    if log.verification_code is None or log.verification_code.employee_id != current_user.id:
         raise HTTPException(
             status_code=403, 
             detail="Not enough permissions"
         )
     
+    if log.approval_status != "pending":
+        raise HTTPException(
+            status_code=400, 
+            detail="Access request is not pending approval"
+        )
+    
     log = crud_access_log.deny_request(db, log_id=log_id, approver_id=current_user.id)
     return {"message": "Access request denied"}
@@ -0,0 +1,72 @@
+from typing import Any, List
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+
+from app.api import deps
+from app.db.session import get_db
+from app.models.api_key import API_KEY_SCOPES
+from app.schemas.api_key import ApiKey, ApiKeyCreate, ApiKeyCreated
+from app.schemas.user import UserPrincipal
+from app.crud import crud_api_key
+
+router = APIRouter()
+
+
+@router.get("/", response_model=List[ApiKey])
+def read_api_keys(
+    db: Session = Depends(get_db),
+    current_user: UserPrincipal = Depends(deps.get_current_employer),
+    skip: int = 0,
+    limit: int = 100,
+) -> Any:
+    """Get API keys for current employer"""
+    return crud_api_key.get_multi_by_user(
+        db, user_id=current_user.id, skip=skip, limit=limit
+    )
+
+
+@router.post("/", response_model=ApiKeyCreated)
+def create_api_key(
+    *,
+    db: Session = Depends(get_db),
+    key_in: ApiKeyCreate,
+    current_user: UserPrincipal = Depends(deps.get_current_employer),
+) -> Any:
+    """Create a new API key for machine-to-machine verification"""
+    unknown_scopes = set(key_in.scopes) - API_KEY_SCOPES
+    if unknown_scopes or not key_in.scopes:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Scopes must be a non-empty subset of {sorted(API_KEY_SCOPES)}"
+        )
+    
+    api_key, key = crud_api_key.create_for_user(
+        db, obj_in=key_in, user_id=current_user.id
+    )
+    return ApiKeyCreated(
+        **ApiKey.model_validate(api_key, from_attributes=True).model_dump(),
+        key=key,
+    )
+
+
+@router.delete("/{key_id}")
+def revoke_api_key(
+    *,
+    db: Session = Depends(get_db),
+    key_id: int,
+    current_user: UserPrincipal = Depends(deps.get_current_employer),
+) -> Any:
+    """Revoke an API key"""
+    api_key = crud_api_key.get(db, id=key_id)
+    if not api_key:
+        raise HTTPException(status_code=404, detail="API key not found")
+    
+    # Check if user owns this key
+    if api_key.user_id != current_user.id:
+        raise HTTPException(
+            status_code=403, 
+            detail="Not enough permissions"
+        )
+    
+    crud_api_key.revoke(db, api_key=api_key)
+    return {"message": "API key revoked successfully"}
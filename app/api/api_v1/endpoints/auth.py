@@ -1,29 +1,29 @@
-from typing import Any
+from typing import Any, Optional
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
-from datetime import timedelta
+from starlette.concurrency import run_in_threadpool
+from datetime import datetime, timedelta
 
 from app.api import deps
 from app.core import security
 from app.core.config import settings
 from app.db.session import get_db
-from app.models.user import User
-from app.schemas.user import Token, UserLogin, UserCreate, User as UserSchema
-from app.crud import crud_user
+from app.schemas.user import Token, UserLogin, UserCreate, UserPrincipal, LogoutRequest, User as UserSchema
+from app.crud import crud_user, crud_revoked_token
 
 router = APIRouter()
 
 
 @router.post("/register", response_model=Token)
-def register(
+async def register(
     *,
     db: Session = Depends(get_db),
     user_in: UserCreate,
 ) -> Any:
     """Register a new user"""
     # Check if user already exists
-    user = crud_user.get_by_email(db, email=user_in.email)
+    user = await run_in_threadpool(crud_user.get_by_email, db, email=user_in.email)
     if user:
         raise HTTPException(
             status_code=400,
@@ -31,7 +31,7 @@ def register(
         )
     
     # Create new user
-    user = crud_user.create(db, obj_in=user_in)
+    user = await crud_user.create(db, obj_in=user_in)
     
     # Create access token for the new user (auto-login)
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
@@ -40,7 +40,7 @@ def register(
     )
     refresh_token = security.create_refresh_token(user.id)
     
-    # Update last login
+    # Update last login (buffered, written in the background)
     crud_user.update_last_login(db, user=user)
     
     return {
@@ -51,12 +51,12 @@ def register(
 
 
 @router.post("/login", response_model=Token)
-def login_for_access_token(
+async def login_for_access_token(
     db: Session = Depends(get_db), 
     form_data: OAuth2PasswordRequestForm = Depends()
 ) -> Any:
     """OAuth2 compatible token login, get an access token for future requests"""
-    user = crud_user.authenticate(
+    user = await crud_user.authenticate(
         db, email=form_data.username, password=form_data.password
     )
     if not user:
@@ -77,7 +77,7 @@ def login_for_access_token(
     )
     refresh_token = security.create_refresh_token(user.id)
     
-    # Update last login
+    # Update last login (buffered, written in the background)
     crud_user.update_last_login(db, user=user)
     
     return {
@@ -91,7 +91,7 @@ def login_for_access_token(
 def refresh_token(
     *,
     db: Session = Depends(get_db),
-    current_user: User = Depends(deps.get_current_user)
+    current_user: UserPrincipal = Depends(deps.get_current_user)
 ) -> Any:
     """Get a new access token using refresh token"""
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
@@ -109,15 +109,37 @@ def refresh_token(
 
 @router.post("/logout")
 def logout(
-    current_user: User = Depends(deps.get_current_user)
+    *,
+    db: Session = Depends(get_db),
+    token: str = Depends(deps.oauth2_scheme),
+    logout_in: Optional[LogoutRequest] = None,
+    current_user: UserPrincipal = Depends(deps.get_current_user)
 ) -> Any:
-    """Logout user (invalidate tokens on client side)"""
+    """Logout user by revoking the presented token (and refresh token, if given)"""
+    tokens = [token]
+    if logout_in and logout_in.refresh_token:
+        tokens.append(logout_in.refresh_token)
+    
+    for raw_token in tokens:
+        payload = security.decode_token(raw_token)
+        if not payload or not payload.get("jti"):
+            continue
+        if payload.get("sub") != str(current_user.id):
+            continue
+        crud_revoked_token.revoke(
+            db,
+            jti=payload["jti"],
+            user_id=current_user.id,
+            expires_at=datetime.utcfromtimestamp(payload["exp"]),
+        )
+    
     return {"message": "Successfully logged out"}
 
 
 @router.get("/me", response_model=UserSchema)
 def read_users_me(
-    current_user: User = Depends(deps.get_current_user)
+    db: Session = Depends(get_db),
+    current_user: UserPrincipal = Depends(deps.get_current_user)
 ) -> Any:
     """Get current user"""
-    return current_user
+    return crud_user.get(db, id=current_user.id)
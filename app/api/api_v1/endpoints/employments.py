@@ -4,7 +4,8 @@ from sqlalchemy.orm import Session
 
 from app.api import deps
 from app.db.session import get_db
-from app.models.user import User, UserType
+from app.models.user import UserType
+from app.schemas.user import UserPrincipal
 from app.schemas.employment import Employment, EmploymentCreate, EmploymentUpdate, EmploymentWithCodes
 from app.crud import crud_employment
 
@@ -14,7 +15,7 @@ router = APIRouter()
 @router.get("/", response_model=List[EmploymentWithCodes])
 def read_employments(
     db: Session = Depends(get_db),
-    current_user: User = Depends(deps.get_current_user),
+    current_user: UserPrincipal = Depends(deps.get_current_user),
     skip: int = 0,
     limit: int = 100,
 ) -> Any:
@@ -36,7 +37,7 @@ def create_employment(
     *,
     db: Session = Depends(get_db),
     employment_in: EmploymentCreate,
-    current_user: User = Depends(deps.get_current_user),
+    current_user: UserPrincipal = Depends(deps.get_current_user),
 ) -> Any:
     """Create new employment record"""
     if current_user.user_type != UserType.EMPLOYEE:
@@ -56,7 +57,7 @@ def read_employment(
     *,
     db: Session = Depends(get_db),
     employment_id: int,
-    current_user: User = Depends(deps.get_current_user),
+    current_user: UserPrincipal = Depends(deps.get_current_user),
 ) -> Any:
     """Get employment by ID"""
     employment = crud_employment.get(db, id=employment_id)
@@ -79,7 +80,7 @@ def update_employment(
     db: Session = Depends(get_db),
     employment_id: int,
     employment_in: EmploymentUpdate,
-    current_user: User = Depends(deps.get_current_user),
+    current_user: UserPrincipal = Depends(deps.get_current_user),
 ) -> Any:
     """Update employment record"""
     employment = crud_employment.get(db, id=employment_id)
@@ -102,7 +103,7 @@ def delete_employment(
     *,
     db: Session = Depends(get_db),
     employment_id: int,
-    current_user: User = Depends(deps.get_current_user),
+    current_user: UserPrincipal = Depends(deps.get_current_user),
 ) -> Any:
     """Delete employment record"""
     employment = crud_employment.get(db, id=employment_id)
@@ -125,7 +126,7 @@ def set_current_employment(
     *,
     db: Session = Depends(get_db),
     employment_id: int,
-    current_user: User = Depends(deps.get_current_user),
+    current_user: UserPrincipal = Depends(deps.get_current_user),
 ) -> Any:
     """Set employment as current job"""
     employment = crud_employment.get(db, id=employment_id)
@@ -0,0 +1,17 @@
+from typing import Any
+from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session
+
+from app.api import deps
+from app.db.session import get_db
+from app.crud import crud_verification_code
+
+router = APIRouter(dependencies=[Depends(deps.verify_maintenance_token)])
+
+
+@router.post("/verification-code-filter/rebuild")
+def rebuild_verification_code_filter(
+    db: Session = Depends(get_db),
+) -> Any:
+    """Rebuild the live-code filter of the worker serving this request"""
+    return crud_verification_code.load_live_codes(db)
@@ -4,8 +4,7 @@ from sqlalchemy.orm import Session
 
 from app.api import deps
 from app.db.session import get_db
-from app.models.user import User
-from app.schemas.user import User as UserSchema, UserUpdate
+from app.schemas.user import User as UserSchema, UserPrincipal, UserUpdate
 from app.crud import crud_user
 
 router = APIRouter()
@@ -13,10 +12,11 @@ router = APIRouter()
 
 @router.get("/me", response_model=UserSchema)
 def read_user_me(
-    current_user: User = Depends(deps.get_current_user),
+    db: Session = Depends(get_db),
+    current_user: UserPrincipal = Depends(deps.get_current_user),
 ) -> Any:
     """Get current user"""
-    return current_user
+    return crud_user.get(db, id=current_user.id)
 
 
 @router.put("/me", response_model=UserSchema)
@@ -24,10 +24,11 @@ def update_user_me(
     *,
     db: Session = Depends(get_db),
     user_in: UserUpdate,
-    current_user: User = Depends(deps.get_current_user),
+    current_user: UserPrincipal = Depends(deps.get_current_user),
 ) -> Any:
     """Update current user"""
-    user = crud_user.update(db, db_obj=current_user, obj_in=user_in)
+    user = crud_user.get(db, id=current_user.id)
+    user = crud_user.update(db, db_obj=user, obj_in=user_in)
     return user
 
 
@@ -36,7 +37,7 @@ def read_user(
     *,
     db: Session = Depends(get_db),
     user_id: int,
-    current_user: User = Depends(deps.get_current_user),
+    current_user: UserPrincipal = Depends(deps.get_current_user),
 ) -> Any:
     """Get user by ID (limited info for privacy)"""
     user = crud_user.get(db, id=user_id)
@@ -60,7 +61,7 @@ def read_user(
 def delete_user_me(
     *,
     db: Session = Depends(get_db),
-    current_user: User = Depends(deps.get_current_user),
+    current_user: UserPrincipal = Depends(deps.get_current_user),
 ) -> Any:
     """Delete current user account"""
     crud_user.remove(db, id=current_user.id)
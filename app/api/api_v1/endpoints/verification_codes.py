@@ -1,14 +1,22 @@
+import time
+from datetime import datetime
 from typing import Any, List
-from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from sqlalchemy.orm import Session
 
 from app.api import deps
+from app.core.config import settings
+from app.core.security import decode_verification_receipt
 from app.db.session import get_db
-from app.models.user import User, UserType
+from app.models.user import UserType
+from app.schemas.user import UserPrincipal
 from app.schemas.verification_code import (
+    BatchVerificationRequest,
+    BatchVerificationResponse,
     VerificationCode, 
     VerificationCodeCreate, 
     VerificationCodeUpdate,
+    VerificationReceipt,
     VerificationRequest,
     VerificationResponse
 )
@@ -20,7 +28,7 @@ router = APIRouter()
 @router.get("/", response_model=List[VerificationCode])
 def read_verification_codes(
     db: Session = Depends(get_db),
-    current_user: User = Depends(deps.get_current_user),
+    current_user: UserPrincipal = Depends(deps.get_current_user),
     skip: int = 0,
     limit: int = 100,
 ) -> Any:
@@ -42,7 +50,7 @@ def create_verification_code(
     *,
     db: Session = Depends(get_db),
     code_in: VerificationCodeCreate,
-    current_user: User = Depends(deps.get_current_user),
+    current_user: UserPrincipal = Depends(deps.get_current_user),
 ) -> Any:
     """Create new verification code"""
     if current_user.user_type != UserType.EMPLOYEE:
@@ -57,12 +65,38 @@ def create_verification_code(
     return code
 
 
+@router.get("/receipts/{receipt}", response_model=VerificationReceipt)
+def read_verification_receipt(
+    *,
+    receipt: str,
+    response: Response,
+) -> Any:
+    """
+    Check a receipt returned by a successful verification. Answered from the
+    signature alone, so responses may be cached until the receipt expires.
+    """
+    claims = decode_verification_receipt(receipt)
+    if claims is None:
+        raise HTTPException(status_code=404, detail="Receipt not found or expired")
+    
+    max_age = max(0, int(claims["exp"] - time.time()))
+    response.headers["Cache-Control"] = f"public, max-age={max_age}, immutable"
+    return VerificationReceipt(
+        verification_code_id=claims["cid"],
+        employer_id=claims["eid"],
+        employee_name=claims.get("name"),
+        data=claims["data"],
+        verification_date=datetime.utcfromtimestamp(claims["iat"]),
+        expires_at=datetime.utcfromtimestamp(claims["exp"]),
+    )
+
+
 @router.get("/{code_id}", response_model=VerificationCode)
 def read_verification_code(
     *,
     db: Session = Depends(get_db),
     code_id: int,
-    current_user: User = Depends(deps.get_current_user),
+    current_user: UserPrincipal = Depends(deps.get_current_user),
 ) -> Any:
     """Get verification code by ID"""
     code = crud_verification_code.get(db, id=code_id)
@@ -85,7 +119,7 @@ def update_verification_code(
     db: Session = Depends(get_db),
     code_id: int,
     code_in: VerificationCodeUpdate,
-    current_user: User = Depends(deps.get_current_user),
+    current_user: UserPrincipal = Depends(deps.get_current_user),
 ) -> Any:
     """Update verification code"""
     code = crud_verification_code.get(db, id=code_id)
@@ -108,7 +142,7 @@ def delete_verification_code(
     *,
     db: Session = Depends(get_db),
     code_id: int,
-    current_user: User = Depends(deps.get_current_user),
+    current_user: UserPrincipal = Depends(deps.get_current_user),
 ) -> Any:
     """Delete verification code"""
     code = crud_verification_code.get(db, id=code_id)
@@ -131,7 +165,7 @@ def revoke_verification_code(
     *,
     db: Session = Depends(get_db),
     code_id: int,
-    current_user: User = Depends(deps.get_current_user),
+    current_user: UserPrincipal = Depends(deps.get_current_user),
 ) -> Any:
     """Revoke verification code"""
     code = crud_verification_code.get(db, id=code_id)
@@ -155,9 +189,9 @@ def verify_employment(
     db: Session = Depends(get_db),
     request: Request,
     verification_request: VerificationRequest,
-    current_user: User = Depends(deps.get_current_user),
+    current_user: UserPrincipal = Depends(deps.get_current_verifier),
 ) -> Any:
-    """Verify employment using verification code"""
+    """Verify employment using verification code (bearer token or X-API-Key)"""
     if current_user.user_type != UserType.EMPLOYER:
         raise HTTPException(
             status_code=403, 
@@ -178,3 +212,35 @@ def verify_employment(
     )
     
     return result
+
+
+@router.post("/verify-batch", response_model=BatchVerificationResponse)
+def verify_employment_batch(
+    *,
+    db: Session = Depends(get_db),
+    request: Request,
+    verification_request: BatchVerificationRequest,
+    current_user: UserPrincipal = Depends(deps.get_current_verifier),
+) -> Any:
+    """Verify up to VERIFICATION_BATCH_MAX_CODES codes; results follow input order"""
+    if current_user.user_type != UserType.EMPLOYER:
+        raise HTTPException(
+            status_code=403, 
+            detail="Only employers can verify employment"
+        )
+    if not 0 < len(verification_request.codes) <= settings.VERIFICATION_BATCH_MAX_CODES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Provide between 1 and {settings.VERIFICATION_BATCH_MAX_CODES} codes"
+        )
+    
+    results = crud_verification_code.verify_codes(
+        db,
+        codes=verification_request.codes,
+        employer_id=current_user.id,
+        ip_address=request.client.host,
+        user_agent=request.headers.get("user-agent", ""),
+        request_purpose=verification_request.purpose
+    )
+    
+    return BatchVerificationResponse(results=results)
@@ -1,24 +1,29 @@
+import hmac
 from typing import Generator, Optional
 from fastapi import Depends, HTTPException, status
-from fastapi.security import OAuth2PasswordBearer
-from jose import jwt, JWTError
+from fastapi.security import APIKeyHeader, OAuth2PasswordBearer
 from sqlalchemy.orm import Session
 
 from app.core import security
 from app.core.config import settings
-from app.db.session import get_db
-from app.models.user import User
-from app.crud import crud_user
+from app.db.session import SessionLocal, get_db
+from app.schemas.user import UserPrincipal
+from app.crud import crud_user, crud_revoked_token, crud_api_key
 
 oauth2_scheme = OAuth2PasswordBearer(
     tokenUrl=f"{settings.API_V1_STR}/auth/login"
 )
+optional_oauth2_scheme = OAuth2PasswordBearer(
+    tokenUrl=f"{settings.API_V1_STR}/auth/login", auto_error=False
+)
+api_key_header = APIKeyHeader(name="X-API-Key", auto_error=False)
+maintenance_token_header = APIKeyHeader(name="X-Maintenance-Token", auto_error=False)
 
 
 def get_current_user(
     db: Session = Depends(get_db), 
     token: str = Depends(oauth2_scheme)
-) -> User:
+) -> UserPrincipal:
     """Get current authenticated user"""
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -26,17 +31,18 @@ def get_current_user(
         headers={"WWW-Authenticate": "Bearer"},
     )
     
-    try:
-        payload = jwt.decode(
-            token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
-        )
-        user_id: str = payload.get("sub")
-        if user_id is None:
-            raise credentials_exception
-    except JWTError:
+    payload = security.decode_token(token)
+    if payload is None:
+        raise credentials_exception
+    user_id: str = payload.get("sub")
+    if user_id is None:
+        raise credentials_exception
+    
+    jti = payload.get("jti")
+    if jti and crud_revoked_token.is_revoked(db, jti=jti):
         raise credentials_exception
     
-    user = crud_user.get(db, id=int(user_id))
+    user = crud_user.get_principal(db, id=int(user_id))
     if user is None:
         raise credentials_exception
     
@@ -44,8 +50,8 @@ def get_current_user(
 
 
 def get_current_active_user(
-    current_user: User = Depends(get_current_user),
-) -> User:
+    current_user: UserPrincipal = Depends(get_current_user),
+) -> UserPrincipal:
     """Get current active user"""
     if not current_user.is_active:
         raise HTTPException(status_code=400, detail="Inactive user")
@@ -53,8 +59,8 @@ def get_current_active_user(
 
 
 def get_current_employee(
-    current_user: User = Depends(get_current_active_user),
-) -> User:
+    current_user: UserPrincipal = Depends(get_current_active_user),
+) -> UserPrincipal:
     """Get current user if they are an employee"""
     if current_user.user_type != "employee":
         raise HTTPException(
@@ -64,11 +70,72 @@ def get_current_employee(
 
 
 def get_current_employer(
-    current_user: User = Depends(get_current_active_user),
-) -> User:
+    current_user: UserPrincipal = Depends(get_current_active_user),
+) -> UserPrincipal:
     """Get current user if they are an employer"""
     if current_user.user_type != "employer":
         raise HTTPException(
             status_code=400, detail="The user must be an employer"
         )
     return current_user
+
+
+def get_current_verifier(
+    db: Session = Depends(get_db),
+    api_key: Optional[str] = Depends(api_key_header),
+    token: Optional[str] = Depends(optional_oauth2_scheme),
+) -> UserPrincipal:
+    """Get the caller of a verification endpoint from an API key or bearer token"""
+    if api_key:
+        principal = crud_api_key.authenticate(db, key=api_key, scope="verify")
+        if principal is None:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Invalid API key",
+            )
+    elif token:
+        principal = get_current_user(db, token)
+    else:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    
+    return get_current_active_user(principal)
+
+
+def get_long_poll_user(token: str = Depends(oauth2_scheme)) -> UserPrincipal:
+    """
+    get_current_user for long-poll endpoints: authenticates on a session
+    closed before returning, so waiting requests hold no connection
+    """
+    db = SessionLocal()
+    try:
+        return get_current_user(db, token)
+    finally:
+        db.close()
+
+
+def get_long_poll_verifier(
+    api_key: Optional[str] = Depends(api_key_header),
+    token: Optional[str] = Depends(optional_oauth2_scheme),
+) -> UserPrincipal:
+    """get_current_verifier on a session closed before returning"""
+    db = SessionLocal()
+    try:
+        return get_current_verifier(db, api_key, token)
+    finally:
+        db.close()
+
+
+def verify_maintenance_token(
+    token: Optional[str] = Depends(maintenance_token_header),
+) -> None:
+    """Guard operational endpoints with the MAINTENANCE_TOKEN shared secret"""
+    expected = settings.MAINTENANCE_TOKEN
+    if not expected or not token or not hmac.compare_digest(token, expected):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Invalid maintenance token",
+        )
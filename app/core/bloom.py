@@ -0,0 +1,119 @@
+import hashlib
+import math
+import threading
+from typing import Tuple, Union
+
+Item = Union[str, bytes, int]
+
+
+def _to_bytes(item: Item) -> bytes:
+    if isinstance(item, bytes):
+        return item
+    if isinstance(item, int):
+        return item.to_bytes(8, "big", signed=True)
+    return item.encode()
+
+
+class BloomFilter:
+    """
+    Fixed-size Bloom filter. Membership tests never give false negatives;
+    false positives happen at roughly `error_rate` once `capacity` items
+    have been added.
+    """
+
+    def __init__(self, capacity: int, error_rate: float):
+        self.capacity = max(capacity, 1)
+        self.error_rate = error_rate
+        self.num_bits = max(
+            8, int(-self.capacity * math.log(error_rate) / (math.log(2) ** 2))
+        )
+        self.num_hashes = max(1, round(self.num_bits / self.capacity * math.log(2)))
+        self.count = 0
+        self._bits = self._new_storage()
+        self._lock = threading.Lock()
+
+    def _new_storage(self) -> bytearray:
+        return bytearray((self.num_bits + 7) // 8)
+
+    def _hashes(self, item: Item) -> Tuple[int, int]:
+        digest = hashlib.blake2b(_to_bytes(item), digest_size=16).digest()
+        return int.from_bytes(digest[:8], "big"), int.from_bytes(digest[8:], "big") | 1
+
+    def _positions(self, item: Item):
+        h1, h2 = self._hashes(item)
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % self.num_bits
+
+    def add(self, item: Item) -> None:
+        with self._lock:
+            for position in self._positions(item):
+                self._bits[position >> 3] |= 1 << (position & 7)
+            self.count += 1
+
+    def __contains__(self, item: Item) -> bool:
+        bits = self._bits
+        return all(
+            bits[position >> 3] & (1 << (position & 7))
+            for position in self._positions(item)
+        )
+
+    @property
+    def estimated_error_rate(self) -> float:
+        """False-positive rate expected at the current fill"""
+        fill = 1 - math.exp(-self.num_hashes * self.count / self.num_bits)
+        return fill ** self.num_hashes
+
+    @property
+    def is_saturated(self) -> bool:
+        return self.count > self.capacity
+
+    @property
+    def memory_bytes(self) -> int:
+        return len(self._bits)
+
+    def stats(self) -> dict:
+        return {
+            "count": self.count,
+            "capacity": self.capacity,
+            "error_rate": self.error_rate,
+            "num_hashes": self.num_hashes,
+            "memory_bytes": self.memory_bytes,
+            "estimated_error_rate": self.estimated_error_rate,
+        }
+
+
+class CountingBloomFilter(BloomFilter):
+    """
+    Bloom filter with a byte-wide counter per position, so items can be
+    removed. Removing an item that was never added can cause false
+    negatives, so callers must only remove what they added. Counters stick
+    at 255 rather than wrap.
+    """
+
+    def _new_storage(self) -> bytearray:
+        return bytearray(self.num_bits)
+
+    def add(self, item: Item) -> None:
+        with self._lock:
+            counters = self._bits
+            for position in self._positions(item):
+                if counters[position] < 255:
+                    counters[position] += 1
+            self.count += 1
+
+    def remove(self, item: Item) -> bool:
+        """Remove an added item; returns False if it was not present"""
+        with self._lock:
+            counters = self._bits
+            positions = list(self._positions(item))
+            if not all(counters[position] for position in positions):
+                return False
+            for position in positions:
+                if counters[position] < 255:
+                    counters[position] -= 1
+            self.count = max(0, self.count - 1)
+            return True
+
+    def __contains__(self, item: Item) -> bool:
+        counters = self._bits
+        return all(counters[position] for position in self._positions(item))
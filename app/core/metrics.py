@@ -0,0 +1,62 @@
+import threading
+from typing import Any, Callable, Dict
+
+
+class MetricsRegistry:
+    """Thread-safe in-process counters, gauges and timings"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: Dict[str, float] = {}
+        self._gauges: Dict[str, float] = {}
+        self._timings: Dict[str, Dict[str, float]] = {}
+        self._collectors: Dict[str, Callable[[], Dict[str, Any]]] = {}
+
+    def increment(self, name: str, value: float = 1) -> None:
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def set_gauge(self, name: str, value: float) -> None:
+        with self._lock:
+            self._gauges[name] = value
+
+    def observe(self, name: str, value: float) -> None:
+        """Record a timing (or any other sample) in seconds"""
+        with self._lock:
+            timing = self._timings.get(name)
+            if timing is None:
+                self._timings[name] = {
+                    "count": 1, "sum": value, "min": value, "max": value
+                }
+            else:
+                timing["count"] += 1
+                timing["sum"] += value
+                timing["min"] = min(timing["min"], value)
+                timing["max"] = max(timing["max"], value)
+
+    def register_collector(
+        self, name: str, collector: Callable[[], Dict[str, Any]]
+    ) -> None:
+        """Register a callable whose output is included in every snapshot"""
+        with self._lock:
+            self._collectors[name] = collector
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            counters = dict(self._counters)
+            gauges = dict(self._gauges)
+            timings = {name: dict(timing) for name, timing in self._timings.items()}
+            collectors = dict(self._collectors)
+
+        for timing in timings.values():
+            timing["avg"] = timing["sum"] / timing["count"]
+
+        return {
+            "counters": counters,
+            "gauges": gauges,
+            "timings": timings,
+            **{name: collector() for name, collector in collectors.items()},
+        }
+
+
+metrics = MetricsRegistry()
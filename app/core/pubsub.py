@@ -0,0 +1,219 @@
+import asyncio
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Any, Deque, Dict, List, Optional, Set, Tuple
+
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.core.redis_client import get_async_redis, get_redis
+
+logger = logging.getLogger(__name__)
+
+Event = Dict[str, Any]
+
+
+class MemoryPubSub:
+    """
+    In-process pub/sub for long-poll endpoints.
+
+    Each channel keeps its last PUBSUB_HISTORY events, each with an `id`
+    that increases in delivery order, so a client passing the id of the
+    last event it saw gets what it missed between polls instead of losing
+    it. Waiting costs no query; `publish` may be called from any thread.
+    """
+
+    def __init__(self, history: int, max_channels: int):
+        self.history = history
+        self.max_channels = max_channels
+        self._channels: "OrderedDict[str, Deque[Event]]" = OrderedDict()
+        self._waiters: Dict[str, Set[asyncio.Event]] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._last_id = 0
+        self._id_lock = threading.Lock()
+        self.published = 0
+        self.delivered = 0
+
+    async def start(self) -> None:
+        self._loop = asyncio.get_running_loop()
+
+    async def stop(self) -> None:
+        self._loop = None
+
+    def _next_id(self) -> int:
+        # Strictly increasing within the worker; microseconds, so ids stay
+        # comparable with RedisPubSub's if it falls back to local delivery
+        with self._id_lock:
+            self._last_id = max(self._last_id + 1, time.time_ns() // 1000)
+            return self._last_id
+
+    def publish(self, channel: str, data: Dict[str, Any]) -> None:
+        """Publish `data` on `channel`; returns without waiting for delivery"""
+        self.published += 1
+        self._dispatch(channel, {"id": self._next_id(), **data})
+
+    def _dispatch(self, channel: str, event: Event) -> None:
+        loop = self._loop
+        if loop is None:
+            self._deliver(channel, event)
+            return
+        try:
+            loop.call_soon_threadsafe(self._deliver, channel, event)
+        except RuntimeError:
+            # Loop already closed during shutdown
+            pass
+
+    def _deliver(self, channel: str, event: Event) -> None:
+        events = self._channels.get(channel)
+        if events is None:
+            events = self._channels[channel] = deque(maxlen=self.history)
+            while len(self._channels) > self.max_channels:
+                self._channels.popitem(last=False)
+        else:
+            self._channels.move_to_end(channel)
+        events.append(event)
+        self.delivered += 1
+        for waiter in self._waiters.get(channel, ()):
+            waiter.set()
+
+    def _since(self, channel: str, since: int) -> List[Event]:
+        return [event for event in self._channels.get(channel, ()) if event["id"] > since]
+
+    def cursor(self, channel: str) -> int:
+        """Id of the newest event on `channel`, 0 if none"""
+        events = self._channels.get(channel)
+        return events[-1]["id"] if events else 0
+
+    async def wait(
+        self, channel: str, since: Optional[int], timeout: float
+    ) -> Tuple[List[Event], int]:
+        """
+        Events on `channel` newer than `since` (or than now, if None),
+        waiting up to `timeout` seconds for one. Returns them with the
+        cursor to pass as `since` next time.
+        """
+        if since is None:
+            since = self.cursor(channel)
+        events = self._since(channel, since)
+        if not events and timeout > 0:
+            waiter = asyncio.Event()
+            waiters = self._waiters.setdefault(channel, set())
+            waiters.add(waiter)
+            try:
+                await asyncio.wait_for(waiter.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+            finally:
+                waiters.discard(waiter)
+                if not waiters:
+                    self._waiters.pop(channel, None)
+            events = self._since(channel, since)
+        return events, events[-1]["id"] if events else since
+
+    def stats(self) -> dict:
+        return {
+            "backend": type(self).__name__,
+            "channels": len(self._channels),
+            "waiters": sum(len(waiters) for waiters in self._waiters.values()),
+            "published": self.published,
+            "delivered": self.delivered,
+        }
+
+
+class RedisPubSub(MemoryPubSub):
+    """
+    Cross-worker pub/sub: events are published to Redis and every worker's
+    listener feeds them into its local channels, so a long-poll on any
+    worker sees events published on any other. Event ids are assigned by
+    Redis in the same script that publishes the event, so every listener
+    receives them in increasing order and a cursor never skips a late
+    event. Falls back to local delivery if Redis is unavailable.
+    """
+
+    PREFIX = "pubsub:"
+    LAST_ID_KEY = "pubsub-last-id"
+
+    # Next id: the server clock in microseconds, kept strictly increasing
+    SCRIPT = """
+    local now = redis.call('TIME')
+    local last = tonumber(redis.call('GET', KEYS[1]) or '0')
+    local id = string.format('%d', math.max(last + 1, now[1] * 1000000 + now[2]))
+    redis.call('SET', KEYS[1], id)
+    redis.call('PUBLISH', KEYS[2], id .. ' ' .. ARGV[1])
+    return id
+    """
+
+    def __init__(self, history: int, max_channels: int):
+        super().__init__(history, max_channels)
+        self._listener: Optional[asyncio.Task] = None
+        self._script = None
+
+    async def start(self) -> None:
+        await super().start()
+        self._listener = asyncio.create_task(self._listen(), name="pubsub-listener")
+
+    async def stop(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+        await super().stop()
+
+    def publish(self, channel: str, data: Dict[str, Any]) -> None:
+        self.published += 1
+        try:
+            if self._script is None:
+                self._script = get_redis().register_script(self.SCRIPT)
+            self._script(
+                keys=[self.LAST_ID_KEY, f"{self.PREFIX}{channel}"],
+                args=[json.dumps(data)],
+            )
+        except Exception as e:
+            logger.warning(f"Redis publish failed, delivering locally only: {e}")
+            metrics.increment("pubsub.publish_failures")
+            self._dispatch(channel, {"id": self._next_id(), **data})
+
+    def _receive(self, channel: str, message: bytes) -> None:
+        """Deliver a published `<id> <json>` message"""
+        event_id, _, data = message.partition(b" ")
+        event_id = int(event_id)
+        with self._id_lock:
+            # Local fallback ids continue after the ids seen from Redis
+            self._last_id = max(self._last_id, event_id)
+        self._deliver(channel, {"id": event_id, **json.loads(data)})
+
+    async def _listen(self) -> None:
+        while True:
+            pubsub = get_async_redis().pubsub()
+            try:
+                await pubsub.psubscribe(f"{self.PREFIX}*")
+                async for message in pubsub.listen():
+                    if message["type"] != "pmessage":
+                        continue
+                    channel = message["channel"].decode()[len(self.PREFIX):]
+                    self._receive(channel, message["data"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Redis pub/sub listener failed, reconnecting: {e}")
+                metrics.increment("pubsub.listener_failures")
+                await asyncio.sleep(1)
+            finally:
+                await pubsub.aclose()
+
+
+def get_pubsub() -> MemoryPubSub:
+    backend_class = RedisPubSub if settings.PUBSUB_BACKEND == "redis" else MemoryPubSub
+    return backend_class(
+        history=settings.PUBSUB_HISTORY,
+        max_channels=settings.PUBSUB_MAX_CHANNELS,
+    )
+
+
+pubsub = get_pubsub()
+metrics.register_collector("pubsub", pubsub.stats)
@@ -0,0 +1,157 @@
+import logging
+import math
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Tuple
+
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.core import security
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.core.redis_client import get_async_redis
+
+logger = logging.getLogger(__name__)
+
+
+class MemoryRateLimitBackend:
+    """Per-process token buckets; also the local stand-in for the Redis backend"""
+
+    def __init__(self, max_keys: int = 100000):
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    async def hit(self, key: str, limit: int, period: float) -> float:
+        """Take one token from `key`; return 0 if allowed, else seconds to wait"""
+        rate = limit / period
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.pop(key, (limit, now))
+            tokens = min(limit, tokens + (now - updated) * rate)
+            retry_after = 0.0
+            if tokens >= 1:
+                tokens -= 1
+            else:
+                retry_after = (1 - tokens) / rate
+            self._buckets[key] = (tokens, now)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return retry_after
+
+
+class RedisRateLimitBackend:
+    """Token buckets shared by all workers through Redis"""
+
+    # Refill and take a token atomically; returns the wait time in seconds
+    SCRIPT = """
+    local rate = tonumber(ARGV[1])
+    local capacity = tonumber(ARGV[2])
+    local now = tonumber(ARGV[3])
+    local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+    local tokens = tonumber(bucket[1]) or capacity
+    local updated = tonumber(bucket[2]) or now
+    tokens = math.min(capacity, tokens + math.max(0, now - updated) * rate)
+    local retry_after = 0
+    if tokens >= 1 then
+        tokens = tokens - 1
+    else
+        retry_after = (1 - tokens) / rate
+    end
+    redis.call('HSET', KEYS[1], 'tokens', tokens, 'updated', now)
+    redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 1)
+    return tostring(retry_after)
+    """
+
+    def __init__(self):
+        self._script = None
+
+    async def hit(self, key: str, limit: int, period: float) -> float:
+        if self._script is None:
+            self._script = get_async_redis().register_script(self.SCRIPT)
+        retry_after = await self._script(
+            keys=[f"ratelimit:{key}"], args=[limit / period, limit, time.time()]
+        )
+        return float(retry_after)
+
+
+def get_rate_limit_backend():
+    if settings.RATE_LIMIT_BACKEND == "redis":
+        return RedisRateLimitBackend()
+    return MemoryRateLimitBackend()
+
+
+class RateLimitMiddleware:
+    """
+    ASGI middleware enforcing RATE_LIMIT_PER_MINUTE per client IP and per
+    authenticated user, plus tighter per-route limits from
+    RATE_LIMIT_ROUTES. It runs before routing, so rejected requests never
+    reach a dependency that opens a database session.
+    """
+
+    EXEMPT_PATHS = {"/", "/health"}
+
+    def __init__(self, app: ASGIApp, backend=None):
+        self.app = app
+        self.backend = backend or get_rate_limit_backend()
+        self.route_limits: Dict[str, int] = {
+            f"{settings.API_V1_STR}{path}": limit
+            for path, limit in settings.RATE_LIMIT_ROUTES.items()
+        }
+
+    def _identities(self, scope: Scope) -> List[str]:
+        client = scope.get("client")
+        identities = [f"ip:{client[0] if client else 'unknown'}"]
+
+        for name, value in scope.get("headers", []):
+            if name == b"authorization":
+                scheme, _, token = value.decode("latin-1").partition(" ")
+                if scheme.lower() == "bearer" and token:
+                    payload = security.decode_token(token)
+                    if payload and payload.get("sub"):
+                        identities.append(f"user:{payload['sub']}")
+            elif name == b"x-api-key":
+                parts = security.split_api_key(value.decode("latin-1"))
+                if parts is not None:
+                    identities.append(f"key:{parts[0]}")
+        return identities
+
+    async def _retry_after(self, scope: Scope) -> float:
+        path = scope["path"]
+        limits: List[Tuple[str, int]] = [("global", settings.RATE_LIMIT_PER_MINUTE)]
+        route_limit = self.route_limits.get(path)
+        if route_limit is not None:
+            limits.append((f"route:{path}", route_limit))
+
+        retry_after = 0.0
+        for identity in self._identities(scope):
+            for scope_name, limit in limits:
+                wait = await self.backend.hit(f"{scope_name}:{identity}", limit, 60)
+                retry_after = max(retry_after, wait)
+        return retry_after
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"] in self.EXEMPT_PATHS:
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            retry_after = await self._retry_after(scope)
+        except Exception as e:
+            # Fail open: an unavailable limiter backend must not take the API down
+            logger.warning(f"Rate limiter unavailable, allowing request: {e}")
+            retry_after = 0.0
+
+        if retry_after > 0:
+            metrics.increment("rate_limit.rejected")
+            response = JSONResponse(
+                status_code=429,
+                content={"detail": "Rate limit exceeded"},
+                headers={"Retry-After": str(math.ceil(retry_after))},
+            )
+            await response(scope, receive, send)
+            return
+
+        await self.app(scope, receive, send)
@@ -0,0 +1,36 @@
+from typing import Any, Optional
+
+from app.core.config import settings
+
+_client: Optional[Any] = None
+_async_client: Optional[Any] = None
+
+
+def get_redis() -> Any:
+    """Return the shared blocking Redis client for settings.REDIS_URL"""
+    global _client
+    if _client is None:
+        import redis
+
+        _client = redis.Redis.from_url(settings.REDIS_URL)
+    return _client
+
+
+def get_async_redis() -> Any:
+    """Return the shared asyncio Redis client for settings.REDIS_URL"""
+    global _async_client
+    if _async_client is None:
+        import redis.asyncio as redis
+
+        _async_client = redis.Redis.from_url(settings.REDIS_URL)
+    return _async_client
+
+
+async def close_redis() -> None:
+    global _client, _async_client
+    if _client is not None:
+        _client.close()
+        _client = None
+    if _async_client is not None:
+        await _async_client.aclose()
+        _async_client = None
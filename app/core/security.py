@@ -1,13 +1,45 @@
-from datetime import datetime, timedelta
-from typing import Any, Union, Optional
+import asyncio
+import hashlib
+import logging
+import secrets
+import threading
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Tuple, Union, Optional
 from jose import jwt, JWTError
 from passlib.context import CryptContext
 from fastapi import HTTPException, status
+from starlette.concurrency import run_in_threadpool
 
+from app.core.cache import TTLCache
 from app.core.config import settings
+from app.core.metrics import metrics
 
-# Password hashing
+logger = logging.getLogger(__name__)
+
+# Password hashing. The bcrypt work factor for new hashes is set by
+# init_password_hashing() at startup; hashes outside the accepted range of
+# costs are reported by needs_update() and transparently rehashed on login.
+# The range comes from settings, so it is the same on every worker and
+# workers calibrating to different costs keep each other's hashes.
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+_bcrypt_rounds: Optional[Tuple[int, int, int]] = None
+
+# Process pool used by the async hashing entry points. bcrypt is pure CPU,
+# so running it in worker processes keeps it off the request threadpool.
+_hash_executor: Optional[Executor] = None
+_hash_executor_lock = threading.Lock()
+_hash_pending = 0
+_hash_pending_lock = threading.Lock()
+
+# Verified claims keyed by the SHA-256 digest of the token. Each entry
+# expires together with the token itself.
+token_claims_cache = TTLCache(
+    maxsize=settings.TOKEN_CACHE_MAX_ENTRIES,
+    ttl=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+)
+metrics.register_collector("token_claims_cache", token_claims_cache.stats)
 
 
 def create_access_token(
@@ -21,7 +53,7 @@ def create_access_token(
             minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES
         )
     
-    to_encode = {"exp": expire, "sub": str(subject)}
+    to_encode = {"exp": expire, "sub": str(subject), "jti": secrets.token_hex(16)}
     encoded_jwt = jwt.encode(
         to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM
     )
@@ -31,26 +63,45 @@ def create_access_token(
 def create_refresh_token(subject: Union[str, Any]) -> str:
     """Create JWT refresh token"""
     expire = datetime.utcnow() + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
-    to_encode = {"exp": expire, "sub": str(subject), "type": "refresh"}
+    to_encode = {
+        "exp": expire,
+        "sub": str(subject),
+        "type": "refresh",
+        "jti": secrets.token_hex(16),
+    }
     encoded_jwt = jwt.encode(
         to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM
     )
     return encoded_jwt
 
 
-def verify_token(token: str) -> Optional[str]:
-    """Verify JWT token and return subject"""
+def decode_token(token: str) -> Optional[Dict[str, Any]]:
+    """Verify JWT token and return its claims, using the verified-claims cache"""
+    key = hashlib.sha256(token.encode()).digest()
+    payload = token_claims_cache.get(key)
+    if payload is not None:
+        return payload
+
     try:
         payload = jwt.decode(
             token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
         )
-        username: str = payload.get("sub")
-        if username is None:
-            return None
-        return username
     except JWTError:
         return None
 
+    expires_in = payload.get("exp", 0) - time.time()
+    if expires_in > 0:
+        token_claims_cache.set(key, payload, ttl=expires_in)
+    return payload
+
+
+def verify_token(token: str) -> Optional[str]:
+    """Verify JWT token and return subject"""
+    payload = decode_token(token)
+    if payload is None:
+        return None
+    return payload.get("sub")
+
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a plain password against its hash"""
@@ -62,23 +113,236 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+def verify_and_rehash_password(
+    plain_password: str, hashed_password: str
+) -> Tuple[bool, Optional[str]]:
+    """Verify a password and return a new hash if the stored one is outdated"""
+    if not pwd_context.verify(plain_password, hashed_password):
+        return False, None
+    if pwd_context.needs_update(hashed_password):
+        return True, pwd_context.hash(plain_password)
+    return True, None
+
+
+def _build_pwd_context(rounds: int, min_rounds: int, max_rounds: int) -> CryptContext:
+    return CryptContext(
+        schemes=["bcrypt"],
+        deprecated="auto",
+        bcrypt__rounds=rounds,
+        bcrypt__min_rounds=min_rounds,
+        bcrypt__max_rounds=max_rounds,
+    )
+
+
+def _init_hash_worker(rounds: Optional[Tuple[int, int, int]]) -> None:
+    """Process pool initializer: use the same work factor as the parent"""
+    global pwd_context
+    if rounds is not None:
+        pwd_context = _build_pwd_context(*rounds)
+
+
+def calibrate_bcrypt_rounds(
+    target_ms: float, min_rounds: int, max_rounds: int
+) -> int:
+    """Pick the highest bcrypt cost whose hash time stays within target_ms"""
+    sample_context = CryptContext(schemes=["bcrypt"], bcrypt__rounds=min_rounds)
+    samples = []
+    for _ in range(3):
+        started = time.perf_counter()
+        sample_context.hash("calibration-sample")
+        samples.append(time.perf_counter() - started)
+    estimated_ms = min(samples) * 1000
+
+    # Every extra round doubles the cost
+    rounds = min_rounds
+    while rounds < max_rounds and estimated_ms * 2 <= target_ms:
+        rounds += 1
+        estimated_ms *= 2
+
+    logger.info(
+        f"Calibrated bcrypt cost to {rounds} rounds "
+        f"(~{estimated_ms:.0f} ms per hash, target {target_ms} ms)"
+    )
+    metrics.set_gauge("password_hash.calibrated_ms", estimated_ms)
+    return rounds
+
+
+def configure_password_hashing(
+    rounds: int, min_rounds: Optional[int] = None, max_rounds: Optional[int] = None
+) -> None:
+    """
+    Set the bcrypt work factor of new hashes and the range of costs stored
+    hashes may keep (default: exactly `rounds`), restarting the hashing
+    pool if needed
+    """
+    global pwd_context, _bcrypt_rounds
+    shutdown_password_hashing()
+    _bcrypt_rounds = (rounds, min_rounds or rounds, max_rounds or rounds)
+    pwd_context = _build_pwd_context(*_bcrypt_rounds)
+    metrics.set_gauge("password_hash.bcrypt_rounds", rounds)
+
+
+def init_password_hashing() -> None:
+    """
+    Configure the bcrypt work factor from settings, calibrating if unset.
+    Calibration varies with each worker's load, so calibrated workers only
+    rehash hashes outside BCRYPT_MIN_ROUNDS..BCRYPT_MAX_ROUNDS.
+    """
+    rounds = settings.BCRYPT_ROUNDS
+    if rounds is None:
+        rounds = calibrate_bcrypt_rounds(
+            settings.BCRYPT_TARGET_HASH_MS,
+            settings.BCRYPT_MIN_ROUNDS,
+            settings.BCRYPT_MAX_ROUNDS,
+        )
+        configure_password_hashing(
+            rounds, settings.BCRYPT_MIN_ROUNDS, settings.BCRYPT_MAX_ROUNDS
+        )
+    else:
+        logger.info(f"Using configured bcrypt cost of {rounds} rounds")
+        configure_password_hashing(rounds)
+
+
+def _get_hash_executor() -> Optional[Executor]:
+    """Return the shared hashing process pool, creating it on first use"""
+    global _hash_executor
+    if settings.PASSWORD_HASH_WORKERS <= 0:
+        return None
+    if _hash_executor is None:
+        with _hash_executor_lock:
+            if _hash_executor is None:
+                _hash_executor = ProcessPoolExecutor(
+                    max_workers=settings.PASSWORD_HASH_WORKERS,
+                    initializer=_init_hash_worker,
+                    initargs=(_bcrypt_rounds,),
+                )
+                logger.info(
+                    f"Started password hashing pool with "
+                    f"{settings.PASSWORD_HASH_WORKERS} workers"
+                )
+    return _hash_executor
+
+
+def shutdown_password_hashing() -> None:
+    """Stop the hashing process pool (called on application shutdown)"""
+    global _hash_executor
+    with _hash_executor_lock:
+        executor, _hash_executor = _hash_executor, None
+    if executor is not None:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+async def _run_hash_job(name: str, func: Callable, *args: Any) -> Any:
+    """Run a hashing job in the pool, rejecting it when the queue is full"""
+    global _hash_pending
+    with _hash_pending_lock:
+        if _hash_pending >= settings.PASSWORD_HASH_MAX_PENDING:
+            metrics.increment("password_hash.rejected")
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Server is busy, please retry shortly",
+                headers={"Retry-After": "1"},
+            )
+        _hash_pending += 1
+        metrics.set_gauge("password_hash.pending", _hash_pending)
+
+    started = time.perf_counter()
+    try:
+        executor = _get_hash_executor()
+        if executor is None:
+            return await run_in_threadpool(func, *args)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(executor, func, *args)
+    finally:
+        with _hash_pending_lock:
+            _hash_pending -= 1
+            metrics.set_gauge("password_hash.pending", _hash_pending)
+        metrics.observe(f"password_hash.{name}_seconds", time.perf_counter() - started)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify a plain password against its hash in the hashing pool"""
+    return await _run_hash_job("verify", verify_password, plain_password, hashed_password)
+
+
+async def verify_and_rehash_password_async(
+    plain_password: str, hashed_password: str
+) -> Tuple[bool, Optional[str]]:
+    """Verify a password in the hashing pool, rehashing it if outdated"""
+    return await _run_hash_job(
+        "verify", verify_and_rehash_password, plain_password, hashed_password
+    )
+
+
+async def get_password_hash_async(password: str) -> str:
+    """Hash a password in the hashing pool"""
+    return await _run_hash_job("hash", get_password_hash, password)
+
+
+def create_api_key() -> Tuple[str, str, str]:
+    """Create an API key, returning (full key, lookup prefix, secret)"""
+    prefix = secrets.token_hex(6)
+    secret = secrets.token_urlsafe(32)
+    return f"slk_{prefix}_{secret}", prefix, secret
+
+
+def split_api_key(key: str) -> Optional[Tuple[str, str]]:
+    """Split an API key into (prefix, secret), or None if malformed"""
+    parts = key.split("_", 2)
+    if len(parts) != 3 or parts[0] != "slk" or not parts[1] or not parts[2]:
+        return None
+    return parts[1], parts[2]
+
+
+def hash_api_key_secret(secret: str) -> str:
+    """SHA-256 of an API key secret (keys are random, so no slow hash is needed)"""
+    return hashlib.sha256(secret.encode()).hexdigest()
+
+
+def _receipt_key() -> str:
+    # Separate from the access token key so neither token passes as the other
+    return f"verification-receipt:{settings.VERIFICATION_RECEIPT_KEY or settings.SECRET_KEY}"
+
+
+def create_verification_receipt(
+    *,
+    verification_code_id: int,
+    employer_id: int,
+    employee_name: str,
+    data: Dict[str, Any],
+    verified_at: datetime,
+) -> str:
+    """Sign the outcome of a successful verification"""
+    issued = int(verified_at.replace(tzinfo=timezone.utc).timestamp())
+    claims = {
+        "cid": verification_code_id,
+        "eid": employer_id,
+        "name": employee_name,
+        "data": data,
+        "iat": issued,
+        "exp": issued + settings.VERIFICATION_RECEIPT_EXPIRE_DAYS * 86400,
+    }
+    return jwt.encode(claims, _receipt_key(), algorithm=settings.ALGORITHM)
+
+
+def decode_verification_receipt(token: str) -> Optional[Dict[str, Any]]:
+    """Claims of a valid, unexpired receipt, or None"""
+    try:
+        return jwt.decode(token, _receipt_key(), algorithms=[settings.ALGORITHM])
+    except JWTError:
+        return None
+
+
 def create_verification_code() -> str:
     """Create a random verification code"""
-    import secrets
-    import string
-    
+    from app.utils.verification_codes import generate_verification_codes
+
     # Create format: SL-XXXX-XXXX-XXXX
-    segments = []
-    for _ in range(3):
-        segment = ''.join(secrets.choice(string.ascii_uppercase + string.digits) 
-                         for _ in range(4))
-        segments.append(segment)
-    
-    return f"SL-{'-'.join(segments)}"
+    return generate_verification_codes(1)[0]
 
 
 def verify_verification_code_format(code: str) -> bool:
     """Verify verification code format"""
-    import re
-    pattern = r'^SL-[A-Z0-9]{4}-[A-Z0-9]{4}-[A-Z0-9]{4}$'
-    return bool(re.match(pattern, code))
+    from app.utils.verification_codes import parse_verification_code
+
+    return parse_verification_code(code) is not None
@@ -0,0 +1,70 @@
+import asyncio
+import logging
+from typing import Any, Callable, Optional
+from starlette.concurrency import run_in_threadpool
+
+logger = logging.getLogger(__name__)
+
+
+class PeriodicTask:
+    """
+    Run a blocking job every `interval` seconds from the event loop, or
+    sooner when `trigger` is called
+    """
+
+    def __init__(
+        self,
+        name: str,
+        interval: float,
+        job: Callable[[], Any],
+        run_on_stop: bool = False,
+    ):
+        self.name = name
+        self.interval = interval
+        self.job = job
+        self.run_on_stop = run_on_stop
+        self._task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wake: Optional[asyncio.Event] = None
+
+    def start(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._wake = asyncio.Event()
+        self._task = asyncio.create_task(self._run(), name=self.name)
+
+    def trigger(self) -> None:
+        """Run the job as soon as possible; safe to call from any thread"""
+        loop, wake = self._loop, self._wake
+        if loop is not None and wake is not None:
+            try:
+                loop.call_soon_threadsafe(wake.set)
+            except RuntimeError:
+                # Loop already closed during shutdown
+                pass
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            await self.run_once()
+
+    async def run_once(self) -> None:
+        try:
+            await run_in_threadpool(self.job)
+        except Exception:
+            logger.exception(f"Background task {self.name} failed")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self._loop = self._wake = None
+        if self.run_on_stop:
+            await self.run_once()
@@ -0,0 +1,148 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.core.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+
+class MemoryFailureCounter:
+    """
+    Per-process failure scores that leak back to zero: each key loses
+    `limit` points every `window` seconds. Also the local stand-in for
+    RedisFailureCounter.
+    """
+
+    def __init__(self, limit: int, window: float, max_keys: int = 100000):
+        self.limit = limit
+        self.window = window
+        self.max_keys = max_keys
+        self._scores: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def score(self, key: str, increment: float = 0) -> float:
+        """Return the decayed score of `key` after adding `increment`"""
+        now = time.monotonic()
+        with self._lock:
+            value, updated = self._scores.pop(key, (0.0, now))
+            value = max(0.0, value - (now - updated) * self.limit / self.window)
+            value += increment
+            if value > 0:
+                self._scores[key] = (value, now)
+                while len(self._scores) > self.max_keys:
+                    self._scores.popitem(last=False)
+        return value
+
+
+class RedisFailureCounter:
+    """Leaky failure scores shared by all workers through Redis"""
+
+    SCRIPT = """
+    local leak_rate = tonumber(ARGV[1])
+    local increment = tonumber(ARGV[2])
+    local now = tonumber(ARGV[3])
+    local entry = redis.call('HMGET', KEYS[1], 'score', 'updated')
+    local score = tonumber(entry[1]) or 0
+    local updated = tonumber(entry[2]) or now
+    score = math.max(0, score - math.max(0, now - updated) * leak_rate) + increment
+    if increment > 0 then
+        redis.call('HSET', KEYS[1], 'score', score, 'updated', now)
+        redis.call('EXPIRE', KEYS[1], math.ceil(score / leak_rate) + 1)
+    end
+    return tostring(score)
+    """
+
+    def __init__(self, limit: int, window: float):
+        self.limit = limit
+        self.window = window
+        self._script = None
+
+    def score(self, key: str, increment: float = 0) -> float:
+        if self._script is None:
+            self._script = get_redis().register_script(self.SCRIPT)
+        value = self._script(
+            keys=[f"throttle:{key}"],
+            args=[self.limit / self.window, increment, time.time()],
+        )
+        return float(value)
+
+
+class VerificationThrottle:
+    """
+    Brute-force guard for verification-code lookups. Attempts with unknown
+    or malformed codes are counted per employer and per client IP; real
+    codes rejected as expired, used or changed are not guesses and don't
+    count. Once either count reaches MAX_VERIFICATION_ATTEMPTS, further
+    attempts are rejected without touching the database and only tallied,
+    to be written later as a single summary access log row.
+    """
+
+    def __init__(self, counter):
+        self.counter = counter
+        self._blocked: Dict[Tuple[int, Optional[str]], Dict] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _keys(employer_id: int, ip_address: Optional[str]) -> List[str]:
+        keys = [f"verify:employer:{employer_id}"]
+        if ip_address:
+            keys.append(f"verify:ip:{ip_address}")
+        return keys
+
+    def is_blocked(self, employer_id: int, ip_address: Optional[str]) -> bool:
+        try:
+            return any(
+                self.counter.score(key) >= self.counter.limit
+                for key in self._keys(employer_id, ip_address)
+            )
+        except Exception as e:
+            logger.warning(f"Verification throttle unavailable: {e}")
+            return False
+
+    def record_failure(self, employer_id: int, ip_address: Optional[str]) -> None:
+        try:
+            for key in self._keys(employer_id, ip_address):
+                self.counter.score(key, increment=1)
+        except Exception as e:
+            logger.warning(f"Verification throttle unavailable: {e}")
+
+    def record_blocked(
+        self, employer_id: int, ip_address: Optional[str], user_agent: Optional[str] = None
+    ) -> None:
+        metrics.increment("verification_throttle.blocked")
+        now = datetime.utcnow()
+        with self._lock:
+            entry = self._blocked.setdefault(
+                (employer_id, ip_address),
+                {"count": 0, "first_attempt_at": now, "user_agent": user_agent},
+            )
+            entry["count"] += 1
+            entry["last_attempt_at"] = now
+
+    def drain_blocked(self) -> List[Dict]:
+        """Return and reset the tallies of blocked attempts"""
+        with self._lock:
+            blocked, self._blocked = self._blocked, {}
+        return [
+            {"employer_id": employer_id, "ip_address": ip_address, **entry}
+            for (employer_id, ip_address), entry in blocked.items()
+        ]
+
+
+def get_verification_throttle() -> VerificationThrottle:
+    counter_class = (
+        RedisFailureCounter if settings.RATE_LIMIT_BACKEND == "redis"
+        else MemoryFailureCounter
+    )
+    return VerificationThrottle(
+        counter_class(
+            limit=settings.MAX_VERIFICATION_ATTEMPTS,
+            window=settings.VERIFICATION_ATTEMPT_WINDOW_SECONDS,
+        )
+    )
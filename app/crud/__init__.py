@@ -2,3 +2,5 @@ from .crud_user import user as crud_user
 from .crud_employment import employment as crud_employment  
 from .crud_verification_code import verification_code as crud_verification_code
 from .crud_access_log import access_log as crud_access_log
+from .crud_revoked_token import revoked_token as crud_revoked_token
+from .crud_api_key import api_key as crud_api_key
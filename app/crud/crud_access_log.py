@@ -1,20 +1,249 @@
-from typing import List, Optional
+import logging
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Set, Tuple
+from sqlalchemy import func, insert, literal_column, select, update
+from sqlalchemy.dialects.postgresql import insert as upsert
 from sqlalchemy.orm import Session, joinedload
-from datetime import datetime
+from datetime import date, datetime, timedelta, timezone
 
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.core.pubsub import pubsub
 from app.crud.base import CRUDBase
-from app.models.access_log import AccessLog
+from app.crud.crud_employment import serialize_employment
+from app.models.access_log import AccessLog, AccessLogCounter
 from app.models.verification_code import VerificationCode
 from app.models.user import User
 from app.schemas.access_log import AccessLogCreate, AccessLogUpdate
+from app.utils.time_buckets import BUCKETS, advance
+
+logger = logging.getLogger(__name__)
+
+# Employee owning each verification code (never changes), for the counters
+code_owner_cache = TTLCache(maxsize=100000, ttl=3600)
+
+# Days counted as recent activity in access stats
+RECENT_ACCESS_DAYS = 30
+
+# (closed_until, {bucket start: (total, successful)}) of the closed buckets
+# of a histogram, keyed by account, bucket size and range
+histogram_cache = TTLCache(
+    maxsize=settings.ACCESS_HISTOGRAM_CACHE_MAX_ENTRIES,
+    ttl=settings.ACCESS_HISTOGRAM_CACHE_TTL_SECONDS,
+)
+metrics.register_collector("access_histogram_cache", histogram_cache.stats)
+
+
+def approval_requests_channel(employee_id: int) -> str:
+    """Channel announcing new pending access requests to an employee"""
+    return f"approvals:employee:{employee_id}"
+
+
+def approval_decisions_channel(employer_id: int) -> str:
+    """Channel announcing approve/deny decisions to the requesting employer"""
+    return f"approvals:employer:{employer_id}"
+
+
+class AccessLogWriter:
+    """
+    Bounded in-process queue of access log rows, drained into multi-row
+    INSERTs by a background task. `submit` returns False when the writer
+    is not running or the queue is full, and the caller then writes the row
+    itself, so a slow database pushes back on requests instead of dropping
+    audit rows.
+    """
+
+    def __init__(self, maxsize: int, batch_size: int):
+        self.maxsize = maxsize
+        self.batch_size = batch_size
+        self.on_batch_ready: Optional[Callable[[], None]] = None
+        self._rows: Deque[Dict[str, Any]] = deque()
+        self._lock = threading.Lock()
+        self._running = False
+        self.submitted = 0
+        self.written = 0
+        self.overflowed = 0
+
+    def start(self, on_batch_ready: Callable[[], None]) -> None:
+        self.on_batch_ready = on_batch_ready
+        self._running = True
+
+    def stop(self) -> None:
+        """Stop accepting rows; queued rows are still drained"""
+        self._running = False
+
+    def submit(self, row: Dict[str, Any]) -> bool:
+        with self._lock:
+            if not self._running:
+                return False
+            if len(self._rows) >= self.maxsize:
+                self.overflowed += 1
+                metrics.increment("access_log_writer.overflow")
+                return False
+            self._rows.append(row)
+            self.submitted += 1
+            batch_ready = len(self._rows) == self.batch_size
+        if batch_ready and self.on_batch_ready is not None:
+            self.on_batch_ready()
+        return True
+
+    def take(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            count = min(len(self._rows), self.batch_size)
+            return [self._rows.popleft() for _ in range(count)]
+
+    def put_back(self, rows: List[Dict[str, Any]]) -> None:
+        """Return a failed batch to the front of the queue"""
+        with self._lock:
+            self._rows.extendleft(reversed(rows))
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def stats(self) -> dict:
+        return {
+            "queued": len(self._rows),
+            "maxsize": self.maxsize,
+            "running": self._running,
+            "submitted": self.submitted,
+            "written": self.written,
+            "overflowed": self.overflowed,
+        }
+
+
+access_log_writer = AccessLogWriter(
+    maxsize=settings.ACCESS_LOG_QUEUE_SIZE,
+    batch_size=settings.ACCESS_LOG_BATCH_SIZE,
+)
+metrics.register_collector("access_log_writer", access_log_writer.stats)
 
 
 class CRUDAccessLog(CRUDBase[AccessLog, AccessLogCreate, AccessLogUpdate]):
+    def insert_many(self, db: Session, rows: List[Dict[str, Any]]) -> List[int]:
+        """
+        Insert access log rows with one multi-row INSERT (caller commits).
+        Returns the new ids in row order. The rows reach the daily counters
+        through fold_counters.
+        """
+        if not rows:
+            return []
+        return list(db.scalars(
+            insert(AccessLog).returning(AccessLog.id, sort_by_parameter_order=True),
+            rows
+        ))
+
+    def fold_counters(self, db: Session) -> int:
+        """
+        Add access logs not yet counted to their daily counters, oldest first
+        and ACCESS_LOG_COUNTER_FOLD_BATCH rows per transaction. Rows being
+        folded by another worker are skipped. Returns the number of rows
+        counted.
+        """
+        batch_size = settings.ACCESS_LOG_COUNTER_FOLD_BATCH
+        folded = 0
+        while True:
+            batch = (
+                select(AccessLog.id)
+                .where(AccessLog.counted == False)  # noqa: E712
+                .order_by(AccessLog.id)
+                .limit(batch_size)
+                .with_for_update(skip_locked=True)
+            )
+            rows = db.execute(
+                update(AccessLog)
+                .where(AccessLog.id.in_(batch.scalar_subquery()))
+                .values(counted=True)
+                .returning(
+                    AccessLog.employer_id, AccessLog.verification_code_id,
+                    AccessLog.success, AccessLog.accessed_at
+                )
+                .execution_options(synchronize_session=False)
+            ).mappings().all()
+            if rows:
+                self._count(db, rows)
+            db.commit()
+            folded += len(rows)
+            if len(rows) < batch_size:
+                return folded
+
+    def _code_owners(self, db: Session, code_ids: Set[int]) -> Dict[int, int]:
+        owners = {}
+        missing = []
+        for code_id in code_ids:
+            employee_id = code_owner_cache.get(code_id)
+            if employee_id is None:
+                missing.append(code_id)
+            else:
+                owners[code_id] = employee_id
+        if missing:
+            for code_id, employee_id in db.execute(
+                select(VerificationCode.id, VerificationCode.employee_id)
+                .where(VerificationCode.id.in_(missing))
+            ):
+                code_owner_cache.set(code_id, employee_id)
+                owners[code_id] = employee_id
+        return owners
+
+    def _count(self, db: Session, rows: List[Dict[str, Any]]) -> None:
+        """
+        Add rows to the daily counters of their employer and of the code's
+        employee with one upsert
+        """
+        owners = self._code_owners(db, {
+            row["verification_code_id"] for row in rows if row.get("verification_code_id")
+        })
+        counts: Dict[Tuple[int, date], List[int]] = {}
+        for row in rows:
+            accessed_at = row["accessed_at"]
+            if accessed_at.tzinfo is not None:
+                accessed_at = accessed_at.astimezone(timezone.utc)
+            day = accessed_at.date()
+            for user_id in (row["employer_id"], owners.get(row.get("verification_code_id"))):
+                if user_id is not None:
+                    count = counts.setdefault((user_id, day), [0, 0])
+                    count[0] += 1
+                    count[1] += bool(row["success"])
+        # Sorted so concurrent folds lock counter rows in one order
+        statement = upsert(AccessLogCounter).values([
+            {"user_id": user_id, "day": day, "total": total, "successful": successful}
+            for (user_id, day), (total, successful) in sorted(counts.items())
+        ])
+        db.execute(statement.on_conflict_do_update(
+            index_elements=[AccessLogCounter.user_id, AccessLogCounter.day],
+            set_={
+                "total": AccessLogCounter.total + statement.excluded.total,
+                "successful": AccessLogCounter.successful + statement.excluded.successful,
+            }
+        ))
+
+    def flush_queued(self, db: Session) -> int:
+        """Write queued rows batch by batch until the queue is empty"""
+        written = 0
+        while True:
+            rows = access_log_writer.take()
+            if not rows:
+                return written
+            started = time.perf_counter()
+            try:
+                self.insert_many(db, rows)
+                db.commit()
+            except Exception:
+                db.rollback()
+                access_log_writer.put_back(rows)
+                raise
+            access_log_writer.written += len(rows)
+            written += len(rows)
+            metrics.observe("access_log_writer.flush_seconds", time.perf_counter() - started)
+
     def get_multi_by_employee(
         self, db: Session, *, employee_id: int, skip: int = 0, limit: int = 100
     ) -> List[AccessLog]:
         return (
             db.query(self.model)
+            .options(*self._detail_options())
             .join(VerificationCode)
             .filter(VerificationCode.employee_id == employee_id)
             .order_by(AccessLog.accessed_at.desc())
@@ -28,6 +257,7 @@ class CRUDAccessLog(CRUDBase[AccessLog, AccessLogCreate, AccessLogUpdate]):
     ) -> List[AccessLog]:
         return (
             db.query(self.model)
+            .options(*self._detail_options())
             .filter(AccessLog.employer_id == employer_id)
             .order_by(AccessLog.accessed_at.desc())
             .offset(skip)
@@ -59,6 +289,7 @@ class CRUDAccessLog(CRUDBase[AccessLog, AccessLogCreate, AccessLogUpdate]):
         
         return (
             db.query(self.model)
+            .options(*self._detail_options())
             .filter(AccessLog.verification_code_id == verification_code_id)
             .order_by(AccessLog.accessed_at.desc())
             .offset(skip)
@@ -66,11 +297,18 @@ class CRUDAccessLog(CRUDBase[AccessLog, AccessLogCreate, AccessLogUpdate]):
             .all()
         )
 
+    @staticmethod
+    def _detail_options() -> tuple:
+        """Load the relations AccessLogWithDetails reads with the rows"""
+        return (
+            joinedload(AccessLog.employer),
+            joinedload(AccessLog.verification_code).joinedload(VerificationCode.employee),
+        )
+
     def get_with_details(self, db: Session, *, id: int) -> Optional[AccessLog]:
         return (
             db.query(self.model)
-            .options(joinedload(AccessLog.verification_code))
-            .options(joinedload(AccessLog.employer))
+            .options(*self._detail_options())
             .filter(AccessLog.id == id)
             .first()
         )
@@ -95,64 +333,152 @@ class CRUDAccessLog(CRUDBase[AccessLog, AccessLogCreate, AccessLogUpdate]):
     def approve_request(
         self, db: Session, *, log_id: int, approver_id: int
     ) -> AccessLog:
-        access_log = db.query(self.model).filter(AccessLog.id == log_id).first()
-        
-        if access_log:
-            access_log.approval_status = "approved"
-            access_log.approved_by = approver_id
-            access_log.approved_at = datetime.utcnow()
-            db.add(access_log)
-            db.commit()
-            db.refresh(access_log)
-        
-        return access_log
+        return self._decide(db, log_id=log_id, approver_id=approver_id, approval_status="approved")
 
     def deny_request(
         self, db: Session, *, log_id: int, approver_id: int
     ) -> AccessLog:
+        return self._decide(db, log_id=log_id, approver_id=approver_id, approval_status="denied")
+
+    def _decide(
+        self, db: Session, *, log_id: int, approver_id: int, approval_status: str
+    ) -> AccessLog:
+        """Record a decision and notify the employer waiting on it"""
         access_log = db.query(self.model).filter(AccessLog.id == log_id).first()
         
         if access_log:
-            access_log.approval_status = "denied"
+            access_log.approval_status = approval_status
             access_log.approved_by = approver_id
             access_log.approved_at = datetime.utcnow()
+            if approval_status == "approved":
+                # Pending requests hold no data; share it as of approval
+                access_log.data_accessed = serialize_employment(
+                    access_log.verification_code.employment
+                )
             db.add(access_log)
             db.commit()
             db.refresh(access_log)
+            pubsub.publish(approval_decisions_channel(access_log.employer_id), {
+                "type": "approval_decided",
+                "access_log_id": access_log.id,
+                "verification_code_id": access_log.verification_code_id,
+                "approval_status": approval_status,
+                "data": access_log.data_accessed,
+            })
         
         return access_log
 
     def get_access_stats(
         self, db: Session, *, employee_id: int = None, employer_id: int = None
     ) -> dict:
-        """Get access statistics for analytics"""
-        query = db.query(self.model)
-        
-        if employee_id:
-            query = query.join(VerificationCode).filter(
-                VerificationCode.employee_id == employee_id
+        """
+        Get access statistics for analytics from the user's daily counters,
+        in one conditional-aggregate query over at most one row per day.
+        Logs written in the last ACCESS_LOG_COUNTER_FOLD_SECONDS may not be
+        counted yet.
+        """
+        user_id = employee_id or employer_id
+        since = datetime.now(timezone.utc).date() - timedelta(days=RECENT_ACCESS_DAYS)
+        total_requests, successful_requests, recent_requests = db.execute(
+            select(
+                func.coalesce(func.sum(AccessLogCounter.total), 0),
+                func.coalesce(func.sum(AccessLogCounter.successful), 0),
+                func.coalesce(
+                    func.sum(AccessLogCounter.total).filter(AccessLogCounter.day >= since), 0
+                )
             )
-        elif employer_id:
-            query = query.filter(AccessLog.employer_id == employer_id)
-        
-        total_requests = query.count()
-        successful_requests = query.filter(AccessLog.success == True).count()
-        failed_requests = total_requests - successful_requests
-        
-        # Get recent activity (last 30 days)
-        from datetime import timedelta
-        thirty_days_ago = datetime.utcnow() - timedelta(days=30)
-        recent_requests = query.filter(
-            AccessLog.accessed_at >= thirty_days_ago
-        ).count()
+            .where(AccessLogCounter.user_id == user_id)
+        ).one()
         
         return {
             "total_requests": total_requests,
             "successful_requests": successful_requests,
-            "failed_requests": failed_requests,
+            "failed_requests": total_requests - successful_requests,
             "success_rate": (successful_requests / total_requests * 100) if total_requests > 0 else 0,
             "recent_requests": recent_requests
         }
 
+    def get_access_histogram(
+        self,
+        db: Session,
+        *,
+        bucket: str,
+        starts: List[datetime],
+        end: datetime,
+        employee_id: int = None,
+        employer_id: int = None
+    ) -> dict:
+        """
+        Access log counts per bucket for the buckets starting at `starts`
+        (the last ending at `end`), as parallel lists. Buckets closed for
+        ACCESS_HISTOGRAM_GRACE_SECONDS are cached, so a repeated call only
+        counts the rows of the open ones.
+        """
+        account = ("employee", employee_id) if employee_id else ("employer", employer_id)
+        key = (account, bucket, starts[0], end)
+        closed_until, closed = histogram_cache.get(key) or (starts[0], {})
+        counts = dict(closed)
+        if closed_until < end:
+            counts.update(self._count_buckets(
+                db,
+                bucket=bucket,
+                start=closed_until,
+                end=end,
+                employee_id=employee_id,
+                employer_id=employer_id
+            ))
+        
+        settled = datetime.now(timezone.utc) - timedelta(
+            seconds=settings.ACCESS_HISTOGRAM_GRACE_SECONDS
+        )
+        closed_starts = [start for start in starts if advance(start, bucket) <= settled]
+        if closed_starts and advance(closed_starts[-1], bucket) > closed_until:
+            histogram_cache.set(key, (
+                advance(closed_starts[-1], bucket),
+                {start: counts[start] for start in closed_starts if start in counts}
+            ))
+        
+        return {
+            "bucket": bucket,
+            "buckets": starts,
+            "total": [counts.get(start, (0, 0))[0] for start in starts],
+            "successful": [counts.get(start, (0, 0))[1] for start in starts],
+        }
+
+    def _count_buckets(
+        self,
+        db: Session,
+        *,
+        bucket: str,
+        start: datetime,
+        end: datetime,
+        employee_id: int = None,
+        employer_id: int = None
+    ) -> Dict[datetime, Tuple[int, int]]:
+        """(total, successful) per UTC bucket start, over [start, end)"""
+        if bucket not in BUCKETS:
+            raise ValueError(f"Unknown bucket: {bucket!r}")
+        # Inlined rather than bound, so the GROUP BY expression matches the
+        # selected one
+        bucket_start = func.date_trunc(
+            literal_column(f"'{bucket}'"), func.timezone("UTC", AccessLog.accessed_at)
+        )
+        query = (
+            select(bucket_start, func.count(), func.count().filter(AccessLog.success))
+            # A plain range on accessed_at, so the (account, accessed_at)
+            # indexes bound the scan
+            .where(AccessLog.accessed_at >= start, AccessLog.accessed_at < end)
+            .group_by(bucket_start)
+        )
+        if employee_id:
+            query = query.where(AccessLog.verification_code_id.in_(
+                select(VerificationCode.id).where(VerificationCode.employee_id == employee_id)
+            ))
+        else:
+            query = query.where(AccessLog.employer_id == employer_id)
+        return {
+            bucket_start.replace(tzinfo=timezone.utc): (total, successful)
+            for bucket_start, total, successful in db.execute(query)
+        }
 
 access_log = CRUDAccessLog(AccessLog)
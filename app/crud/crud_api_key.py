@@ -0,0 +1,114 @@
+import hmac
+from typing import List, Optional, Tuple
+from sqlalchemy.orm import Session, joinedload
+from datetime import datetime
+
+from app.core import security
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.crud.base import CRUDBase
+from app.models.api_key import ApiKey
+from app.schemas.api_key import ApiKeyCreate
+from app.schemas.user import UserPrincipal
+
+# (key hash, principal, scopes) keyed by key prefix, so a hot integration
+# authenticates with a SHA-256 and a dict lookup
+api_key_cache = TTLCache(
+    maxsize=settings.API_KEY_CACHE_MAX_ENTRIES,
+    ttl=settings.API_KEY_CACHE_TTL_SECONDS,
+)
+metrics.register_collector("api_key_cache", api_key_cache.stats)
+
+
+class CRUDApiKey(CRUDBase[ApiKey, ApiKeyCreate, ApiKeyCreate]):
+    def create_for_user(
+        self, db: Session, *, obj_in: ApiKeyCreate, user_id: int
+    ) -> Tuple[ApiKey, str]:
+        """Create an API key, returning it along with the raw key"""
+        key, prefix, secret = security.create_api_key()
+        db_obj = ApiKey(
+            user_id=user_id,
+            name=obj_in.name,
+            prefix=prefix,
+            key_hash=security.hash_api_key_secret(secret),
+            scopes=",".join(sorted(set(obj_in.scopes))),
+            expires_at=obj_in.expires_at,
+        )
+        db.add(db_obj)
+        db.commit()
+        db.refresh(db_obj)
+        return db_obj, key
+
+    def get_multi_by_user(
+        self, db: Session, *, user_id: int, skip: int = 0, limit: int = 100
+    ) -> List[ApiKey]:
+        return (
+            db.query(self.model)
+            .filter(ApiKey.user_id == user_id)
+            .order_by(ApiKey.created_at.desc())
+            .offset(skip)
+            .limit(limit)
+            .all()
+        )
+
+    def revoke(self, db: Session, *, api_key: ApiKey) -> ApiKey:
+        api_key.is_active = False
+        db.add(api_key)
+        db.commit()
+        db.refresh(api_key)
+        api_key_cache.pop(api_key.prefix)
+        return api_key
+
+    def authenticate(
+        self, db: Session, *, key: str, scope: str
+    ) -> Optional[UserPrincipal]:
+        """Resolve an API key to its owner's principal if it grants `scope`"""
+        parts = security.split_api_key(key)
+        if parts is None:
+            return None
+        prefix, secret = parts
+
+        entry = api_key_cache.get(prefix)
+        if entry is None:
+            entry = self._load(db, prefix=prefix)
+            if entry is None:
+                return None
+            api_key_cache.set(prefix, entry)
+
+        key_hash, principal, scopes, expires_at = entry
+        if not hmac.compare_digest(key_hash, security.hash_api_key_secret(secret)):
+            return None
+        if expires_at is not None and expires_at <= datetime.utcnow():
+            return None
+        if scope not in scopes:
+            return None
+        return principal
+
+    def _load(self, db: Session, *, prefix: str):
+        api_key = (
+            db.query(self.model)
+            .options(joinedload(ApiKey.user))
+            .filter(ApiKey.prefix == prefix, ApiKey.is_active == True)
+            .first()
+        )
+        if api_key is None:
+            return None
+
+        expires_at = api_key.expires_at
+        if expires_at is not None and expires_at.tzinfo is not None:
+            expires_at = expires_at.replace(tzinfo=None) - expires_at.utcoffset()
+        entry = (
+            api_key.key_hash,
+            UserPrincipal.model_validate(api_key.user, from_attributes=True),
+            frozenset(api_key.scopes.split(",")),
+            expires_at,
+        )
+
+        # Only record usage on cache misses, i.e. at most once per TTL
+        api_key.last_used_at = datetime.utcnow()
+        db.commit()
+        return entry
+
+
+api_key = CRUDApiKey(ApiKey)
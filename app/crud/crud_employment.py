@@ -1,13 +1,72 @@
-from typing import List, Optional
+from typing import Any, Dict, List, Optional, Union
+from sqlalchemy import update
 from sqlalchemy.orm import Session
 from datetime import datetime
 
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.metrics import metrics
 from app.crud.base import CRUDBase
 from app.models.employment import Employment, EmploymentStatus
 from app.schemas.employment import EmploymentCreate, EmploymentUpdate
 
+# (updated_at, serialized employment) keyed by employment id; an entry is
+# only used while its updated_at matches the row's
+snapshot_cache = TTLCache(
+    maxsize=settings.EMPLOYMENT_SNAPSHOT_CACHE_MAX_ENTRIES,
+    ttl=settings.EMPLOYMENT_SNAPSHOT_CACHE_TTL_SECONDS,
+)
+metrics.register_collector("employment_snapshot_cache", snapshot_cache.stats)
+
+
+def serialize_employment(employment: Employment) -> Dict[str, Any]:
+    """The employment data shared with an employer on verification"""
+    return {
+        "employment_id": employment.id,
+        "company_name": employment.company_name,
+        "job_title": employment.job_title,
+        "employment_type": employment.employment_type.value,
+        "employment_status": employment.employment_status.value,
+        "start_date": employment.start_date.isoformat(),
+        "end_date": employment.end_date.isoformat() if employment.end_date else None,
+        "department": employment.department,
+        "location": employment.company_location,
+        "is_verified": employment.is_verified,
+        "verification_date": employment.verification_date.isoformat() if employment.verification_date else None
+    }
+
 
 class CRUDEmployment(CRUDBase[Employment, EmploymentCreate, EmploymentUpdate]):
+    def get_snapshot(
+        self, db: Session, *, employment_id: int, version: Optional[datetime]
+    ) -> Optional[Dict[str, Any]]:
+        """Serialized employment, cached per `updated_at` version"""
+        entry = snapshot_cache.get(employment_id)
+        if entry is not None and entry[0] == version:
+            return entry[1]
+        employment = self.get(db, id=employment_id)
+        if employment is None:
+            return None
+        snapshot = serialize_employment(employment)
+        snapshot_cache.set(employment_id, (employment.updated_at, snapshot))
+        return snapshot
+
+    def update(
+        self,
+        db: Session,
+        *,
+        db_obj: Employment,
+        obj_in: Union[EmploymentUpdate, Dict[str, Any]]
+    ) -> Employment:
+        employment = super().update(db, db_obj=db_obj, obj_in=obj_in)
+        snapshot_cache.pop(employment.id)
+        return employment
+
+    def remove(self, db: Session, *, id: int) -> Employment:
+        employment = super().remove(db, id=id)
+        snapshot_cache.pop(id)
+        return employment
+
     def create_with_employee(
         self, db: Session, *, obj_in: EmploymentCreate, employee_id: int
     ) -> Employment:
@@ -46,13 +105,18 @@ class CRUDEmployment(CRUDBase[Employment, EmploymentCreate, EmploymentUpdate]):
         self, db: Session, *, employment_id: int, employee_id: int
     ) -> Employment:
         # First, mark all other employments as ended
-        db.query(self.model).filter(
-            Employment.employee_id == employee_id,
-            Employment.id != employment_id
-        ).update({
-            Employment.employment_status: EmploymentStatus.ENDED,
-            Employment.end_date: datetime.utcnow()
-        })
+        ended_ids = db.execute(
+            update(Employment)
+            .where(
+                Employment.employee_id == employee_id,
+                Employment.id != employment_id
+            )
+            .values(
+                employment_status=EmploymentStatus.ENDED,
+                end_date=datetime.utcnow()
+            )
+            .returning(Employment.id)
+        ).scalars().all()
         
         # Then mark the specified employment as current
         employment = db.query(self.model).filter(
@@ -66,6 +130,8 @@ class CRUDEmployment(CRUDBase[Employment, EmploymentCreate, EmploymentUpdate]):
             db.commit()
             db.refresh(employment)
         
+        for id in (employment_id, *ended_ids):
+            snapshot_cache.pop(id)
         return employment
 
     def end_employment(
@@ -82,6 +148,7 @@ class CRUDEmployment(CRUDBase[Employment, EmploymentCreate, EmploymentUpdate]):
             db.commit()
             db.refresh(employment)
         
+        snapshot_cache.pop(employment_id)
         return employment
 
     def get_by_company(
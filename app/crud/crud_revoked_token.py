@@ -0,0 +1,126 @@
+import logging
+import threading
+from typing import Optional
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import insert as upsert
+from sqlalchemy.orm import Session
+from pydantic import BaseModel
+from datetime import datetime
+
+from app.core.bloom import BloomFilter
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.crud.base import CRUDBase
+from app.models.revoked_token import RevokedToken
+
+logger = logging.getLogger(__name__)
+
+
+class CRUDRevokedToken(CRUDBase[RevokedToken, BaseModel, BaseModel]):
+    """
+    Token denylist. Each worker keeps a Bloom filter of revoked `jti`s
+    that is synced incrementally from the table, so the common case of a
+    token that was never revoked is answered without a query. Syncs re-read
+    the last SYNC_OVERLAP_IDS ids before the cursor, so revocations
+    committed out of id order are not skipped.
+    """
+
+    SYNC_OVERLAP_IDS = 1000
+
+    def __init__(self, model):
+        super().__init__(model)
+        self._filter = self._new_filter()
+        self._last_id = 0
+        self._sync_lock = threading.Lock()
+        self._confirmed = TTLCache(maxsize=10000, ttl=300)
+        metrics.register_collector("token_revocation_filter", self._filter_stats)
+
+    def _new_filter(self) -> BloomFilter:
+        return BloomFilter(
+            capacity=settings.TOKEN_REVOCATION_FILTER_CAPACITY,
+            error_rate=settings.TOKEN_REVOCATION_FILTER_ERROR_RATE,
+        )
+
+    def _filter_stats(self) -> dict:
+        return {**self._filter.stats(), "last_id": self._last_id}
+
+    def revoke(
+        self, db: Session, *, jti: str, expires_at: datetime, user_id: Optional[int] = None
+    ) -> None:
+        """Revoke a token by its `jti` claim; revoking it again is a no-op"""
+        # A racing revocation of the same token (e.g. a double logout) wins
+        db.execute(
+            upsert(RevokedToken)
+            .values(jti=jti, user_id=user_id, expires_at=expires_at)
+            .on_conflict_do_nothing(index_elements=[RevokedToken.jti])
+        )
+        db.commit()
+        # Visible to this worker immediately, to the others on their next sync
+        self._filter.add(jti)
+        self._confirmed.set(jti, True)
+
+    def is_revoked(self, db: Session, *, jti: str) -> bool:
+        if jti not in self._filter:
+            return False
+        if self._confirmed.get(jti):
+            return True
+        metrics.increment("token_revocation.filter_positive")
+        revoked = (
+            db.query(RevokedToken.id).filter(RevokedToken.jti == jti).first()
+            is not None
+        )
+        if revoked:
+            self._confirmed.set(jti, True)
+        return revoked
+
+    def load(self, db: Session) -> None:
+        """Rebuild the filter from all unexpired revocations"""
+        with self._sync_lock:
+            bloom = self._new_filter()
+            last_id = db.query(func.max(RevokedToken.id)).scalar() or 0
+            rows = (
+                db.query(RevokedToken.jti)
+                .filter(
+                    RevokedToken.id <= last_id,
+                    RevokedToken.expires_at > datetime.utcnow()
+                )
+                .yield_per(1000)
+            )
+            for (jti,) in rows:
+                bloom.add(jti)
+            self._filter, self._last_id = bloom, last_id
+        logger.info(f"Loaded {bloom.count} revoked tokens into the revocation filter")
+
+    def sync(self, db: Session) -> int:
+        """Add revocations made by other workers since the last sync"""
+        if self._filter.is_saturated:
+            self.load(db)
+            return 0
+        with self._sync_lock:
+            rows = (
+                db.query(RevokedToken.id, RevokedToken.jti)
+                .filter(RevokedToken.id > self._last_id - self.SYNC_OVERLAP_IDS)
+                .order_by(RevokedToken.id)
+                .all()
+            )
+            added = 0
+            for row_id, jti in rows:
+                # Re-read rows are skipped so they don't inflate the count
+                if jti not in self._filter:
+                    self._filter.add(jti)
+                    added += 1
+                self._last_id = max(self._last_id, row_id)
+        return added
+
+    def remove_expired(self, db: Session) -> int:
+        removed = (
+            db.query(RevokedToken)
+            .filter(RevokedToken.expires_at <= datetime.utcnow())
+            .delete(synchronize_session=False)
+        )
+        db.commit()
+        return removed
+
+
+revoked_token = CRUDRevokedToken(RevokedToken)
@@ -1,50 +1,128 @@
+import logging
+import threading
 from typing import Any, Dict, Optional, Union, List
+from sqlalchemy import text
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
 from datetime import datetime
+from starlette.concurrency import run_in_threadpool
 
-from app.core.security import get_password_hash, verify_password
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.core.security import get_password_hash, get_password_hash_async, verify_and_rehash_password_async
 from app.crud.base import CRUDBase
 from app.models.user import User
-from app.schemas.user import UserCreate, UserUpdate
+from app.schemas.user import UserCreate, UserUpdate, UserPrincipal
 from app.utils.id_generator import generate_employee_user_id, generate_employer_id, generate_company_handle
 
+logger = logging.getLogger(__name__)
+
+# Registration attempts when a generated public ID or handle is already taken
+PUBLIC_ID_ATTEMPTS = 3
+
+
+# Detached principals keyed by user id, used on every authenticated request
+principal_cache = TTLCache(
+    maxsize=settings.PRINCIPAL_CACHE_MAX_ENTRIES,
+    ttl=settings.PRINCIPAL_CACHE_TTL_SECONDS,
+)
+metrics.register_collector("principal_cache", principal_cache.stats)
+
+
+class LastLoginBuffer:
+    """Latest login time per user, waiting to be written in one batch"""
+
+    def __init__(self):
+        self._pending: Dict[int, datetime] = {}
+        self._lock = threading.Lock()
+
+    def record(self, user_id: int, logged_in_at: datetime) -> None:
+        with self._lock:
+            previous = self._pending.get(user_id)
+            if previous is None or previous < logged_in_at:
+                self._pending[user_id] = logged_in_at
+
+    def drain(self) -> Dict[int, datetime]:
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        return pending
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+
+last_login_buffer = LastLoginBuffer()
+metrics.register_collector("last_login_buffer", lambda: {"pending": len(last_login_buffer)})
+
 
 class CRUDUser(CRUDBase[User, UserCreate, UserUpdate]):
+    def get_principal(self, db: Session, *, id: int) -> Optional[UserPrincipal]:
+        """Get the cached principal for a user, loading it on a miss"""
+        principal = principal_cache.get(id)
+        if principal is None:
+            user = self.get(db, id=id)
+            if user is None:
+                return None
+            principal = UserPrincipal.model_validate(user, from_attributes=True)
+            principal_cache.set(id, principal)
+        return principal
+
     def get_by_email(self, db: Session, *, email: str) -> Optional[User]:
         return db.query(User).filter(User.email == email).first()
 
-    def create(self, db: Session, *, obj_in: UserCreate) -> User:
-        # Generate appropriate IDs based on user type
-        user_id = None
-        employer_id = None
-        company_handle = None
-        
-        if obj_in.user_type.value == 'employee':
-            user_id = generate_employee_user_id(db)
-        else:  # employer
-            employer_id = generate_employer_id(db)
-            if obj_in.company_name:
-                company_handle = generate_company_handle(obj_in.company_name, db)
-        
-        db_obj = User(
-            email=obj_in.email,
-            hashed_password=get_password_hash(obj_in.password),
-            full_name=obj_in.full_name,
-            user_type=obj_in.user_type,
-            user_id=user_id,
-            employer_id=employer_id,
-            company_handle=company_handle,
-            phone_number=obj_in.phone_number,
-            location=obj_in.location,
-            bio=obj_in.bio,
-            company_name=obj_in.company_name,
-            company_website=obj_in.company_website,
-            company_size=obj_in.company_size,
+    async def create(self, db: Session, *, obj_in: UserCreate) -> User:
+        hashed_password = await get_password_hash_async(obj_in.password)
+        return await run_in_threadpool(
+            self.create_with_hash, db, obj_in=obj_in, hashed_password=hashed_password
         )
-        db.add(db_obj)
-        db.commit()
-        db.refresh(db_obj)
-        return db_obj
+
+    def create_with_hash(
+        self, db: Session, *, obj_in: UserCreate, hashed_password: str
+    ) -> User:
+        for attempt in range(PUBLIC_ID_ATTEMPTS):
+            # Generate appropriate IDs based on user type
+            user_id = None
+            employer_id = None
+            company_handle = None
+            
+            if obj_in.user_type.value == 'employee':
+                user_id = generate_employee_user_id(db)
+            else:  # employer
+                employer_id = generate_employer_id(db)
+                if obj_in.company_name:
+                    company_handle = generate_company_handle(obj_in.company_name, db)
+            
+            db_obj = User(
+                email=obj_in.email,
+                hashed_password=hashed_password,
+                full_name=obj_in.full_name,
+                user_type=obj_in.user_type,
+                user_id=user_id,
+                employer_id=employer_id,
+                company_handle=company_handle,
+                phone_number=obj_in.phone_number,
+                location=obj_in.location,
+                bio=obj_in.bio,
+                company_name=obj_in.company_name,
+                company_website=obj_in.company_website,
+                company_size=obj_in.company_size,
+            )
+            db.add(db_obj)
+            try:
+                db.commit()
+            except IntegrityError:
+                # A concurrent registration took the same company handle, or a
+                # permuted ID landed on a random ID issued before the
+                # allocator existed; generate them again
+                db.rollback()
+                metrics.increment("public_ids.conflicts")
+                if attempt == PUBLIC_ID_ATTEMPTS - 1:
+                    raise
+                continue
+            db.refresh(db_obj)
+            return db_obj
 
     def update(
         self, db: Session, *, db_obj: User, obj_in: Union[UserUpdate, Dict[str, Any]]
@@ -59,26 +137,83 @@ class CRUDUser(CRUDBase[User, UserCreate, UserUpdate]):
             del update_data["password"]
             update_data["hashed_password"] = hashed_password
             
-        return super().update(db, db_obj=db_obj, obj_in=update_data)
+        user = super().update(db, db_obj=db_obj, obj_in=update_data)
+        principal_cache.pop(user.id)
+        return user
 
-    def authenticate(self, db: Session, *, email: str, password: str) -> Optional[User]:
-        user = self.get_by_email(db, email=email)
+    def remove(self, db: Session, *, id: int) -> User:
+        user = super().remove(db, id=id)
+        principal_cache.pop(id)
+        return user
+
+    async def authenticate(self, db: Session, *, email: str, password: str) -> Optional[User]:
+        user = await run_in_threadpool(self.get_by_email, db, email=email)
         if not user:
             return None
-        if not verify_password(password, user.hashed_password):
+        is_valid, new_hash = await verify_and_rehash_password_async(
+            password, user.hashed_password
+        )
+        if not is_valid:
             return None
+        if new_hash:
+            # Stored hash uses an outdated bcrypt cost, upgrade it transparently
+            user = await run_in_threadpool(
+                self.update_password_hash, db, user=user, hashed_password=new_hash
+            )
+            metrics.increment("password_hash.rehashed")
+        return user
+
+    def update_password_hash(
+        self, db: Session, *, user: User, hashed_password: str
+    ) -> User:
+        user.hashed_password = hashed_password
+        db.add(user)
+        db.commit()
+        db.refresh(user)
         return user
 
     def is_active(self, user: User) -> bool:
         return user.is_active
 
     def update_last_login(self, db: Session, *, user: User) -> User:
-        user.last_login = datetime.utcnow()
-        db.add(user)
-        db.commit()
-        db.refresh(user)
+        """Record a login; the write is deferred to flush_last_logins"""
+        logged_in_at = datetime.utcnow()
+        last_login_buffer.record(user.id, logged_in_at)
+        # Reflect the new value on the instance without marking it dirty
+        set_committed_value(user, "last_login", logged_in_at)
+        principal_cache.pop(user.id)
         return user
 
+    def flush_last_logins(self, db: Session, *, batch_size: int = 1000) -> int:
+        """Write buffered login times with batched UPDATE ... FROM (VALUES ...)"""
+        pending = list(last_login_buffer.drain().items())
+        for start in range(0, len(pending), batch_size):
+            batch = pending[start:start + batch_size]
+            params: Dict[str, Any] = {}
+            values = []
+            for i, (user_id, logged_in_at) in enumerate(batch):
+                values.append(f"(:id_{i}, CAST(:ts_{i} AS TIMESTAMP WITH TIME ZONE))")
+                params[f"id_{i}"] = user_id
+                params[f"ts_{i}"] = logged_in_at
+            try:
+                db.execute(
+                    text(
+                        "UPDATE users SET last_login = v.last_login "
+                        f"FROM (VALUES {', '.join(values)}) AS v(id, last_login) "
+                        "WHERE users.id = v.id"
+                    ),
+                    params,
+                )
+                db.commit()
+            except Exception:
+                db.rollback()
+                # Put the unwritten logins back so the next flush retries them
+                for user_id, logged_in_at in pending[start:]:
+                    last_login_buffer.record(user_id, logged_in_at)
+                raise
+        metrics.increment("last_login.flushed", len(pending))
+        return len(pending)
+
     def get_employees(self, db: Session, *, skip: int = 0, limit: int = 100) -> List[User]:
         return (
             db.query(self.model)
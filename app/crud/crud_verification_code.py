@@ -1,37 +1,404 @@
-from typing import List, Optional
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple, Union
+from sqlalchemy import and_, case, delete, exists, func, insert, literal, or_, select, update
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session, joinedload
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 
+from app.core.bloom import CountingBloomFilter
+from app.core.cache import TTLCache
 from app.crud.base import CRUDBase
-from app.core.security import create_verification_code
-from app.models.verification_code import VerificationCode, VerificationCodeStatus
+from app.crud.crud_access_log import (
+    access_log as crud_access_log,
+    access_log_writer,
+    approval_requests_channel,
+)
+from app.crud.crud_employment import employment as crud_employment
+from app.crud.crud_user import user as crud_user
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.core.pubsub import pubsub
+from app.core.security import create_verification_receipt
+from app.core.throttle import get_verification_throttle
+from app.models.verification_code import (
+    VerificationCode,
+    VerificationCodeStatus,
+    VerificationCodeUsageShard,
+)
 from app.models.employment import Employment
 from app.models.user import User
-from app.models.access_log import AccessLog
 from app.schemas.verification_code import VerificationCodeCreate, VerificationCodeUpdate, VerificationResponse
+from app.utils.domains import compile_allowed_domains, employer_domains
+from app.utils.verification_codes import VerificationCodePool, parse_verification_code
+
+# Per-employer / per-IP failed-attempt counters guarding verify_code
+verification_throttle = get_verification_throttle()
+
+
+def _existing_code_keys(db: Session, code_keys: Set[int]) -> Set[int]:
+    return {
+        code_key for (code_key,) in db.query(VerificationCode.code_key)
+        .filter(VerificationCode.code_key.in_(code_keys))
+    }
+
+
+# Codes already checked for uniqueness, so creation is a single INSERT
+code_pool = VerificationCodePool(
+    size=settings.VERIFICATION_CODE_POOL_SIZE,
+    low_water=settings.VERIFICATION_CODE_POOL_LOW_WATER,
+    probe=_existing_code_keys,
+)
+metrics.register_collector("verification_code_pool", code_pool.stats)
+
+# Attempts before giving up when a pooled code turns out to be taken
+CODE_INSERT_ATTEMPTS = 3
+
+# Keys of codes known to count uses on shard rows, so their verifies skip
+# the UPDATE of the code's own row (sharding is fixed when a code is created)
+sharded_codes = TTLCache(maxsize=10000, ttl=3600)
+
+# (error_message, message) pairs shared by single and batch verification
+INVALID_CODE = ("Invalid verification code", "Invalid verification code")
+CHANGED_CODE = (
+    "Code changed during verification",
+    "Verification code could not be verified, please try again"
+)
+DOMAIN_NOT_ALLOWED = (
+    "Employer domain not allowed",
+    "Verification code is not valid for your organization"
+)
+PENDING_APPROVAL_MESSAGE = "Verification is awaiting the employee's approval"
+THROTTLED_RESPONSE = VerificationResponse(
+    success=False,
+    message="Too many failed verification attempts, please try again later"
+)
+
+logger = logging.getLogger(__name__)
+
+
+class _IdBitmap:
+    """Set of non-negative integer ids stored as one bit each"""
+
+    def __init__(self):
+        self._bits = bytearray()
+
+    def __contains__(self, item: int) -> bool:
+        byte = item >> 3
+        return byte < len(self._bits) and bool(self._bits[byte] & (1 << (item & 7)))
+
+    def add(self, item: int) -> None:
+        byte = item >> 3
+        if byte >= len(self._bits):
+            # Grow geometrically as ids climb
+            self._bits.extend(bytes(max(byte + 1, 2 * len(self._bits)) - len(self._bits)))
+        self._bits[byte] |= 1 << (item & 7)
+
+    def discard(self, item: int) -> None:
+        byte = item >> 3
+        if byte < len(self._bits):
+            self._bits[byte] &= ~(1 << (item & 7)) & 0xFF
+
+    @property
+    def memory_bytes(self) -> int:
+        return len(self._bits)
+
+
+class LiveCodeFilter:
+    """
+    Per-worker counting Bloom filter of ACTIVE code keys, so a code that
+    is definitely not live is rejected without a query.
+
+    A bitmap of code ids records which keys this worker holds in the
+    filter: a key is added at most once and only removed if held, since
+    removing a key that was never added could knock out other live codes.
+    Codes created by other workers arrive through an incremental sync on
+    the id cursor, which re-reads the last SYNC_OVERLAP_IDS ids so rows
+    committed out of id order are not skipped; codes reactivated by other
+    workers arrive through their reactivated_at, re-read over the last
+    SYNC_OVERLAP_SECONDS. A miss triggers a sync when the last one is older
+    than VERIFICATION_CODE_FILTER_MAX_STALENESS_SECONDS. Codes other workers
+    take out of the active state stay as harmless false positives until a
+    sync re-reads them or the next rebuild.
+    """
+
+    SYNC_OVERLAP_IDS = 1000
+    SYNC_OVERLAP_SECONDS = 300
+
+    def __init__(self):
+        self.enabled = settings.VERIFICATION_CODE_FILTER_ENABLED
+        self._filter = self._new_filter()
+        self._held = _IdBitmap()
+        self._ready = False
+        self._last_id = 0
+        # Database time from which reactivations are re-read on sync
+        self._reactivated_since: Optional[datetime] = None
+        self._last_sync = 0.0
+        self._lock = threading.Lock()
+        metrics.register_collector("verification_code_filter", self.stats)
+
+    def _new_filter(self) -> CountingBloomFilter:
+        return CountingBloomFilter(
+            capacity=settings.VERIFICATION_CODE_FILTER_CAPACITY,
+            error_rate=settings.VERIFICATION_CODE_FILTER_ERROR_RATE,
+        )
+
+    def stats(self) -> dict:
+        return {
+            **self._filter.stats(),
+            "enabled": self.enabled,
+            "ready": self._ready,
+            "last_id": self._last_id,
+            "held_memory_bytes": self._held.memory_bytes,
+        }
+
+    @property
+    def filtering(self) -> bool:
+        """Whether misses are currently answered without a query"""
+        return self.enabled and self._ready
+
+    def might_contain(self, db: Session, code_key: int) -> bool:
+        """False only if the code is definitely not live"""
+        if not self.filtering or code_key in self._filter:
+            return True
+        if time.monotonic() - self._last_sync > settings.VERIFICATION_CODE_FILTER_MAX_STALENESS_SECONDS:
+            self.sync(db)
+            return code_key in self._filter
+        return False
+
+    def _sync_start(self, db: Session) -> datetime:
+        """Database time minus the overlap, from which the next sync re-reads reactivations"""
+        return db.scalar(select(func.now())) - timedelta(seconds=self.SYNC_OVERLAP_SECONDS)
+
+    def load(self, db: Session) -> None:
+        """Rebuild the filter by streaming the keys of all active codes"""
+        if not self.enabled:
+            return
+        with self._lock:
+            bloom = self._new_filter()
+            held = _IdBitmap()
+            reactivated_since = self._sync_start(db)
+            last_id = db.query(func.max(VerificationCode.id)).scalar() or 0
+            rows = (
+                db.query(VerificationCode.id, VerificationCode.code_key)
+                .filter(
+                    VerificationCode.id <= last_id,
+                    VerificationCode.status == VerificationCodeStatus.ACTIVE
+                )
+                .yield_per(10000)
+            )
+            for row_id, code_key in rows:
+                bloom.add(code_key)
+                held.add(row_id)
+            self._filter, self._held, self._last_id = bloom, held, last_id
+            self._reactivated_since = reactivated_since
+            self._last_sync = time.monotonic()
+            self._ready = True
+        logger.info(f"Loaded {bloom.count} active verification codes into the code filter")
+
+    def sync(self, db: Session) -> int:
+        """Add codes created or reactivated by other workers since the last sync"""
+        if not self.enabled:
+            return 0
+        if not self._ready or self._filter.is_saturated:
+            self.load(db)
+            return 0
+        with self._lock:
+            reactivated_since = self._sync_start(db)
+            columns = (VerificationCode.id, VerificationCode.code_key, VerificationCode.status)
+            rows = (
+                db.query(*columns)
+                .filter(VerificationCode.id > self._last_id - self.SYNC_OVERLAP_IDS)
+                .order_by(VerificationCode.id)
+                .all()
+            )
+            rows += (
+                db.query(*columns)
+                .filter(VerificationCode.reactivated_at >= self._reactivated_since)
+                .all()
+            )
+            added = 0
+            for row_id, code_key, status in rows:
+                if status == VerificationCodeStatus.ACTIVE:
+                    if row_id not in self._held:
+                        self._filter.add(code_key)
+                        self._held.add(row_id)
+                        added += 1
+                elif row_id in self._held:
+                    self._filter.remove(code_key)
+                    self._held.discard(row_id)
+                self._last_id = max(self._last_id, row_id)
+            self._reactivated_since = reactivated_since
+            self._last_sync = time.monotonic()
+        return added
+
+    def add(self, code: VerificationCode) -> None:
+        """Record a code this worker created or reactivated"""
+        if not self.enabled:
+            return
+        with self._lock:
+            if code.id not in self._held:
+                self._filter.add(code.code_key)
+                self._held.add(code.id)
+
+    def discard(self, code_id: int, code_key: int) -> None:
+        """Drop a code this worker took out of the active state"""
+        if not self.enabled:
+            return
+        with self._lock:
+            # Only keys this worker holds may be removed
+            if code_id in self._held:
+                self._filter.remove(code_key)
+                self._held.discard(code_id)
+
+
+live_codes = LiveCodeFilter()
+
+
+class ExpirySweeper:
+    """
+    Expires overdue codes in bounded batches, each claimed with FOR UPDATE
+    SKIP LOCKED and committed on its own, so sweepers on several workers
+    split a backlog instead of queueing on each other's locks.
+
+    The batch size doubles while full batches finish in under half of
+    VERIFICATION_EXPIRY_BATCH_TARGET_MS and halves when one overruns it.
+    A run stops at the first short batch or after
+    VERIFICATION_EXPIRY_SWEEP_MAX_SECONDS.
+    """
+
+    def __init__(
+        self,
+        min_batch: int,
+        max_batch: int,
+        target_seconds: float,
+        max_run_seconds: float,
+    ):
+        self.min_batch = min_batch
+        self.max_batch = max_batch
+        self.target_seconds = target_seconds
+        self.max_run_seconds = max_run_seconds
+        self.batch_size = min_batch
+        self.runs = 0
+        self.expired = 0
+        self.last_run_expired = 0
+        metrics.register_collector("verification_code_expiry", self.stats)
+
+    def _adapt(self, elapsed: float, full: bool) -> None:
+        if elapsed > self.target_seconds:
+            self.batch_size = max(self.min_batch, self.batch_size // 2)
+        elif full and elapsed < self.target_seconds / 2:
+            self.batch_size = min(self.max_batch, self.batch_size * 2)
+
+    def run(self, db: Session, expire_batch: Callable[[Session, int], int]) -> int:
+        """Call `expire_batch(db, limit)` until the backlog or time runs out"""
+        started = time.monotonic()
+        total = 0
+        while True:
+            limit = self.batch_size
+            batch_started = time.perf_counter()
+            count = expire_batch(db, limit)
+            elapsed = time.perf_counter() - batch_started
+            metrics.observe("verification_code_expiry.batch_seconds", elapsed)
+            total += count
+            full = count >= limit
+            self._adapt(elapsed, full)
+            if not full or time.monotonic() - started > self.max_run_seconds:
+                break
+        self.runs += 1
+        self.expired += total
+        self.last_run_expired = total
+        metrics.increment("verification_code_expiry.expired", total)
+        metrics.observe("verification_code_expiry.rows_per_run", total)
+        if total:
+            logger.info(f"Expired {total} verification codes")
+        return total
+
+    def stats(self) -> dict:
+        return {
+            "batch_size": self.batch_size,
+            "runs": self.runs,
+            "expired": self.expired,
+            "last_run_expired": self.last_run_expired,
+        }
+
+
+expiry_sweeper = ExpirySweeper(
+    min_batch=settings.VERIFICATION_EXPIRY_BATCH_MIN,
+    max_batch=settings.VERIFICATION_EXPIRY_BATCH_MAX,
+    target_seconds=settings.VERIFICATION_EXPIRY_BATCH_TARGET_MS / 1000,
+    max_run_seconds=settings.VERIFICATION_EXPIRY_SWEEP_MAX_SECONDS,
+)
 
 
 class CRUDVerificationCode(CRUDBase[VerificationCode, VerificationCodeCreate, VerificationCodeUpdate]):
     def create_with_employee(
         self, db: Session, *, obj_in: VerificationCodeCreate, employee_id: int
     ) -> VerificationCode:
-        # Generate unique verification code
-        code = create_verification_code()
-        
-        # Ensure uniqueness
-        while db.query(VerificationCode).filter(VerificationCode.code == code).first():
-            code = create_verification_code()
-        
         obj_in_data = obj_in.dict()
-        db_obj = VerificationCode(
-            **obj_in_data,
-            employee_id=employee_id,
-            code=code
-        )
-        db.add(db_obj)
-        db.commit()
-        db.refresh(db_obj)
-        return db_obj
+        shards = settings.VERIFICATION_USAGE_SHARDS
+        if shards < 2 or obj_in.max_usage_count < settings.VERIFICATION_USAGE_SHARD_MIN_USES:
+            shards = 0
+        for attempt in range(CODE_INSERT_ATTEMPTS):
+            db_obj = VerificationCode(
+                **obj_in_data,
+                employee_id=employee_id,
+                code_key=code_pool.take(db),
+                usage_shards=shards
+            )
+            db.add(db_obj)
+            try:
+                if shards:
+                    db.flush()
+                    self._create_shards(db, code=db_obj, uses=db_obj.max_usage_count)
+                db.commit()
+            except IntegrityError:
+                # Another worker issued the same code since the pool was filled
+                db.rollback()
+                metrics.increment("verification_code.insert_conflicts")
+                if attempt == CODE_INSERT_ATTEMPTS - 1:
+                    raise
+                continue
+            db.refresh(db_obj)
+            live_codes.add(db_obj)
+            return db_obj
+
+    def update(
+        self,
+        db: Session,
+        *,
+        db_obj: VerificationCode,
+        obj_in: Union[VerificationCodeUpdate, Dict[str, Any]]
+    ) -> VerificationCode:
+        was_active = db_obj.status == VerificationCodeStatus.ACTIVE
+        update_data = obj_in if isinstance(obj_in, dict) else obj_in.dict(exclude_unset=True)
+        if update_data.get("status") == VerificationCodeStatus.ACTIVE and not was_active:
+            # Lets other workers' live-code filters pick the code back up
+            obj_in = update_data = {**update_data, "reactivated_at": datetime.now(timezone.utc)}
+        max_usage_count = update_data.get("max_usage_count")
+        if (db_obj.usage_shards and max_usage_count is not None
+                and max_usage_count != db_obj.max_usage_count):
+            self._reshard(db, code=db_obj, max_usage_count=max_usage_count)
+        code = super().update(db, db_obj=db_obj, obj_in=obj_in)
+        is_active = code.status == VerificationCodeStatus.ACTIVE
+        if was_active and not is_active:
+            live_codes.discard(code.id, code.code_key)
+        elif is_active and not was_active:
+            live_codes.add(code)
+        return code
+
+    def remove(self, db: Session, *, id: int) -> VerificationCode:
+        code = super().remove(db, id=id)
+        if code.status == VerificationCodeStatus.ACTIVE:
+            live_codes.discard(code.id, code.code_key)
+        return code
+
+    def refill_code_pool(self, db: Session) -> int:
+        """Top up the code pool when it is running low"""
+        if not code_pool.needs_refill():
+            return 0
+        return code_pool.refill(db)
 
     def get_multi_by_employee(
         self, db: Session, *, employee_id: int, skip: int = 0, limit: int = 100
@@ -46,11 +413,17 @@ class CRUDVerificationCode(CRUDBase[VerificationCode, VerificationCodeCreate, Ve
         )
 
     def get_by_code(self, db: Session, *, code: str) -> Optional[VerificationCode]:
+        code_key = parse_verification_code(code)
+        if code_key is None:
+            return None
+        return self.get_by_code_key(db, code_key=code_key)
+
+    def get_by_code_key(self, db: Session, *, code_key: int) -> Optional[VerificationCode]:
         return (
             db.query(self.model)
             .options(joinedload(VerificationCode.employment))
             .options(joinedload(VerificationCode.employee))
-            .filter(VerificationCode.code == code)
+            .filter(VerificationCode.code_key == code_key)
             .first()
         )
 
@@ -68,24 +441,106 @@ class CRUDVerificationCode(CRUDBase[VerificationCode, VerificationCodeCreate, Ve
         )
 
     def revoke(self, db: Session, *, code: VerificationCode) -> VerificationCode:
+        was_active = code.status == VerificationCodeStatus.ACTIVE
         code.status = VerificationCodeStatus.REVOKED
         db.add(code)
         db.commit()
         db.refresh(code)
+        if was_active:
+            live_codes.discard(code.id, code.code_key)
         return code
 
-    def expire_old_codes(self, db: Session) -> int:
-        """Expire codes that have passed their expiry time"""
-        expired_count = (
-            db.query(self.model)
-            .filter(
+    def expire_old_codes(self, db: Session, *, limit: Optional[int] = None) -> int:
+        """
+        Expire codes that have passed their expiry time, oldest first and at
+        most `limit` of them. Rows locked by another sweeper or a verify in
+        flight are skipped rather than waited for.
+        """
+        due = (
+            select(VerificationCode.id)
+            .where(
                 VerificationCode.status == VerificationCodeStatus.ACTIVE,
-                VerificationCode.expires_at <= datetime.utcnow()
+                VerificationCode.expires_at <= func.now()
             )
-            .update({VerificationCode.status: VerificationCodeStatus.EXPIRED})
+            .order_by(VerificationCode.expires_at)
+            .limit(limit)
+            .with_for_update(skip_locked=True, key_share=True)
+        )
+        expired = db.execute(
+            update(VerificationCode)
+            .where(
+                VerificationCode.id.in_(due),
+                VerificationCode.status == VerificationCodeStatus.ACTIVE
+            )
+            .values(status=VerificationCodeStatus.EXPIRED)
+            .returning(VerificationCode.id, VerificationCode.code_key)
+            .execution_options(synchronize_session=False)
+        ).all()
+        db.commit()
+        for code_id, code_key in expired:
+            live_codes.discard(code_id, code_key)
+        return len(expired)
+
+    def sweep_expired_codes(self, db: Session) -> int:
+        """Expire overdue codes in adaptively sized batches"""
+        return expiry_sweeper.run(
+            db, lambda db, limit: self.expire_old_codes(db, limit=limit)
+        )
+
+    def reconcile_usage(self, db: Session, *, code_ids: Optional[List[int]] = None) -> int:
+        """
+        Fold the shard counts of active sharded codes (or of `code_ids`) into
+        their current_usage_count, marking codes with no quota left USED.
+        Returns the number of codes updated.
+        """
+        Shard = VerificationCodeUsageShard
+        live = select(VerificationCode.id).where(
+            VerificationCode.usage_shards > 0,
+            VerificationCode.status == VerificationCodeStatus.ACTIVE
+        )
+        if code_ids is not None:
+            live = live.where(VerificationCode.id.in_(code_ids))
+        totals = (
+            select(Shard.code_id, func.sum(Shard.quota - Shard.used).label("remaining"))
+            .where(Shard.code_id.in_(live))
+            .group_by(Shard.code_id)
+            .subquery()
         )
+        # Shards hold every use not yet counted on the row when it was sharded
+        usage = VerificationCode.max_usage_count - totals.c.remaining
+        used_up = totals.c.remaining <= 0
+        updated = db.execute(
+            update(VerificationCode)
+            .where(
+                VerificationCode.id == totals.c.code_id,
+                VerificationCode.status == VerificationCodeStatus.ACTIVE,
+                or_(VerificationCode.current_usage_count != usage, used_up)
+            )
+            .values(
+                current_usage_count=usage,
+                last_used_at=func.now(),
+                status=case(
+                    (used_up, literal(VerificationCodeStatus.USED, VerificationCode.status.type)),
+                    else_=VerificationCode.status
+                )
+            )
+            .returning(VerificationCode.id, VerificationCode.code_key, VerificationCode.status)
+            .execution_options(synchronize_session=False)
+        ).all()
         db.commit()
-        return expired_count
+        for code_id, code_key, status in updated:
+            if status == VerificationCodeStatus.USED:
+                live_codes.discard(code_id, code_key)
+        metrics.increment("verification_code_usage.reconciled", len(updated))
+        return len(updated)
+
+    def sync_live_codes(self, db: Session) -> int:
+        return live_codes.sync(db)
+
+    def load_live_codes(self, db: Session) -> dict:
+        """Rebuild this worker's live-code filter"""
+        live_codes.load(db)
+        return live_codes.stats()
 
     def verify_code(
         self, 
@@ -99,134 +554,684 @@ class CRUDVerificationCode(CRUDBase[VerificationCode, VerificationCodeCreate, Ve
     ) -> VerificationResponse:
         """Verify a verification code and log the access"""
         
-        # Get the verification code
-        verification_code = self.get_by_code(db, code=code)
+        # Reject throttled callers before running any query
+        if verification_throttle.is_blocked(employer_id, ip_address):
+            verification_throttle.record_blocked(employer_id, ip_address, user_agent)
+            return THROTTLED_RESPONSE
         
-        if not verification_code:
-            # Log failed attempt
-            self._log_access_attempt(
+        log_context = dict(
+            employer_id=employer_id,
+            ip_address=ip_address,
+            user_agent=user_agent,
+            request_purpose=request_purpose
+        )
+        
+        # Malformed codes and codes missing from the live-code filter are
+        # rejected without a query
+        code_key = parse_verification_code(code)
+        if code_key is None or not live_codes.might_contain(db, code_key):
+            if code_key is not None:
+                metrics.increment("verification_code_filter.rejected")
+            if self._log_access_attempt(
                 db,
                 verification_code_id=None,
-                employer_id=employer_id,
                 success=False,
-                error_message="Invalid verification code",
-                ip_address=ip_address,
-                user_agent=user_agent,
-                request_purpose=request_purpose
-            )
-            return VerificationResponse(
+                error_message=INVALID_CODE[0],
+                **log_context
+            ):
+                db.commit()
+            verification_throttle.record_failure(employer_id, ip_address)
+            return VerificationResponse(success=False, message=INVALID_CODE[1])
+        
+        # Consume one use in a single statement; the WHERE clause makes
+        # concurrent verifications of the same code serialize on its row,
+        # or on one of its shard rows if it is sharded
+        sharded = sharded_codes.get(code_key) is not None
+        if sharded:
+            consumed = self._consume_sharded(db, code_key=code_key)
+        else:
+            consumed = self._consume(db, code_key=code_key)
+        if consumed is None:
+            row = self._code_state(db, code_key=code_key)
+            if row is not None and row.usage_shards and not sharded:
+                # First verify of a sharded code on this worker
+                sharded_codes.set(code_key, True)
+                consumed = self._consume_sharded(db, code_key=code_key)
+            if consumed is None:
+                return self._reject(db, code_key=code_key, row=row, log_context=log_context)
+        
+        (code_id, employee_id, employment_id, status, version,
+         allowed_domains, require_approval) = consumed
+        if allowed_domains and not self._domain_allowed(
+            db, employer_id=employer_id, allowed_domains=allowed_domains
+        ):
+            # Give the use back by discarding the uncommitted UPDATE
+            db.rollback()
+            if self._log_access_attempt(
+                db,
+                verification_code_id=code_id,
                 success=False,
-                message="Invalid verification code"
-            )
+                error_message=DOMAIN_NOT_ALLOWED[0],
+                **log_context
+            ):
+                db.commit()
+            return VerificationResponse(success=False, message=DOMAIN_NOT_ALLOWED[1])
         
-        # Check if code is active
-        if verification_code.status != VerificationCodeStatus.ACTIVE:
-            self._log_access_attempt(
+        if require_approval:
+            # Hold the data back until the employee approves the request
+            (ticket_id,) = crud_access_log.insert_many(db, [self._access_log_row(
+                verification_code_id=code_id,
+                success=True,
+                requires_approval=True,
+                approval_status="pending",
+                **log_context
+            )])
+            result = self._pending_approval(ticket_id)
+        else:
+            result = self._verified(
                 db,
-                verification_code_id=verification_code.id,
+                code_id=code_id,
                 employer_id=employer_id,
-                success=False,
-                error_message=f"Code is {verification_code.status.value}",
-                ip_address=ip_address,
-                user_agent=user_agent,
-                request_purpose=request_purpose
+                employee_id=employee_id,
+                employment_id=employment_id,
+                version=version
             )
-            return VerificationResponse(
-                success=False,
-                message=f"Verification code is {verification_code.status.value}"
-            )
-        
-        # Check if code has expired
-        if verification_code.expires_at <= datetime.utcnow():
-            verification_code.status = VerificationCodeStatus.EXPIRED
-            db.add(verification_code)
-            db.commit()
             
+            # Log successful access
             self._log_access_attempt(
                 db,
-                verification_code_id=verification_code.id,
-                employer_id=employer_id,
-                success=False,
-                error_message="Code has expired",
-                ip_address=ip_address,
-                user_agent=user_agent,
-                request_purpose=request_purpose
-            )
-            return VerificationResponse(
-                success=False,
-                message="Verification code has expired"
+                verification_code_id=code_id,
+                success=True,
+                data_accessed=result.data,
+                **log_context
             )
         
-        # Check usage count
-        if verification_code.current_usage_count >= verification_code.max_usage_count:
-            self._log_access_attempt(
+        db.commit()
+        if status == VerificationCodeStatus.USED:
+            live_codes.discard(code_id, code_key)
+        if require_approval:
+            self._announce_pending(
                 db,
-                verification_code_id=verification_code.id,
+                employee_id=employee_id,
                 employer_id=employer_id,
-                success=False,
-                error_message="Code usage limit exceeded",
-                ip_address=ip_address,
-                user_agent=user_agent,
-                request_purpose=request_purpose
+                code_id=code_id,
+                access_log_id=result.access_log_id
             )
-            return VerificationResponse(
-                success=False,
-                message="Verification code usage limit exceeded"
-            )
-        
-        # Code is valid, increment usage count
-        verification_code.current_usage_count += 1
-        verification_code.last_used_at = datetime.utcnow()
-        
-        # If max usage reached, mark as used
-        if verification_code.current_usage_count >= verification_code.max_usage_count:
-            verification_code.status = VerificationCodeStatus.USED
-        
-        db.add(verification_code)
-        
-        # Prepare response data
-        employment = verification_code.employment
-        employee = verification_code.employee
         
-        response_data = {
-            "employment_id": employment.id,
-            "company_name": employment.company_name,
-            "job_title": employment.job_title,
-            "employment_type": employment.employment_type.value,
-            "employment_status": employment.employment_status.value,
-            "start_date": employment.start_date.isoformat(),
-            "end_date": employment.end_date.isoformat() if employment.end_date else None,
-            "department": employment.department,
-            "location": employment.company_location,
-            "is_verified": employment.is_verified,
-            "verification_date": employment.verification_date.isoformat() if employment.verification_date else None
-        }
+        return result
+    
+    def verify_codes(
+        self,
+        db: Session,
+        *,
+        codes: List[str],
+        employer_id: int,
+        ip_address: str = None,
+        user_agent: str = None,
+        request_purpose: str = None
+    ) -> List[VerificationResponse]:
+        """
+        Verify several codes at once, answering each exactly as a run of
+        verify_code calls in input order would. The codes are resolved with
+        one locking IN query, consumed with one conditional UPDATE and
+        logged with one multi-row INSERT; results come back in input order.
+        """
+        # Reject throttled callers before running any query
+        if verification_throttle.is_blocked(employer_id, ip_address):
+            for _ in codes:
+                verification_throttle.record_blocked(employer_id, ip_address, user_agent)
+            return [THROTTLED_RESPONSE] * len(codes)
         
-        # Log successful access
-        self._log_access_attempt(
-            db,
-            verification_code_id=verification_code.id,
+        log_context = dict(
             employer_id=employer_id,
-            success=True,
-            data_accessed=response_data,
             ip_address=ip_address,
             user_agent=user_agent,
             request_purpose=request_purpose
         )
+        keys = [parse_verification_code(code) for code in codes]
+        live = {
+            key for key in set(keys)
+            if key is not None and live_codes.might_contain(db, key)
+        }
+        rows = self._lock_codes(db, code_keys=live) if live else {}
+        
+        # Replay the calls in order against the locked rows: statuses and
+        # usage counts advance as they would between separate requests
+        state = {key: [row.status, row.current_usage_count] for key, row in rows.items()}
+        outcomes: List[Any] = [None] * len(keys)
+        grants: Dict[int, int] = {}
+        final_status: Dict[int, VerificationCodeStatus] = {}
+        # Sharded codes take their uses from shard rows as they go
+        sharded_taken: Set[int] = set()
+        sharded_used_up: Set[int] = set()
+        # Failures earlier in the batch can still throttle the rest
+        blocked = False
+        for i, key in enumerate(keys):
+            if blocked:
+                verification_throttle.record_blocked(employer_id, ip_address, user_agent)
+                outcomes[i] = THROTTLED_RESPONSE
+                continue
+            row = rows.get(key)
+            status, usage = state[key] if row is not None else (None, 0)
+            if key is None or key not in live or row is None or (
+                row.id in final_status and live_codes.filtering
+            ):
+                # Malformed, filtered out, missing (a filter false positive
+                # or a deleted code), or dropped from the filter by an
+                # earlier code in this batch
+                if key is not None and (key not in live or row is not None):
+                    metrics.increment("verification_code_filter.rejected")
+                outcomes[i] = (None, INVALID_CODE)
+            elif status != VerificationCodeStatus.ACTIVE:
+                outcomes[i] = (row.id, self._rejection(status))
+            elif row.expired:
+                state[key][0] = final_status[row.id] = VerificationCodeStatus.EXPIRED
+                outcomes[i] = (row.id, self._rejection(status, expired=True))
+            elif not row.usage_shards and usage >= row.max_usage_count:
+                outcomes[i] = (row.id, self._rejection(status, exhausted=True))
+            elif row.allowed_domains and not self._domain_allowed(
+                db, employer_id=employer_id, allowed_domains=row.allowed_domains
+            ):
+                outcomes[i] = (row.id, DOMAIN_NOT_ALLOWED)
+            elif row.usage_shards:
+                if self._take_shard_use(db, code_id=row.id):
+                    sharded_taken.add(row.id)
+                    outcomes[i] = row
+                    continue
+                sharded_used_up.add(row.id)
+                outcomes[i] = (row.id, self._rejection(status, exhausted=True))
+            else:
+                state[key][1] = usage = usage + 1
+                grants[row.id] = grants.get(row.id, 0) + 1
+                if usage >= row.max_usage_count:
+                    state[key][0] = final_status[row.id] = VerificationCodeStatus.USED
+                outcomes[i] = row
+                continue
+            if outcomes[i][1] is INVALID_CODE:
+                # Only guesses count towards the brute-force throttle
+                verification_throttle.record_failure(employer_id, ip_address)
+                blocked = verification_throttle.is_blocked(employer_id, ip_address)
         
+        applied = self._apply_batch(db, grants=grants, final_status=final_status)
+        applied |= sharded_taken
+        
+        results: List[Optional[VerificationResponse]] = []
+        log_rows = []
+        # (result index, row) of codes waiting for the employee's approval
+        pending = []
+        for outcome in outcomes:
+            if isinstance(outcome, VerificationResponse):
+                results.append(outcome)
+                continue
+            if isinstance(outcome, tuple):
+                code_id, (error_message, message) = outcome
+                if code_id is not None and code_id not in applied and code_id in final_status:
+                    # The expiry was not applied: the row changed under us
+                    error_message, message = CHANGED_CODE
+            elif outcome.id in applied and outcome.require_approval:
+                pending.append((len(results), outcome))
+                log_rows.append(self._access_log_row(
+                    verification_code_id=outcome.id,
+                    success=True,
+                    requires_approval=True,
+                    approval_status="pending",
+                    **log_context
+                ))
+                results.append(None)
+                continue
+            elif outcome.id in applied:
+                result = self._verified(
+                    db,
+                    code_id=outcome.id,
+                    employer_id=employer_id,
+                    employee_id=outcome.employee_id,
+                    employment_id=outcome.employment_id,
+                    version=outcome.version
+                )
+                log_rows.append(self._access_log_row(
+                    verification_code_id=outcome.id,
+                    success=True,
+                    data_accessed=result.data,
+                    **log_context
+                ))
+                results.append(result)
+                continue
+            else:
+                code_id, (error_message, message) = outcome.id, CHANGED_CODE
+            log_rows.append(self._access_log_row(
+                verification_code_id=code_id,
+                success=False,
+                error_message=error_message,
+                **log_context
+            ))
+            results.append(VerificationResponse(success=False, message=message))
+        
+        kept = [row for row in log_rows if not self._queue_access_log(row)]
+        log_ids = crud_access_log.insert_many(db, kept)
         db.commit()
+        code_keys = {row.id: key for key, row in rows.items()}
+        for code_id in applied & final_status.keys():
+            live_codes.discard(code_id, code_keys[code_id])
+        if sharded_used_up:
+            self.reconcile_usage(db, code_ids=list(sharded_used_up))
         
+        # Pending tickets are never queued, so they are among the kept rows
+        ticket_ids = [
+            log_id for row, log_id in zip(kept, log_ids) if row["requires_approval"]
+        ]
+        for (index, outcome), ticket_id in zip(pending, ticket_ids):
+            results[index] = self._pending_approval(ticket_id)
+            self._announce_pending(
+                db,
+                employee_id=outcome.employee_id,
+                employer_id=employer_id,
+                code_id=outcome.id,
+                access_log_id=ticket_id
+            )
+        return results
+    
+    def _lock_codes(self, db: Session, *, code_keys: Set[int]) -> Dict[int, Any]:
+        """Fetch and lock the rows for a batch of code keys, keyed by code_key"""
+        return {
+            row.code_key: row for row in db.execute(
+                select(
+                    VerificationCode.id,
+                    VerificationCode.code_key,
+                    VerificationCode.employee_id,
+                    VerificationCode.employment_id,
+                    VerificationCode.status,
+                    VerificationCode.current_usage_count,
+                    VerificationCode.max_usage_count,
+                    (VerificationCode.expires_at <= func.now()).label("expired"),
+                    select(Employment.updated_at)
+                    .where(Employment.id == VerificationCode.employment_id)
+                    .scalar_subquery()
+                    .label("version"),
+                    VerificationCode.allowed_domains,
+                    VerificationCode.require_approval,
+                    VerificationCode.usage_shards
+                )
+                .where(VerificationCode.code_key.in_(code_keys))
+                # In id order, so overlapping batches lock rows in one order;
+                # FOR NO KEY UPDATE, so it doesn't block the KEY SHARE lock of
+                # a single verify inserting its log while holding a shard
+                .order_by(VerificationCode.id)
+                .with_for_update(of=VerificationCode, key_share=True)
+            )
+        }
+    
+    def _apply_batch(
+        self,
+        db: Session,
+        *,
+        grants: Dict[int, int],
+        final_status: Dict[int, VerificationCodeStatus]
+    ) -> Set[int]:
+        """
+        Apply a batch's usage grants and status changes in one conditional
+        UPDATE. Returns the ids it applied to; the conditions re-check
+        what the batch saw, so a row changed since it was read is skipped.
+        """
+        ids = list(grants.keys() | final_status.keys())
+        if not ids:
+            return set()
+        granted_ids = list(grants)
+        granted = case(grants, value=VerificationCode.id, else_=0) if grants else literal(0)
+        expiring = [code_id for code_id in ids if code_id not in grants]
+        status_type = VerificationCode.status.type
+        return set(db.scalars(
+            update(VerificationCode)
+            .where(
+                VerificationCode.id.in_(ids),
+                VerificationCode.status == VerificationCodeStatus.ACTIVE,
+                or_(
+                    and_(
+                        VerificationCode.id.in_(granted_ids),
+                        VerificationCode.expires_at > func.now(),
+                        VerificationCode.current_usage_count + granted
+                        <= VerificationCode.max_usage_count
+                    ),
+                    and_(
+                        VerificationCode.id.in_(expiring),
+                        VerificationCode.expires_at <= func.now()
+                    )
+                )
+            )
+            .values(
+                current_usage_count=VerificationCode.current_usage_count + granted,
+                last_used_at=case(
+                    (VerificationCode.id.in_(granted_ids), func.now()),
+                    else_=VerificationCode.last_used_at
+                ),
+                status=case(
+                    {
+                        code_id: literal(status, status_type)
+                        for code_id, status in final_status.items()
+                    },
+                    value=VerificationCode.id,
+                    else_=VerificationCode.status
+                ) if final_status else VerificationCode.status
+            )
+            .returning(VerificationCode.id)
+            .execution_options(synchronize_session=False)
+        ))
+    
+    def _verified(
+        self,
+        db: Session,
+        *,
+        code_id: int,
+        employer_id: int,
+        employee_id: int,
+        employment_id: int,
+        version: Optional[datetime]
+    ) -> VerificationResponse:
+        """Build the signed response for a consumed code from cached snapshots"""
+        response_data = crud_employment.get_snapshot(
+            db, employment_id=employment_id, version=version
+        )
+        employee = crud_user.get_principal(db, id=employee_id)
+        verified_at = datetime.utcnow()
         return VerificationResponse(
             success=True,
             message="Employment verification successful",
             data=response_data,
             employee_name=employee.full_name,
-            company_name=employment.company_name,
-            job_title=employment.job_title,
-            employment_status=employment.employment_status.value,
-            verification_date=datetime.utcnow()
+            company_name=response_data["company_name"],
+            job_title=response_data["job_title"],
+            employment_status=response_data["employment_status"],
+            verification_date=verified_at,
+            receipt=create_verification_receipt(
+                verification_code_id=code_id,
+                employer_id=employer_id,
+                employee_name=employee.full_name,
+                data=response_data,
+                verified_at=verified_at
+            )
+        )
+    
+    @staticmethod
+    def _pending_approval(access_log_id: int) -> VerificationResponse:
+        return VerificationResponse(
+            success=False,
+            message=PENDING_APPROVAL_MESSAGE,
+            approval_status="pending",
+            access_log_id=access_log_id
+        )
+    
+    def _announce_pending(
+        self,
+        db: Session,
+        *,
+        employee_id: int,
+        employer_id: int,
+        code_id: int,
+        access_log_id: int
+    ) -> None:
+        """Tell the employee's open long-polls about a new pending request"""
+        employer = crud_user.get_principal(db, id=employer_id)
+        pubsub.publish(approval_requests_channel(employee_id), {
+            "type": "approval_requested",
+            "access_log_id": access_log_id,
+            "verification_code_id": code_id,
+            "employer_id": employer_id,
+            "employer_name": employer.company_name or employer.full_name,
+        })
+    
+    def _domain_allowed(
+        self, db: Session, *, employer_id: int, allowed_domains: str
+    ) -> bool:
+        """Whether the employer's email or website domain is allowed"""
+        employer = crud_user.get_principal(db, id=employer_id)
+        matcher = compile_allowed_domains(allowed_domains)
+        return any(
+            matcher.matches(domain)
+            for domain in employer_domains(employer.email, employer.company_website)
+        )
+    
+    @staticmethod
+    def _rejection(
+        status: Optional[VerificationCodeStatus],
+        *,
+        expired: bool = False,
+        exhausted: bool = False
+    ) -> Tuple[str, str]:
+        """(error_message, message) for a code that could not be consumed"""
+        if status is None:
+            return INVALID_CODE
+        if status != VerificationCodeStatus.ACTIVE:
+            return f"Code is {status.value}", f"Verification code is {status.value}"
+        if expired:
+            return "Code has expired", "Verification code has expired"
+        if exhausted:
+            return "Code usage limit exceeded", "Verification code usage limit exceeded"
+        return CHANGED_CODE
+    
+    def _consume(self, db: Session, *, code_key: int):
+        """
+        Take one use of a live code. Returns (id, employee_id, employment_id,
+        status, employment updated_at, allowed_domains, require_approval)
+        or None.
+        """
+        used_up = VerificationCode.current_usage_count + 1 >= VerificationCode.max_usage_count
+        return db.execute(
+            update(VerificationCode)
+            .where(
+                VerificationCode.code_key == code_key,
+                VerificationCode.status == VerificationCodeStatus.ACTIVE,
+                VerificationCode.expires_at > func.now(),
+                VerificationCode.current_usage_count < VerificationCode.max_usage_count,
+                VerificationCode.usage_shards == 0
+            )
+            .values(
+                current_usage_count=VerificationCode.current_usage_count + 1,
+                last_used_at=func.now(),
+                status=case(
+                    (used_up, literal(VerificationCodeStatus.USED, VerificationCode.status.type)),
+                    else_=VerificationCode.status
+                )
+            )
+            .returning(
+                VerificationCode.id,
+                VerificationCode.employee_id,
+                VerificationCode.employment_id,
+                VerificationCode.status,
+                select(Employment.updated_at)
+                .where(Employment.id == VerificationCode.employment_id)
+                .scalar_subquery(),
+                VerificationCode.allowed_domains,
+                VerificationCode.require_approval
+            )
+            .execution_options(synchronize_session=False)
+        ).first()
+    
+    def _consume_sharded(self, db: Session, *, code_key: int):
+        """
+        Take one use of a live sharded code from one of its shard rows.
+        Returns the same tuple as _consume, or None; the code's own row is
+        only read.
+        """
+        row = db.execute(
+            select(
+                VerificationCode.id,
+                VerificationCode.employee_id,
+                VerificationCode.employment_id,
+                VerificationCode.status,
+                select(Employment.updated_at)
+                .where(Employment.id == VerificationCode.employment_id)
+                .scalar_subquery(),
+                VerificationCode.allowed_domains,
+                VerificationCode.require_approval
+            )
+            .where(
+                VerificationCode.code_key == code_key,
+                VerificationCode.status == VerificationCodeStatus.ACTIVE,
+                VerificationCode.expires_at > func.now(),
+                VerificationCode.usage_shards > 0
+            )
+        ).first()
+        if row is None or not self._take_shard_use(db, code_id=row.id):
+            return None
+        return row
+    
+    def _take_shard_use(self, db: Session, *, code_id: int) -> bool:
+        """
+        Count one use on a random shard of the code with quota left, skipping
+        shards locked by verifies in flight. Only when every such shard is
+        locked does it wait for one, so a code is never reported used up
+        while a use taken by a transaction that may roll back is pending.
+        """
+        if self._take_shard(db, code_id=code_id, skip_locked=True):
+            return True
+        Shard = VerificationCodeUsageShard
+        quota_left = exists().where(Shard.code_id == code_id, Shard.used < Shard.quota)
+        while db.scalar(select(quota_left)):
+            metrics.increment("verification_code_usage.shard_waits")
+            if self._take_shard(db, code_id=code_id, skip_locked=False):
+                return True
+        return False
+    
+    def _take_shard(self, db: Session, *, code_id: int, skip_locked: bool) -> bool:
+        Shard = VerificationCodeUsageShard
+        pick = (
+            select(Shard.id)
+            .where(Shard.code_id == code_id, Shard.used < Shard.quota)
+            .order_by(func.random())
+            .limit(1)
+        )
+        # Without SKIP LOCKED the pick is not locked: the UPDATE waits for the
+        # shard and re-checks its quota, so a waiter never holds a shard it
+        # did not take. Shard holders then only need KEY SHARE on the code
+        # row (for their log's foreign key), which the FOR NO KEY UPDATE of
+        # batches and resharding doesn't block, so they cannot deadlock
+        if skip_locked:
+            pick = pick.with_for_update(skip_locked=True)
+        return db.execute(
+            update(Shard)
+            .where(Shard.id == pick.scalar_subquery(), Shard.used < Shard.quota)
+            .values(used=Shard.used + 1)
+            .returning(Shard.id)
+            .execution_options(synchronize_session=False)
+        ).first() is not None
+    
+    def _create_shards(self, db: Session, *, code: VerificationCode, uses: int) -> None:
+        """Split `uses` remaining uses of a code across its shard rows"""
+        count = max(1, min(code.usage_shards, uses))
+        quota, extra = divmod(uses, count)
+        db.execute(insert(VerificationCodeUsageShard), [
+            {"code_id": code.id, "shard": shard, "quota": quota + (shard < extra), "used": 0}
+            for shard in range(count)
+        ])
+    
+    def _reshard(self, db: Session, *, code: VerificationCode, max_usage_count: int) -> None:
+        """
+        Re-split a sharded code's remaining uses for a new max_usage_count,
+        counting the uses taken so far onto its row. Locks the code's row
+        before its shards, in the same order and with the same FOR NO KEY
+        UPDATE lock as batch verification.
+        """
+        Shard = VerificationCodeUsageShard
+        db.refresh(code, with_for_update={"key_share": True})
+        remaining = sum(db.scalars(
+            select(Shard.quota - Shard.used)
+            .where(Shard.code_id == code.id)
+            .with_for_update()
+        ))
+        code.current_usage_count = code.max_usage_count - remaining
+        db.execute(delete(Shard).where(Shard.code_id == code.id))
+        self._create_shards(
+            db, code=code, uses=max(0, max_usage_count - code.current_usage_count)
+        )
+    
+    def _code_state(self, db: Session, *, code_key: int):
+        return (
+            db.query(
+                VerificationCode.id,
+                VerificationCode.status,
+                VerificationCode.current_usage_count,
+                VerificationCode.max_usage_count,
+                VerificationCode.usage_shards
+            )
+            .filter(VerificationCode.code_key == code_key)
+            .first()
+        )
+    
+    def _reject(
+        self, db: Session, *, code_key: int, row: Any, log_context: dict
+    ) -> VerificationResponse:
+        """Work out why a code could not be consumed and log the failure"""
+        code_id = row.id if row is not None else None
+        status = row.status if row is not None else None
+        expired = status == VerificationCodeStatus.ACTIVE and self._expire(db, code_id=row.id)
+        if expired:
+            live_codes.discard(row.id, code_key)
+        # Falls through to CHANGED_CODE if the row changed between the two
+        # statements, e.g. was reactivated
+        # A sharded code's row lags its shards; if none had a use to give,
+        # it is used up
+        exhausted = row is not None and (
+            bool(row.usage_shards) or row.current_usage_count >= row.max_usage_count
+        )
+        error_message, message = self._rejection(status, expired=expired, exhausted=exhausted)
+        
+        self._log_access_attempt(
+            db,
+            verification_code_id=code_id,
+            success=False,
+            error_message=error_message,
+            **log_context
         )
+        db.commit()
+        if exhausted and row.usage_shards and not expired:
+            # Mark it USED now rather than at the next reconcile
+            self.reconcile_usage(db, code_ids=[row.id])
+        if row is None:
+            # Only guesses count towards the brute-force throttle; expired,
+            # used or changed codes are real ones
+            verification_throttle.record_failure(
+                log_context["employer_id"], log_context["ip_address"]
+            )
+        return VerificationResponse(success=False, message=message)
     
+    def _expire(self, db: Session, *, code_id: int) -> bool:
+        """Mark an active code past its expiry as expired"""
+        return db.execute(
+            update(VerificationCode)
+            .where(
+                VerificationCode.id == code_id,
+                VerificationCode.status == VerificationCodeStatus.ACTIVE,
+                VerificationCode.expires_at <= func.now()
+            )
+            .values(status=VerificationCodeStatus.EXPIRED)
+            .returning(VerificationCode.id)
+            .execution_options(synchronize_session=False)
+        ).first() is not None
+    
+    def flush_blocked_attempts(self, db: Session) -> int:
+        """Write one summary access log row per throttled employer and IP"""
+        summaries = verification_throttle.drain_blocked()
+        for summary in summaries:
+            self._log_access_attempt(
+                db,
+                verification_code_id=None,
+                employer_id=summary["employer_id"],
+                success=False,
+                error_message=(
+                    f"{summary['count']} verification attempts blocked "
+                    "after repeated failures"
+                ),
+                ip_address=summary["ip_address"],
+                user_agent=summary["user_agent"],
+                request_data={
+                    "blocked_attempts": summary["count"],
+                    "first_attempt_at": summary["first_attempt_at"].isoformat(),
+                    "last_attempt_at": summary["last_attempt_at"].isoformat(),
+                }
+            )
+        if summaries:
+            db.commit()
+        return len(summaries)
+
     def _log_access_attempt(
         self,
         db: Session,
@@ -236,22 +1241,72 @@ class CRUDVerificationCode(CRUDBase[VerificationCode, VerificationCodeCreate, Ve
         success: bool,
         error_message: str = None,
         data_accessed: dict = None,
+        request_data: dict = None,
         ip_address: str = None,
         user_agent: str = None,
         request_purpose: str = None
-    ):
-        """Log an access attempt"""
-        access_log = AccessLog(
+    ) -> bool:
+        """
+        Log an access attempt. Returns True if the row was written in the
+        session's transaction and the caller must commit, False if it was
+        queued.
+        """
+        row = self._access_log_row(
             verification_code_id=verification_code_id,
             employer_id=employer_id,
             success=success,
             error_message=error_message,
             data_accessed=data_accessed,
+            request_data=request_data,
             ip_address=ip_address,
             user_agent=user_agent,
             request_purpose=request_purpose
         )
-        db.add(access_log)
+        if self._queue_access_log(row):
+            return False
+        crud_access_log.insert_many(db, [row])
+        return True
 
+    @staticmethod
+    def _access_log_row(
+        *,
+        verification_code_id: Optional[int],
+        employer_id: int,
+        success: bool,
+        error_message: str = None,
+        data_accessed: dict = None,
+        request_data: dict = None,
+        ip_address: str = None,
+        user_agent: str = None,
+        request_purpose: str = None,
+        requires_approval: bool = False,
+        approval_status: str = None
+    ) -> Dict[str, Any]:
+        # Every row carries the same keys so a batch is one multi-row INSERT
+        return dict(
+            verification_code_id=verification_code_id,
+            employer_id=employer_id,
+            success=success,
+            error_message=error_message,
+            data_accessed=data_accessed,
+            request_data=request_data,
+            ip_address=ip_address,
+            user_agent=user_agent,
+            request_purpose=request_purpose,
+            requires_approval=requires_approval,
+            approval_status=approval_status,
+            accessed_at=datetime.now(timezone.utc)
+        )
+
+    @staticmethod
+    def _queue_access_log(row: Dict[str, Any]) -> bool:
+        """
+        Hand a failed attempt's row to the batched writer. Returns False if
+        the row must be written in the request transaction instead.
+        """
+        durable = row["requires_approval"] or (
+            row["success"] and settings.ACCESS_LOG_SYNC_SUCCESS
+        )
+        return not durable and access_log_writer.submit(row)
 
 verification_code = CRUDVerificationCode(VerificationCode)
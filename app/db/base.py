@@ -2,5 +2,7 @@
 from app.db.session import Base
 from app.models.user import User
 from app.models.employment import Employment
-from app.models.verification_code import VerificationCode
-from app.models.access_log import AccessLog
+from app.models.verification_code import VerificationCode, VerificationCodeUsageShard
+from app.models.access_log import AccessLog, AccessLogCounter
+from app.models.revoked_token import RevokedToken
+from app.models.api_key import ApiKey
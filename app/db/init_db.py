@@ -7,6 +7,8 @@ from app.models.user import User
 from app.models.employment import Employment
 from app.models.verification_code import VerificationCode
 from app.models.access_log import AccessLog
+from app.models.revoked_token import RevokedToken
+from app.models.api_key import ApiKey
 
 logger = logging.getLogger(__name__)
 
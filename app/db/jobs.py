@@ -0,0 +1,113 @@
+import logging
+from typing import Callable, List
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.pubsub import pubsub
+from app.core.tasks import PeriodicTask
+from app.db.session import SessionLocal
+from app.crud.crud_access_log import access_log as crud_access_log, access_log_writer
+from app.crud.crud_revoked_token import revoked_token as crud_revoked_token
+from app.crud.crud_user import user as crud_user
+from app.crud.crud_verification_code import verification_code as crud_verification_code
+
+logger = logging.getLogger(__name__)
+
+
+def with_session(func: Callable[[Session], object]) -> Callable[[], None]:
+    """Wrap a job so it runs with its own database session"""
+    def job() -> None:
+        db = SessionLocal()
+        try:
+            func(db)
+        finally:
+            db.close()
+    return job
+
+
+access_log_flush = PeriodicTask(
+    "access-log-flush",
+    settings.ACCESS_LOG_FLUSH_INTERVAL_MS / 1000,
+    with_session(lambda db: crud_access_log.flush_queued(db)),
+    run_on_stop=True,
+)
+
+background_tasks: List[PeriodicTask] = [
+    access_log_flush,
+    PeriodicTask(
+        "access-log-counter-fold",
+        settings.ACCESS_LOG_COUNTER_FOLD_SECONDS,
+        with_session(lambda db: crud_access_log.fold_counters(db)),
+        run_on_stop=True,
+    ),
+    PeriodicTask(
+        "last-login-flush",
+        settings.LAST_LOGIN_FLUSH_SECONDS,
+        with_session(lambda db: crud_user.flush_last_logins(db)),
+        run_on_stop=True,
+    ),
+    PeriodicTask(
+        "token-revocation-sync",
+        settings.TOKEN_REVOCATION_SYNC_SECONDS,
+        with_session(lambda db: crud_revoked_token.sync(db)),
+    ),
+    PeriodicTask(
+        "token-revocation-purge",
+        3600,
+        with_session(lambda db: crud_revoked_token.remove_expired(db)),
+    ),
+    PeriodicTask(
+        "verification-throttle-summaries",
+        60,
+        with_session(lambda db: crud_verification_code.flush_blocked_attempts(db)),
+        run_on_stop=True,
+    ),
+    PeriodicTask(
+        "verification-code-filter-sync",
+        settings.VERIFICATION_CODE_FILTER_SYNC_SECONDS,
+        with_session(lambda db: crud_verification_code.sync_live_codes(db)),
+    ),
+    PeriodicTask(
+        "verification-code-expiry-sweep",
+        settings.VERIFICATION_EXPIRY_SWEEP_SECONDS,
+        with_session(lambda db: crud_verification_code.sweep_expired_codes(db)),
+    ),
+    PeriodicTask(
+        "verification-usage-reconcile",
+        settings.VERIFICATION_USAGE_RECONCILE_SECONDS,
+        with_session(lambda db: crud_verification_code.reconcile_usage(db)),
+        run_on_stop=True,
+    ),
+    PeriodicTask(
+        "verification-code-pool-refill",
+        settings.VERIFICATION_CODE_POOL_REFILL_SECONDS,
+        with_session(lambda db: crud_verification_code.refill_code_pool(db)),
+    ),
+]
+
+
+def load_startup_state() -> None:
+    """Warm the per-worker in-memory state that is built from the database"""
+    with_session(lambda db: crud_revoked_token.load(db))()
+    with_session(lambda db: crud_verification_code.load_live_codes(db))()
+    with_session(lambda db: crud_verification_code.refill_code_pool(db))()
+
+
+async def start_background_tasks() -> None:
+    try:
+        load_startup_state()
+    except Exception as e:
+        logger.error(f"Loading startup state failed: {e}")
+    await pubsub.start()
+    for task in background_tasks:
+        task.start()
+    access_log_writer.start(on_batch_ready=access_log_flush.trigger)
+
+
+async def stop_background_tasks() -> None:
+    # Later log rows are written inline; the flush task drains the rest
+    access_log_writer.stop()
+    for task in background_tasks:
+        await task.stop()
+    await pubsub.stop()
@@ -1,5 +1,5 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Text, JSON
-from sqlalchemy.sql import func
+from sqlalchemy import Column, Integer, String, Boolean, Date, DateTime, ForeignKey, Index, Text, JSON, text
+from sqlalchemy.sql import false, func
 from sqlalchemy.orm import relationship
 
 from app.db.session import Base
@@ -9,7 +9,7 @@ class AccessLog(Base):
     __tablename__ = "access_logs"
 
     id = Column(Integer, primary_key=True, index=True)
-    verification_code_id = Column(Integer, ForeignKey("verification_codes.id"), nullable=False)
+    verification_code_id = Column(Integer, ForeignKey("verification_codes.id"), nullable=True)  # Null for unknown codes and throttling summaries
     employer_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     
     # Access information
@@ -33,6 +33,9 @@ class AccessLog(Base):
     approved_by = Column(Integer, ForeignKey("users.id"), nullable=True)
     approved_at = Column(DateTime(timezone=True), nullable=True)
     
+    # Added to access_log_counters by the background fold
+    counted = Column(Boolean, nullable=False, default=False, server_default=false())
+    
     # Timestamps
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     
@@ -40,3 +43,26 @@ class AccessLog(Base):
     verification_code = relationship("VerificationCode", back_populates="access_logs")
     employer = relationship("User", back_populates="access_logs", foreign_keys=[employer_id])
     approver = relationship("User", foreign_keys=[approved_by])
+
+    __table_args__ = (
+        # Time-range scans of one employer's or one code's logs (histograms)
+        Index("ix_access_logs_employer_id_accessed_at", "employer_id", "accessed_at"),
+        Index("ix_access_logs_verification_code_id_accessed_at", "verification_code_id", "accessed_at"),
+        # Only rows waiting for the counter fold are indexed
+        Index(
+            "ix_access_logs_uncounted",
+            "id",
+            postgresql_where=text("NOT counted"),
+            sqlite_where=text("NOT counted"),
+        ),
+    )
+
+
+class AccessLogCounter(Base):
+    """Access log rows per user (the employer, or the code's employee) and UTC day"""
+    __tablename__ = "access_log_counters"
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    day = Column(Date, primary_key=True)
+    total = Column(Integer, nullable=False, default=0)
+    successful = Column(Integer, nullable=False, default=0)
@@ -0,0 +1,30 @@
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey
+from sqlalchemy.sql import func
+from sqlalchemy.orm import relationship
+
+from app.db.session import Base
+
+# Scopes an API key can be granted
+API_KEY_SCOPES = {"verify"}
+
+
+class ApiKey(Base):
+    __tablename__ = "api_keys"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), index=True, nullable=False)
+    name = Column(String, nullable=False)
+    
+    # Keys look like slk_<prefix>_<secret>; only a SHA-256 of the secret is stored
+    prefix = Column(String, unique=True, index=True, nullable=False)
+    key_hash = Column(String(64), nullable=False)
+    scopes = Column(String, nullable=False, default="verify")  # Comma-separated list
+    is_active = Column(Boolean, default=True)
+    
+    # Timestamps
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    last_used_at = Column(DateTime(timezone=True), nullable=True)
+    expires_at = Column(DateTime(timezone=True), nullable=True)
+    
+    # Relationships
+    user = relationship("User", back_populates="api_keys")
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, Enum, Text
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Enum, Text, Sequence, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 import enum
@@ -6,6 +6,20 @@ import enum
 from app.db.session import Base
 
 
+# Public IDs are a keyed permutation of these sequences (see app.utils.id_generator)
+EMPLOYEE_ID_SPACE = 26 * 36 ** 5  # a letter followed by five letters or digits
+EMPLOYER_ID_SPACE = 900000  # 100000-999999
+
+employee_user_id_seq = Sequence(
+    "employee_user_id_seq", start=0, minvalue=0, maxvalue=EMPLOYEE_ID_SPACE - 1,
+    metadata=Base.metadata,
+)
+employer_id_seq = Sequence(
+    "employer_id_seq", start=0, minvalue=0, maxvalue=EMPLOYER_ID_SPACE - 1,
+    metadata=Base.metadata,
+)
+
+
 class UserType(str, enum.Enum):
     EMPLOYEE = "employee"
     EMPLOYER = "employer"
@@ -45,3 +59,13 @@ class User(Base):
     employments = relationship("Employment", back_populates="employee", cascade="all, delete-orphan")
     verification_codes = relationship("VerificationCode", back_populates="employee", cascade="all, delete-orphan")
     access_logs = relationship("AccessLog", back_populates="employer", foreign_keys="AccessLog.employer_id")
+    api_keys = relationship("ApiKey", back_populates="user", cascade="all, delete-orphan")
+
+    __table_args__ = (
+        # Serves the `company_handle LIKE 'base%'` scan in generate_company_handle
+        Index(
+            "ix_users_company_handle_pattern",
+            "company_handle",
+            postgresql_ops={"company_handle": "text_pattern_ops"},
+        ),
+    )
@@ -1,9 +1,13 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Enum
+from sqlalchemy import (
+    Column, Integer, BigInteger, String, Boolean, DateTime, ForeignKey, Enum, Index,
+    UniqueConstraint, text
+)
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 import enum
 
 from app.db.session import Base
+from app.utils.verification_codes import render_verification_code
 
 
 class VerificationCodeStatus(str, enum.Enum):
@@ -17,7 +21,8 @@ class VerificationCode(Base):
     __tablename__ = "verification_codes"
 
     id = Column(Integer, primary_key=True, index=True)
-    code = Column(String, unique=True, index=True, nullable=False)
+    # The 12 base-36 digits of SL-XXXX-XXXX-XXXX as an integer (< 36**12 < 2**63)
+    code_key = Column(BigInteger, unique=True, index=True, nullable=False)
     employee_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     employment_id = Column(Integer, ForeignKey("employments.id"), nullable=False)
     
@@ -26,6 +31,9 @@ class VerificationCode(Base):
     status = Column(Enum(VerificationCodeStatus), default=VerificationCodeStatus.ACTIVE)
     max_usage_count = Column(Integer, default=1)
     current_usage_count = Column(Integer, default=0)
+    # Shard rows counting uses (0: counted on this row); current_usage_count
+    # then lags by up to VERIFICATION_USAGE_RECONCILE_SECONDS
+    usage_shards = Column(Integer, nullable=False, default=0, server_default="0")
     
     # Expiry settings
     expires_at = Column(DateTime(timezone=True), nullable=False)
@@ -38,8 +46,49 @@ class VerificationCode(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     last_used_at = Column(DateTime(timezone=True), nullable=True)
+    # Last move back to ACTIVE; other workers' live-code filters sync on it
+    reactivated_at = Column(DateTime(timezone=True), nullable=True)
     
     # Relationships
     employee = relationship("User", back_populates="verification_codes")
     employment = relationship("Employment", back_populates="verification_codes")
     access_logs = relationship("AccessLog", back_populates="verification_code")
+
+    __table_args__ = (
+        # Only live codes are indexed by expiry; serves the expiry sweep
+        Index(
+            "ix_verification_codes_active_expires_at",
+            "expires_at",
+            postgresql_where=text("status = 'ACTIVE'"),
+            sqlite_where=text("status = 'ACTIVE'"),
+        ),
+        # Only reactivated codes are indexed; serves the live-code filter sync
+        Index(
+            "ix_verification_codes_reactivated_at",
+            "reactivated_at",
+            postgresql_where=text("reactivated_at IS NOT NULL"),
+            sqlite_where=text("reactivated_at IS NOT NULL"),
+        ),
+    )
+
+    @property
+    def code(self) -> str:
+        return render_verification_code(self.code_key)
+
+
+class VerificationCodeUsageShard(Base):
+    """A slice of a sharded code's remaining uses: `used` of `quota` taken"""
+    __tablename__ = "verification_code_usage_shards"
+
+    id = Column(Integer, primary_key=True)
+    code_id = Column(
+        Integer, ForeignKey("verification_codes.id", ondelete="CASCADE"),
+        nullable=False, index=True
+    )
+    shard = Column(Integer, nullable=False)
+    quota = Column(Integer, nullable=False)
+    used = Column(Integer, nullable=False, default=0, server_default="0")
+
+    __table_args__ = (
+        UniqueConstraint("code_id", "shard", name="uq_verification_code_usage_shards_code_shard"),
+    )
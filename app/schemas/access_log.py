@@ -1,5 +1,5 @@
-from typing import Optional
-from pydantic import BaseModel
+from typing import Any, List, Optional
+from pydantic import BaseModel, model_validator
 from datetime import datetime
 
 
@@ -24,7 +24,7 @@ class AccessLogUpdate(BaseModel):
 
 class AccessLogInDB(AccessLogBase):
     id: int
-    verification_code_id: int
+    verification_code_id: Optional[int] = None
     employer_id: int
     accessed_at: datetime
     success: bool
@@ -47,5 +47,41 @@ class AccessLog(AccessLogInDB):
 class AccessLogWithDetails(AccessLog):
     employer_name: Optional[str] = None
     employer_company: Optional[str] = None
-    verification_code: str
-    employee_name: str
+    verification_code: Optional[str] = None  # None for unknown codes
+    employee_name: Optional[str] = None
+
+    @model_validator(mode="before")
+    @classmethod
+    def flatten_relations(cls, data: Any) -> Any:
+        """Read the detail fields off an AccessLog row's employer and code"""
+        if isinstance(data, dict):
+            return data
+        code = data.verification_code
+        employer = data.employer
+        return {
+            **{name: getattr(data, name) for name in AccessLog.model_fields},
+            "employer_name": employer.full_name if employer else None,
+            "employer_company": employer.company_name if employer else None,
+            "verification_code": code.code if code else None,
+            "employee_name": code.employee.full_name if code else None,
+        }
+
+
+class ApprovalEvents(BaseModel):
+    events: List[dict]
+    cursor: int  # Pass back as `since` to continue after these events
+
+
+class AccessStats(BaseModel):
+    total_requests: int
+    successful_requests: int
+    failed_requests: int
+    success_rate: float
+    recent_requests: int  # Over the last 30 days
+
+
+class AccessHistogram(BaseModel):
+    bucket: str
+    buckets: List[datetime]  # UTC bucket starts; the count lists line up with them
+    total: List[int]
+    successful: List[int]
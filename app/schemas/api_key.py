@@ -0,0 +1,34 @@
+from typing import List, Optional
+from pydantic import BaseModel, field_validator
+from datetime import datetime
+
+
+class ApiKeyCreate(BaseModel):
+    name: str
+    scopes: List[str] = ["verify"]
+    expires_at: Optional[datetime] = None
+
+
+class ApiKey(BaseModel):
+    id: int
+    name: str
+    prefix: str
+    scopes: List[str]
+    is_active: bool
+    created_at: datetime
+    last_used_at: Optional[datetime] = None
+    expires_at: Optional[datetime] = None
+
+    @field_validator("scopes", mode="before")
+    @classmethod
+    def split_scopes(cls, value):
+        if isinstance(value, str):
+            return [scope for scope in value.split(",") if scope]
+        return value
+
+    class Config:
+        orm_mode = True
+
+
+class ApiKeyCreated(ApiKey):
+    key: str  # Only returned once, at creation time
@@ -54,6 +54,21 @@ class User(UserInDB):
     pass
 
 
+class UserPrincipal(BaseModel):
+    """Detached snapshot of the authenticated user used by request handlers"""
+    id: int
+    email: str
+    full_name: str
+    user_type: UserType
+    is_active: bool
+    is_verified: bool
+    user_id: Optional[str] = None
+    employer_id: Optional[int] = None
+    company_handle: Optional[str] = None
+    company_name: Optional[str] = None
+    company_website: Optional[str] = None
+
+
 # Authentication schemas
 class Token(BaseModel):
     access_token: str
@@ -61,6 +76,10 @@ class Token(BaseModel):
     token_type: str
 
 
+class LogoutRequest(BaseModel):
+    refresh_token: Optional[str] = None
+
+
 class TokenData(BaseModel):
     username: Optional[str] = None
 
@@ -1,8 +1,9 @@
 from typing import Optional, List
-from pydantic import BaseModel
+from pydantic import BaseModel, field_validator
 from datetime import datetime
 
 from app.models.verification_code import VerificationCodeStatus
+from app.utils.domains import normalize_domain_list
 
 
 class VerificationCodeBase(BaseModel):
@@ -16,6 +17,11 @@ class VerificationCodeBase(BaseModel):
 class VerificationCodeCreate(VerificationCodeBase):
     employment_id: int
 
+    @field_validator("allowed_domains")
+    @classmethod
+    def normalize_allowed_domains(cls, value):
+        return normalize_domain_list(value)
+
 
 class VerificationCodeUpdate(BaseModel):
     purpose: Optional[str] = None
@@ -24,6 +30,11 @@ class VerificationCodeUpdate(BaseModel):
     require_approval: Optional[bool] = None
     allowed_domains: Optional[str] = None
 
+    @field_validator("allowed_domains")
+    @classmethod
+    def normalize_allowed_domains(cls, value):
+        return normalize_domain_list(value)
+
 
 class VerificationCodeInDB(VerificationCodeBase):
     id: int
@@ -53,6 +64,11 @@ class VerificationRequest(BaseModel):
     purpose: Optional[str] = None
 
 
+class BatchVerificationRequest(BaseModel):
+    codes: List[str]
+    purpose: Optional[str] = None
+
+
 class VerificationResponse(BaseModel):
     success: bool
     message: str
@@ -62,3 +78,21 @@ class VerificationResponse(BaseModel):
     job_title: Optional[str] = None
     employment_status: Optional[str] = None
     verification_date: Optional[datetime] = None
+    # Signed copy of this result, see GET /verification-codes/receipts/{receipt}
+    receipt: Optional[str] = None
+    # Set when the code requires approval: the access log to wait on
+    approval_status: Optional[str] = None
+    access_log_id: Optional[int] = None
+
+
+class VerificationReceipt(BaseModel):
+    verification_code_id: int
+    employer_id: int
+    employee_name: Optional[str] = None
+    data: dict
+    verification_date: datetime
+    expires_at: datetime
+
+
+class BatchVerificationResponse(BaseModel):
+    results: List[VerificationResponse]
@@ -0,0 +1,97 @@
+import re
+from functools import lru_cache
+from typing import AbstractSet, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+_LABEL = re.compile(r"^(?!-)[a-z0-9-]{1,63}(?<!-)$")
+_SEPARATORS = re.compile(r"[\s,;]+")
+
+# Distinct allowed_domains values kept compiled per worker
+MATCHER_CACHE_SIZE = 4096
+
+
+def normalize_domain(value: str) -> Optional[str]:
+    """
+    Bare lowercase host name from a domain, URL or email address (IDNA
+    encoded, without port, path or a leading `*.`), or None if invalid
+    """
+    value = value.strip().lower()
+    if "@" in value:
+        value = value.rsplit("@", 1)[1]
+    if "//" in value:
+        value = urlsplit(value).hostname or ""
+    else:
+        value = value.split("/", 1)[0].split(":", 1)[0]
+    value = value.lstrip("*.").rstrip(".")
+    try:
+        value = value.encode("idna").decode("ascii")
+    except UnicodeError:
+        return None
+    if not value or not all(_LABEL.match(label) for label in value.split(".")):
+        return None
+    return value
+
+
+def _domain_entries(value: str, strict: bool) -> List[str]:
+    """Normalized entries with those already covered by a parent domain removed"""
+    entries = set()
+    for entry in _SEPARATORS.split(value):
+        if not entry:
+            continue
+        domain = normalize_domain(entry)
+        if domain is None:
+            if strict:
+                raise ValueError(f"Invalid domain: {entry!r}")
+            continue
+        entries.add(domain)
+    kept = set()
+    for domain in sorted(entries, key=lambda d: d.count(".")):
+        if not DomainMatcher(kept).matches(domain):
+            kept.add(domain)
+    return sorted(kept)
+
+
+def normalize_domain_list(value: Optional[str]) -> Optional[str]:
+    """
+    Canonical form of an allowed_domains value: sorted, deduplicated,
+    comma-separated domains. Raises ValueError on an invalid entry.
+    """
+    if value is None:
+        return None
+    return ",".join(_domain_entries(value, strict=True)) or None
+
+
+class DomainMatcher:
+    """
+    Set of allowed domains, each also allowing its subdomains. A lookup
+    probes the set once per label of the candidate, however many domains
+    are allowed.
+    """
+
+    __slots__ = ("domains",)
+
+    def __init__(self, domains: AbstractSet[str]):
+        self.domains = domains
+
+    def matches(self, domain: str) -> bool:
+        domains = self.domains
+        while True:
+            if domain in domains:
+                return True
+            dot = domain.find(".")
+            if dot < 0:
+                return False
+            domain = domain[dot + 1:]
+
+
+@lru_cache(maxsize=MATCHER_CACHE_SIZE)
+def compile_allowed_domains(value: str) -> DomainMatcher:
+    """Matcher for a stored allowed_domains value; invalid entries are skipped"""
+    return DomainMatcher(frozenset(_domain_entries(value, strict=False)))
+
+
+@lru_cache(maxsize=MATCHER_CACHE_SIZE)
+def employer_domains(email: str, company_website: Optional[str]) -> Tuple[str, ...]:
+    """Domains an employer can be matched on: its email's and its website's"""
+    domains = (normalize_domain(email), normalize_domain(company_website or ""))
+    return tuple(domain for domain in dict.fromkeys(domains) if domain)
@@ -1,7 +1,103 @@
 import random
 import string
+import threading
+from collections import deque
+from typing import Deque, List, Optional
+from sqlalchemy import Numeric, Sequence, case, cast, func, or_, select
 from sqlalchemy.orm import Session
-from app.models.user import User
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.core.permutation import FeistelPermutation
+from app.models.user import (
+    EMPLOYEE_ID_SPACE,
+    EMPLOYER_ID_SPACE,
+    User,
+    employee_user_id_seq,
+    employer_id_seq,
+)
+
+
+class PublicIdAllocator:
+    """
+    Hands out public IDs by passing a database sequence through a keyed
+    permutation, so IDs look random but never repeat and need no probe.
+    Sequence values are reserved in blocks per worker; values left in a
+    block when the worker exits are simply never issued.
+    """
+
+    def __init__(self, sequence: Sequence, domain: int, label: str):
+        self.sequence = sequence
+        self.domain = domain
+        self.label = label
+        self._permutation: Optional[FeistelPermutation] = None
+        self._reserved: Deque[int] = deque()
+        self._lock = threading.Lock()
+
+    @property
+    def permutation(self) -> FeistelPermutation:
+        if self._permutation is None:
+            key = settings.PUBLIC_ID_KEY or settings.SECRET_KEY
+            self._permutation = FeistelPermutation(
+                self.domain, f"{self.label}:{key}".encode()
+            )
+        return self._permutation
+
+    def _reserve(self, db: Session, count: int) -> None:
+        values = db.execute(
+            select(self.sequence.next_value()).select_from(
+                func.generate_series(1, count)
+            )
+        ).scalars().all()
+        self._reserved.extend(values)
+        metrics.increment(f"public_ids.{self.label}.blocks_reserved")
+
+    def allocate(self, db: Session, count: int = 1) -> List[int]:
+        """Take `count` values in [0, domain), reserving a new block if needed"""
+        with self._lock:
+            missing = count - len(self._reserved)
+            if missing > 0:
+                self._reserve(db, max(missing, settings.PUBLIC_ID_BLOCK_SIZE))
+            values = [self._reserved.popleft() for _ in range(count)]
+        return [self.permutation.permute(value) for value in values]
+
+
+employee_id_allocator = PublicIdAllocator(
+    employee_user_id_seq, EMPLOYEE_ID_SPACE, "employee"
+)
+employer_id_allocator = PublicIdAllocator(employer_id_seq, EMPLOYER_ID_SPACE, "employer")
+
+_ALNUM = string.ascii_uppercase + string.digits
+
+
+def format_employee_user_id(value: int) -> str:
+    """Render a value in [0, EMPLOYEE_ID_SPACE) as a letter plus five alphanumerics"""
+    value, first = divmod(value, 36 ** 5)
+    chars = []
+    for _ in range(5):
+        first, digit = divmod(first, 36)
+        chars.append(_ALNUM[digit])
+    return string.ascii_uppercase[value] + "".join(reversed(chars))
+
+
+def _supports_sequences(db: Session) -> bool:
+    return db.get_bind().dialect.supports_sequences
+
+
+def generate_employee_user_ids(db: Session, count: int) -> List[str]:
+    """Allocate `count` employee user IDs in one round trip at most"""
+    if not _supports_sequences(db):
+        return [_random_employee_user_id(db) for _ in range(count)]
+    return [
+        format_employee_user_id(value)
+        for value in employee_id_allocator.allocate(db, count)
+    ]
+
+
+def generate_employer_ids(db: Session, count: int) -> List[int]:
+    """Allocate `count` employer IDs in one round trip at most"""
+    if not _supports_sequences(db):
+        return [_random_employer_id(db) for _ in range(count)]
+    return [100000 + value for value in employer_id_allocator.allocate(db, count)]
 
 
 def generate_employee_user_id(db: Session) -> str:
@@ -9,6 +105,21 @@ def generate_employee_user_id(db: Session) -> str:
     Generate a 6-digit alphanumeric user ID for employees.
     Format: alphanumeric, no leading zeros (e.g., Z2DU79, A1B2C3)
     """
+    return generate_employee_user_ids(db, 1)[0]
+
+
+def generate_employer_id(db: Session) -> int:
+    """
+    Generate a numeric employer ID between 100000 and 999999 for internal use.
+    """
+    return generate_employer_ids(db, 1)[0]
+
+
+# Databases without sequences (SQLite in local development) fall back to
+# random IDs probed against the users table
+
+
+def _random_employee_user_id(db: Session) -> str:
     while True:
         # Start with a letter to avoid leading zeros
         first_char = random.choice(string.ascii_uppercase)
@@ -22,10 +133,7 @@ def generate_employee_user_id(db: Session) -> str:
             return user_id
 
 
-def generate_employer_id(db: Session) -> int:
-    """
-    Generate a numeric employer ID between 100000 and 999999 for internal use.
-    """
+def _random_employer_id(db: Session) -> int:
     while True:
         employer_id = random.randint(100000, 999999)
         
@@ -35,33 +143,39 @@ def generate_employer_id(db: Session) -> int:
             return employer_id
 
 
+def company_handle_base(company_name: str) -> str:
+    """Lowercase alphanumerics of the company name, at most 20 characters"""
+    return ''.join(c.lower() for c in company_name if c.isalnum())[:20]
+
+
 def generate_company_handle(company_name: str, db: Session) -> str:
     """
     Generate a company handle from company name.
     Format: @companyname (lowercase, no spaces)
     If exists, append numbers: @companyname1, @companyname2, etc.
     """
-    # Clean company name: lowercase, remove spaces and special chars
-    base_handle = ''.join(c.lower() for c in company_name if c.isalnum())
-    
-    # Limit length to 20 characters
-    base_handle = base_handle[:20]
-    
-    counter = 0
-    while True:
-        if counter == 0:
-            handle = base_handle
-        else:
-            handle = f"{base_handle}{counter}"
-        
-        # Check if this handle already exists
-        existing = db.query(User).filter(User.company_handle == handle).first()
-        if not existing:
-            return handle
-        
-        counter += 1
-        # Prevent infinite loop
-        if counter > 999:
-            # Fallback with random suffix
-            random_suffix = ''.join(random.choices(string.digits, k=3))
-            return f"{base_handle}{random_suffix}"
+    base_handle = company_handle_base(company_name)
+
+    # One prefix scan finds whether the bare handle is taken and the highest
+    # numeric suffix in use; concurrent registrations that pick the same
+    # handle are caught by the unique index and retried by the caller
+    suffix = func.substr(User.company_handle, len(base_handle) + 1)
+    base_taken, max_suffix = db.execute(
+        select(
+            func.max(case((User.company_handle == base_handle, 1), else_=0)),
+            func.max(case(
+                (User.company_handle == base_handle, None),
+                else_=cast(suffix, Numeric),
+            )),
+        ).where(
+            User.company_handle.like(f"{base_handle}%"),
+            or_(
+                User.company_handle == base_handle,
+                suffix.regexp_match("^[0-9]+$"),
+            ),
+        )
+    ).one()
+
+    if not base_taken:
+        return base_handle
+    return f"{base_handle}{int(max_suffix or 0) + 1}"
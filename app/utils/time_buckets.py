@@ -0,0 +1,53 @@
+from datetime import datetime, timedelta, timezone
+from typing import List, Tuple
+
+# Bucket sizes, named as PostgreSQL's date_trunc fields
+BUCKETS = ("hour", "day", "week", "month")
+
+
+def truncate(moment: datetime, bucket: str) -> datetime:
+    """Start of the UTC bucket containing `moment`, as date_trunc computes it"""
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    moment = moment.astimezone(timezone.utc).replace(minute=0, second=0, microsecond=0)
+    if bucket == "hour":
+        return moment
+    day = moment.replace(hour=0)
+    if bucket == "day":
+        return day
+    if bucket == "week":
+        # ISO weeks start on Monday
+        return day - timedelta(days=day.weekday())
+    if bucket == "month":
+        return day.replace(day=1)
+    raise ValueError(f"Unknown bucket: {bucket!r}")
+
+
+def advance(start: datetime, bucket: str) -> datetime:
+    """Start of the bucket following the one starting at `start`"""
+    if bucket == "month":
+        year, month = divmod(start.month, 12)
+        return start.replace(year=start.year + year, month=month + 1)
+    return start + {"hour": timedelta(hours=1), "day": timedelta(days=1),
+                    "week": timedelta(weeks=1)}[bucket]
+
+
+def bucket_starts(
+    start: datetime, end: datetime, bucket: str, limit: int
+) -> Tuple[List[datetime], datetime]:
+    """
+    Starts of the buckets covering [start, end] and the end of the last
+    one; naive times are taken as UTC. Raises ValueError if start is after
+    end or there are more than `limit` buckets.
+    """
+    start, end = (t if t.tzinfo else t.replace(tzinfo=timezone.utc) for t in (start, end))
+    if start > end:
+        raise ValueError("start must not be after end")
+    starts = []
+    current = truncate(start, bucket)
+    while current <= end:
+        if len(starts) == limit:
+            raise ValueError(f"At most {limit} buckets per request")
+        starts.append(current)
+        current = advance(current, bucket)
+    return starts, current
@@ -0,0 +1,121 @@
+import secrets
+import string
+import threading
+from collections import deque
+from array import array
+from typing import Callable, Deque, List, Optional, Set
+
+from sqlalchemy.orm import Session
+
+ALPHABET = string.digits + string.ascii_uppercase
+
+# A code is SL-XXXX-XXXX-XXXX: 12 base-36 digits, rendered two at a time
+CODE_DIGITS = 12
+CODE_SPACE = 36 ** CODE_DIGITS
+_PAIRS = [a + b for a in ALPHABET for b in ALPHABET]
+
+# Largest multiple of CODE_SPACE below 2**64; 64-bit draws at or above it
+# are rejected so that `value % CODE_SPACE` stays uniform
+_DRAW_LIMIT = (2 ** 64 // CODE_SPACE) * CODE_SPACE
+
+
+def random_code_values(n: int) -> List[int]:
+    """Draw `n` uniform integers in [0, CODE_SPACE) from batched random bytes"""
+    values: List[int] = []
+    while len(values) < n:
+        # ~23% of draws are rejected, so over-allocate by a third
+        needed = n - len(values)
+        draws = array("Q", secrets.token_bytes(8 * (needed + needed // 3 + 1)))
+        values.extend(v % CODE_SPACE for v in draws if v < _DRAW_LIMIT)
+    del values[n:]
+    return values
+
+
+def render_verification_code(value: int) -> str:
+    """Render an integer in [0, CODE_SPACE) as SL-XXXX-XXXX-XXXX"""
+    value, p6 = divmod(value, 1296)
+    value, p5 = divmod(value, 1296)
+    value, p4 = divmod(value, 1296)
+    value, p3 = divmod(value, 1296)
+    p1, p2 = divmod(value, 1296)
+    pairs = _PAIRS
+    return f"SL-{pairs[p1]}{pairs[p2]}-{pairs[p3]}{pairs[p4]}-{pairs[p5]}{pairs[p6]}"
+
+
+def parse_verification_code(code: str) -> Optional[int]:
+    """
+    Parse a code into its integer key, or None if it is malformed. Accepts
+    any case, missing or extra dashes and spaces, and a missing SL- prefix.
+    """
+    digits = code.replace("-", "").replace(" ", "").upper()
+    if len(digits) == CODE_DIGITS + 2 and digits.startswith("SL"):
+        digits = digits[2:]
+    if len(digits) != CODE_DIGITS or not (digits.isascii() and digits.isalnum()):
+        return None
+    return int(digits, 36)
+
+
+def generate_verification_codes(n: int) -> List[str]:
+    """Generate `n` random verification codes"""
+    return [render_verification_code(v) for v in random_code_values(n)]
+
+
+class VerificationCodePool:
+    """
+    Per-worker pool of code keys already checked against the database.
+
+    Refilling probes a whole batch with one query through `probe`, which
+    returns the candidates that already exist, so handing out a code costs
+    no query. Keys are not reserved across workers; the unique
+    constraint on verification_codes.code_key catches the (1 in 36**12)
+    case of two workers drawing the same key.
+    """
+
+    def __init__(
+        self,
+        size: int,
+        low_water: int,
+        probe: Callable[[Session, Set[int]], Set[int]],
+    ):
+        self.size = size
+        self.low_water = low_water
+        self.probe = probe
+        self.refills = 0
+        self.discarded = 0
+        self._codes: Deque[int] = deque()
+        self._lock = threading.Lock()
+
+    def take(self, db: Session) -> int:
+        """Pop a pooled code key, refilling inline if the pool ran dry"""
+        while True:
+            try:
+                return self._codes.popleft()
+            except IndexError:
+                self.refill(db)
+
+    def needs_refill(self) -> bool:
+        return len(self._codes) < self.low_water
+
+    def refill(self, db: Session) -> int:
+        """Top the pool up to `size`; returns the number of codes added"""
+        with self._lock:
+            wanted = self.size - len(self._codes)
+            if wanted <= 0:
+                return 0
+            candidates = set(random_code_values(wanted))
+            fresh = candidates - self.probe(db, candidates)
+            self.discarded += wanted - len(fresh)
+            self._codes.extend(fresh)
+            self.refills += 1
+            return len(fresh)
+
+    def clear(self) -> None:
+        self._codes.clear()
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self._codes),
+            "capacity": self.size,
+            "refills": self.refills,
+            "discarded": self.discarded,
+        }
@@ -0,0 +1,116 @@
+"""
+Daily access histogram for a heavy employer: cold and cached.
+
+Creates an employer and --logs access logs spread over --days days, then
+builds a per-day histogram of the whole period --runs times each way:
+loading every log row of the account and bucketing in Python, one
+date_trunc GROUP BY over the range with a cold cache, and the cached path,
+where only the open (current) bucket is counted again. It checks that all
+three agree. The rows are deleted afterwards. Needs a PostgreSQL
+DATABASE_URL with the schema applied.
+
+Usage: DATABASE_URL=postgresql://... python benchmarks/bench_access_histogram.py [--logs 200000] [--days 365] [--runs 10]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+import uuid
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("SECRET_KEY", "benchmark")
+
+import app.db.base  # noqa: E402,F401 (registers every model)
+from app.crud import crud_access_log  # noqa: E402
+from app.crud.crud_access_log import histogram_cache  # noqa: E402
+from app.db.session import SessionLocal  # noqa: E402
+from app.models.access_log import AccessLog, AccessLogCounter  # noqa: E402
+from app.models.user import User, UserType  # noqa: E402
+from app.utils.time_buckets import bucket_starts, truncate  # noqa: E402
+
+
+def create_fixture(db, logs: int, days: int) -> int:
+    tag = uuid.uuid4().hex[:12]
+    employer = User(email=f"bench-{tag}@employer.example", hashed_password="x",
+                    full_name="Bench Employer", user_type=UserType.EMPLOYER)
+    db.add(employer)
+    db.commit()
+    now = datetime.now(timezone.utc)
+    for start in range(0, logs, 10000):
+        crud_access_log.insert_many(db, [
+            {"employer_id": employer.id, "verification_code_id": None,
+             "success": random.random() < 0.8,
+             "accessed_at": now - timedelta(seconds=random.randint(0, days * 86400))}
+            for _ in range(min(10000, logs - start))
+        ])
+        db.commit()
+    return employer.id
+
+
+def scan_histogram(db, employer_id: int, starts) -> list:
+    counts = Counter(
+        truncate(accessed_at, "day") for (accessed_at,) in
+        db.query(AccessLog.accessed_at).filter(AccessLog.employer_id == employer_id)
+    )
+    return [counts.get(start, 0) for start in starts]
+
+
+def timed(label: str, runs: int, func, before=None) -> list:
+    elapsed = 0.0
+    for _ in range(runs):
+        if before is not None:
+            before()
+        start = time.perf_counter()
+        result = func()
+        elapsed += time.perf_counter() - start
+    print(f"{label:<28} {elapsed / runs * 1000:>9.2f} ms/call")
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--logs", type=int, default=200000)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--runs", type=int, default=10)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    employer_id = create_fixture(db, args.logs, args.days)
+    now = datetime.now(timezone.utc)
+    starts, end = bucket_starts(now - timedelta(days=args.days), now, "day", args.days + 1)
+
+    def histogram():
+        return crud_access_log.get_access_histogram(
+            db, bucket="day", starts=starts, end=end, employer_id=employer_id
+        )["total"]
+
+    try:
+        print(f"{args.logs:,} access logs, {len(starts)} daily buckets")
+        scanned = timed("scan rows, bucket in Python", args.runs,
+                        lambda: scan_histogram(db, employer_id, starts))
+        cold = timed("date_trunc, cold cache", args.runs, histogram, before=histogram_cache.clear)
+        cached = timed("date_trunc, closed cached", args.runs, histogram)
+        ok = scanned == cold == cached
+        print("OK: histograms agree" if ok else "FAIL: histograms differ")
+    finally:
+        db.close()
+        cleanup(employer_id)
+    sys.exit(0 if ok else 1)
+
+
+def cleanup(employer_id: int) -> None:
+    db = SessionLocal()
+    try:
+        db.query(AccessLog).filter(AccessLog.employer_id == employer_id).delete()
+        db.query(AccessLogCounter).filter(AccessLogCounter.user_id == employer_id).delete()
+        db.query(User).filter(User.id == employer_id).delete()
+        db.commit()
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
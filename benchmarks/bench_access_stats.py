@@ -0,0 +1,109 @@
+"""
+Access stats for a heavy employer: COUNT queries over its logs against the
+daily counters.
+
+Creates an employer and --logs access logs spread over --days days, written
+through insert_many and folded into the daily counters as in production.
+It then times --runs rounds of the previous approach (three COUNT(*)
+queries over the employer's logs) against get_access_stats (one aggregate
+over at most one counter row per day), and checks that both agree. The rows
+are deleted afterwards. Needs a PostgreSQL DATABASE_URL with the schema
+applied.
+
+Usage: DATABASE_URL=postgresql://... python benchmarks/bench_access_stats.py [--logs 200000] [--days 365] [--runs 20]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("SECRET_KEY", "benchmark")
+
+import app.db.base  # noqa: E402,F401 (registers every model)
+from app.crud import crud_access_log  # noqa: E402
+from app.db.session import SessionLocal  # noqa: E402
+from app.models.access_log import AccessLog, AccessLogCounter  # noqa: E402
+from app.models.user import User, UserType  # noqa: E402
+
+
+def create_fixture(db, logs: int, days: int) -> int:
+    tag = uuid.uuid4().hex[:12]
+    employer = User(email=f"bench-{tag}@employer.example", hashed_password="x",
+                    full_name="Bench Employer", user_type=UserType.EMPLOYER)
+    db.add(employer)
+    db.commit()
+    now = datetime.now(timezone.utc)
+    for start in range(0, logs, 10000):
+        crud_access_log.insert_many(db, [
+            {"employer_id": employer.id, "verification_code_id": None,
+             "success": random.random() < 0.8,
+             "accessed_at": now - timedelta(seconds=random.randint(0, days * 86400))}
+            for _ in range(min(10000, logs - start))
+        ])
+        db.commit()
+    crud_access_log.fold_counters(db)
+    return employer.id
+
+
+def count_stats(db, employer_id: int) -> dict:
+    query = db.query(AccessLog).filter(AccessLog.employer_id == employer_id)
+    total = query.count()
+    successful = query.filter(AccessLog.success == True).count()  # noqa: E712
+    recent = query.filter(
+        AccessLog.accessed_at >= datetime.utcnow() - timedelta(days=30)
+    ).count()
+    return {"total_requests": total, "successful_requests": successful,
+            "recent_requests": recent}
+
+
+def timed(label: str, runs: int, func) -> dict:
+    start = time.perf_counter()
+    for _ in range(runs):
+        result = func()
+    elapsed = (time.perf_counter() - start) / runs
+    print(f"{label:<24} {elapsed * 1000:>9.2f} ms/call")
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--logs", type=int, default=200000)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    employer_id = create_fixture(db, args.logs, args.days)
+    try:
+        print(f"{args.logs:,} access logs over {args.days} days")
+        counted = timed("three COUNT(*) queries", args.runs,
+                        lambda: count_stats(db, employer_id))
+        stats = timed("daily counters", args.runs,
+                      lambda: crud_access_log.get_access_stats(db, employer_id=employer_id))
+        # Recent counts differ by up to a day's logs: counters start at midnight UTC
+        ok = (counted["total_requests"] == stats["total_requests"]
+              and counted["successful_requests"] == stats["successful_requests"])
+        print("OK: totals agree" if ok else f"FAIL: {counted} != {stats}")
+    finally:
+        db.close()
+        cleanup(employer_id)
+    sys.exit(0 if ok else 1)
+
+
+def cleanup(employer_id: int) -> None:
+    db = SessionLocal()
+    try:
+        db.query(AccessLog).filter(AccessLog.employer_id == employer_id).delete()
+        db.query(AccessLogCounter).filter(AccessLogCounter.user_id == employer_id).delete()
+        db.query(User).filter(User.id == employer_id).delete()
+        db.commit()
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
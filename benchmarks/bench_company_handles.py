@@ -0,0 +1,87 @@
+"""
+Company handle allocation with many employers sharing one base handle.
+
+Inserts --employers users holding `acme`, `acme1`, ... `acmeN` inside a
+transaction, then times the previous allocator (one SELECT per candidate
+suffix, capped at 1000 before a random 3-digit fallback) against
+generate_company_handle (one prefix query). The transaction is rolled back,
+so the target database is left untouched. Needs a PostgreSQL DATABASE_URL
+with the schema applied.
+
+Usage: DATABASE_URL=postgresql://... python benchmarks/bench_company_handles.py [--employers 10000]
+"""
+import argparse
+import os
+import random
+import string
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("SECRET_KEY", "benchmark")
+
+from sqlalchemy import insert  # noqa: E402
+
+import app.db.base  # noqa: E402,F401 (registers every model)
+from app.db.session import SessionLocal  # noqa: E402
+from app.models.user import User, UserType  # noqa: E402
+from app.utils.id_generator import generate_company_handle  # noqa: E402
+
+
+def legacy_company_handle(company_name, db):
+    base_handle = "".join(c.lower() for c in company_name if c.isalnum())[:20]
+    counter = 0
+    queries = 0
+    while True:
+        handle = base_handle if counter == 0 else f"{base_handle}{counter}"
+        queries += 1
+        if not db.query(User).filter(User.company_handle == handle).first():
+            return handle, queries
+        counter += 1
+        if counter > 999:
+            random_suffix = "".join(random.choices(string.digits, k=3))
+            return f"{base_handle}{random_suffix}", queries
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--employers", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        db.execute(insert(User), [
+            {
+                "email": f"bench-{i}@acme.example",
+                "hashed_password": "x",
+                "full_name": "Bench",
+                "user_type": UserType.EMPLOYER,
+                "company_name": "Acme",
+                "company_handle": "acme" if i == 0 else f"acme{i}",
+            }
+            for i in range(args.employers)
+        ])
+
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            handle, queries = legacy_company_handle("Acme", db)
+        legacy = (time.perf_counter() - start) / args.repeat
+        taken = db.query(User).filter(User.company_handle == handle).first() is not None
+
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            new_handle = generate_company_handle("Acme", db)
+        current = (time.perf_counter() - start) / args.repeat
+
+        print(f"{args.employers:,} employers sharing 'acme'")
+        print(f"{'sequential probes':<20} {legacy * 1000:>9.2f} ms  {queries} queries  "
+              f"-> {handle}{' (already taken)' if taken else ''}")
+        print(f"{'prefix query':<20} {current * 1000:>9.2f} ms  1 query  -> {new_handle}")
+    finally:
+        db.rollback()
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""
+Login throughput vs. password hashing worker count.
+
+Simulates a login storm by verifying the same bcrypt hash concurrently
+through security.verify_password_async, once per worker count, and prints
+logins/sec for each configuration. Worker count 0 means hashing in the
+request threadpool.
+
+Usage: python benchmarks/bench_password_hashing.py [--logins 64] [--workers 0 1 2 4]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("SECRET_KEY", "benchmark")
+
+from app.core import security  # noqa: E402
+from app.core.config import settings  # noqa: E402
+
+
+async def run_storm(logins: int, hashed_password: str) -> float:
+    started = time.perf_counter()
+    results = await asyncio.gather(*[
+        security.verify_password_async("correct horse battery staple", hashed_password)
+        for _ in range(logins)
+    ])
+    elapsed = time.perf_counter() - started
+    assert all(results)
+    return elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--logins", type=int, default=64)
+    parser.add_argument("--workers", type=int, nargs="+", default=[0, 1, 2, 4])
+    args = parser.parse_args()
+
+    hashed_password = security.get_password_hash("correct horse battery staple")
+    settings.PASSWORD_HASH_MAX_PENDING = args.logins
+
+    print(f"{'workers':>8} {'seconds':>10} {'logins/sec':>12}")
+    for workers in args.workers:
+        settings.PASSWORD_HASH_WORKERS = workers
+        # Warm up the pool so process start-up is not measured
+        asyncio.run(run_storm(max(workers, 1), hashed_password))
+        elapsed = asyncio.run(run_storm(args.logins, hashed_password))
+        security.shutdown_password_hashing()
+        print(f"{workers:>8} {elapsed:>10.2f} {args.logins / elapsed:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
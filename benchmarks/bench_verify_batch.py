@@ -0,0 +1,118 @@
+"""
+Batch verification against a loop of single-code verifications.
+
+Creates an employee, an employer and 2 x --codes single-use codes, then
+verifies the first half with one verify_code call per code and the second
+half with verify_codes in batches of --batch. It reports wall time and SQL
+statements for each and checks that both granted every code. The rows are
+deleted afterwards. Needs a PostgreSQL DATABASE_URL with the schema applied.
+
+Usage: DATABASE_URL=postgresql://... python benchmarks/bench_verify_batch.py [--codes 1000] [--batch 100]
+"""
+import argparse
+import os
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("SECRET_KEY", "benchmark")
+
+from sqlalchemy import event, insert  # noqa: E402
+
+import app.db.base  # noqa: E402,F401 (registers every model)
+from app.crud import crud_verification_code  # noqa: E402
+from app.db.session import SessionLocal, engine  # noqa: E402
+from app.models.access_log import AccessLog  # noqa: E402
+from app.models.employment import Employment, EmploymentType  # noqa: E402
+from app.models.user import User, UserType  # noqa: E402
+from app.models.verification_code import VerificationCode  # noqa: E402
+from app.utils.verification_codes import random_code_values, render_verification_code  # noqa: E402
+
+
+def create_fixture(db, count: int):
+    tag = uuid.uuid4().hex[:12]
+    employee = User(email=f"bench-{tag}@employee.example", hashed_password="x",
+                    full_name="Bench Employee", user_type=UserType.EMPLOYEE)
+    employer = User(email=f"bench-{tag}@employer.example", hashed_password="x",
+                    full_name="Bench Employer", user_type=UserType.EMPLOYER)
+    db.add_all([employee, employer])
+    db.flush()
+    employment = Employment(employee_id=employee.id, company_name="Bench Co",
+                            job_title="Engineer", employment_type=EmploymentType.FULL_TIME,
+                            start_date=datetime(2020, 1, 1))
+    db.add(employment)
+    db.flush()
+    keys = random_code_values(count)
+    expires_at = datetime.utcnow() + timedelta(hours=1)
+    db.execute(insert(VerificationCode), [
+        {"code_key": key, "employee_id": employee.id, "employment_id": employment.id,
+         "purpose": "benchmark", "max_usage_count": 1, "expires_at": expires_at}
+        for key in keys
+    ])
+    db.commit()
+    return employee.id, employer.id, [render_verification_code(key) for key in keys]
+
+
+def run(label: str, func) -> bool:
+    statements = []
+
+    def count(*_):
+        statements.append(1)
+
+    event.listen(engine, "before_cursor_execute", count)
+    start = time.perf_counter()
+    results = func()
+    elapsed = time.perf_counter() - start
+    event.remove(engine, "before_cursor_execute", count)
+    granted = sum(result.success for result in results)
+    print(f"{label:<28} {elapsed * 1000:>9.1f} ms  {len(statements):>6} statements  "
+          f"{granted}/{len(results)} granted")
+    return granted == len(results)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--codes", type=int, default=1000)
+    parser.add_argument("--batch", type=int, default=100)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    employee_id, employer_id, codes = create_fixture(db, 2 * args.codes)
+    single, batched = codes[:args.codes], codes[args.codes:]
+    try:
+        ok = run("verify_code per code", lambda: [
+            crud_verification_code.verify_code(
+                db, code=code, employer_id=employer_id, ip_address="203.0.113.7"
+            )
+            for code in single
+        ])
+        ok &= run(f"verify_codes, {args.batch} per batch", lambda: [
+            result
+            for i in range(0, len(batched), args.batch)
+            for result in crud_verification_code.verify_codes(
+                db, codes=batched[i:i + args.batch], employer_id=employer_id,
+                ip_address="203.0.113.7"
+            )
+        ])
+    finally:
+        db.close()
+        cleanup(employee_id, employer_id)
+    sys.exit(0 if ok else 1)
+
+
+def cleanup(employee_id: int, employer_id: int) -> None:
+    db = SessionLocal()
+    try:
+        db.query(AccessLog).filter(AccessLog.employer_id == employer_id).delete()
+        db.query(VerificationCode).filter(VerificationCode.employee_id == employee_id).delete()
+        db.query(Employment).filter(Employment.employee_id == employee_id).delete()
+        db.query(User).filter(User.id.in_([employee_id, employer_id])).delete()
+        db.commit()
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Concurrent verification of one multi-use code.
+
+Creates an employee, an employer and a code allowing --uses verifications,
+then fires --attempts verify_code calls at it from --threads threads, each
+with its own session. The atomic consume must grant exactly --uses of them,
+leaving current_usage_count == max_usage_count and the code USED. Exits
+non-zero on over- or under-consumption. The rows are deleted afterwards.
+Needs a PostgreSQL DATABASE_URL with the schema applied.
+
+Usage: DATABASE_URL=postgresql://... python benchmarks/bench_verify_concurrency.py [--uses 25] [--attempts 400]
+"""
+import argparse
+import os
+import sys
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("SECRET_KEY", "benchmark")
+# Every failed attempt would otherwise count towards the verification throttle
+os.environ.setdefault("MAX_VERIFICATION_ATTEMPTS", "1000000")
+
+import app.db.base  # noqa: E402,F401 (registers every model)
+from app.crud import crud_verification_code  # noqa: E402
+from app.db.session import SessionLocal  # noqa: E402
+from app.models.access_log import AccessLog  # noqa: E402
+from app.models.employment import Employment, EmploymentType  # noqa: E402
+from app.models.user import User, UserType  # noqa: E402
+from app.models.verification_code import VerificationCode, VerificationCodeStatus  # noqa: E402
+from app.utils.verification_codes import random_code_values, render_verification_code  # noqa: E402
+
+
+def create_fixture(db, uses: int):
+    tag = uuid.uuid4().hex[:12]
+    employee = User(email=f"bench-{tag}@employee.example", hashed_password="x",
+                    full_name="Bench Employee", user_type=UserType.EMPLOYEE)
+    employer = User(email=f"bench-{tag}@employer.example", hashed_password="x",
+                    full_name="Bench Employer", user_type=UserType.EMPLOYER)
+    db.add_all([employee, employer])
+    db.flush()
+    employment = Employment(employee_id=employee.id, company_name="Bench Co",
+                            job_title="Engineer", employment_type=EmploymentType.FULL_TIME,
+                            start_date=datetime(2020, 1, 1))
+    db.add(employment)
+    db.flush()
+    code = VerificationCode(code_key=random_code_values(1)[0], employee_id=employee.id,
+                            employment_id=employment.id, purpose="benchmark",
+                            max_usage_count=uses,
+                            expires_at=datetime.utcnow() + timedelta(hours=1))
+    db.add(code)
+    db.commit()
+    return employee.id, employer.id, code.id, render_verification_code(code.code_key)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--uses", type=int, default=25)
+    parser.add_argument("--attempts", type=int, default=400)
+    parser.add_argument("--threads", type=int, default=32)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    employee_id, employer_id, code_id, code = create_fixture(db, args.uses)
+
+    def verify(_):
+        session = SessionLocal()
+        try:
+            return crud_verification_code.verify_code(
+                session, code=code, employer_id=employer_id, ip_address="203.0.113.7"
+            ).success
+        finally:
+            session.close()
+
+    try:
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.threads) as pool:
+            granted = sum(pool.map(verify, range(args.attempts)))
+        elapsed = time.perf_counter() - start
+
+        db.expire_all()
+        row = db.get(VerificationCode, code_id)
+        print(f"{args.attempts} attempts on a {args.uses}-use code from "
+              f"{args.threads} threads in {elapsed:.2f}s "
+              f"({args.attempts / elapsed:,.0f} verifies/s)")
+        print(f"granted={granted} current_usage_count={row.current_usage_count} "
+              f"status={row.status.value}")
+        ok = (granted == args.uses == row.current_usage_count
+              and row.status == VerificationCodeStatus.USED)
+        print("OK: no over-consumption" if ok else "FAIL: usage count mismatch")
+    finally:
+        db.close()
+        cleanup(employee_id, employer_id)
+    sys.exit(0 if ok else 1)
+
+
+def cleanup(employee_id: int, employer_id: int) -> None:
+    db = SessionLocal()
+    try:
+        db.query(AccessLog).filter(AccessLog.employer_id == employer_id).delete()
+        db.query(VerificationCode).filter(VerificationCode.employee_id == employee_id).delete()
+        db.query(Employment).filter(Employment.employee_id == employee_id).delete()
+        db.query(User).filter(User.id.in_([employee_id, employer_id])).delete()
+        db.commit()
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
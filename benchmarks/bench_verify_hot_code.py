@@ -0,0 +1,146 @@
+"""
+Contention on one hot multi-use code, with and without usage shards.
+
+Creates an employee, an employer and three codes: one counting uses on its
+own row, one spread over --shards shard rows (both allowing far more than
+--attempts uses), and a sharded code allowing only --boundary-uses. Each code
+gets --attempts concurrent verify_code calls from --threads threads, each
+with its own session. It reports throughput and latency percentiles for the
+first two, then checks that the boundary code granted exactly its limit and
+reconciles to current_usage_count == max_usage_count and USED. Exits
+non-zero on a mismatch. The rows are deleted afterwards. Needs a PostgreSQL
+DATABASE_URL with the schema applied.
+
+Usage: DATABASE_URL=postgresql://... python benchmarks/bench_verify_hot_code.py [--attempts 200] [--threads 25] [--shards 16]
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("SECRET_KEY", "benchmark")
+# Every failed attempt would otherwise count towards the verification throttle
+os.environ.setdefault("MAX_VERIFICATION_ATTEMPTS", "1000000")
+
+import app.db.base  # noqa: E402,F401 (registers every model)
+from app.core.config import settings  # noqa: E402
+from app.crud import crud_verification_code  # noqa: E402
+from app.db.session import SessionLocal  # noqa: E402
+from app.models.access_log import AccessLog  # noqa: E402
+from app.models.employment import Employment, EmploymentType  # noqa: E402
+from app.models.user import User, UserType  # noqa: E402
+from app.models.verification_code import VerificationCode, VerificationCodeStatus  # noqa: E402
+from app.schemas.verification_code import VerificationCodeCreate  # noqa: E402
+
+
+def create_fixture(db):
+    tag = uuid.uuid4().hex[:12]
+    employee = User(email=f"bench-{tag}@employee.example", hashed_password="x",
+                    full_name="Bench Employee", user_type=UserType.EMPLOYEE)
+    employer = User(email=f"bench-{tag}@employer.example", hashed_password="x",
+                    full_name="Bench Employer", user_type=UserType.EMPLOYER)
+    db.add_all([employee, employer])
+    db.flush()
+    employment = Employment(employee_id=employee.id, company_name="Bench Co",
+                            job_title="Engineer", employment_type=EmploymentType.FULL_TIME,
+                            start_date=datetime(2020, 1, 1))
+    db.add(employment)
+    db.commit()
+    return employee.id, employer.id, employment.id
+
+
+def create_code(db, employee_id: int, employment_id: int, uses: int, shards: int):
+    settings.VERIFICATION_USAGE_SHARDS = shards
+    settings.VERIFICATION_USAGE_SHARD_MIN_USES = 1
+    code = crud_verification_code.create_with_employee(
+        db,
+        obj_in=VerificationCodeCreate(
+            purpose="benchmark", max_usage_count=uses, employment_id=employment_id,
+            expires_at=datetime.utcnow() + timedelta(hours=1)
+        ),
+        employee_id=employee_id
+    )
+    return code.id, code.code
+
+
+def hammer(code: str, employer_id: int, attempts: int, threads: int):
+    def verify(_):
+        session = SessionLocal()
+        try:
+            start = time.perf_counter()
+            success = crud_verification_code.verify_code(
+                session, code=code, employer_id=employer_id, ip_address="203.0.113.7"
+            ).success
+            return success, time.perf_counter() - start
+        finally:
+            session.close()
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        results = list(pool.map(verify, range(attempts)))
+    elapsed = time.perf_counter() - start
+    return sum(success for success, _ in results), [latency for _, latency in results], elapsed
+
+
+def report(label: str, attempts: int, granted: int, latencies, elapsed: float) -> None:
+    cuts = statistics.quantiles(latencies, n=100)
+    print(f"{label:<20} {elapsed:>6.2f}s  {attempts / elapsed:>7,.0f} verifies/s  "
+          f"p50 {cuts[49] * 1000:>6.1f} ms  p99 {cuts[98] * 1000:>6.1f} ms  "
+          f"{granted}/{attempts} granted")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--attempts", type=int, default=200)
+    parser.add_argument("--threads", type=int, default=25)
+    parser.add_argument("--shards", type=int, default=16)
+    parser.add_argument("--boundary-uses", type=int, default=50)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    employee_id, employer_id, employment_id = create_fixture(db)
+    ok = True
+    try:
+        print(f"{args.attempts} concurrent verifications of one code from {args.threads} threads")
+        for label, shards in (("single row", 0), (f"{args.shards} shards", args.shards)):
+            _, code = create_code(db, employee_id, employment_id, 1000000, shards)
+            granted, latencies, elapsed = hammer(code, employer_id, args.attempts, args.threads)
+            report(label, args.attempts, granted, latencies, elapsed)
+            ok &= granted == args.attempts
+
+        code_id, code = create_code(db, employee_id, employment_id, args.boundary_uses, args.shards)
+        granted, _, _ = hammer(code, employer_id, args.attempts, args.threads)
+        crud_verification_code.reconcile_usage(db)
+        db.expire_all()
+        row = db.get(VerificationCode, code_id)
+        print(f"boundary: {args.boundary_uses}-use code granted={granted} "
+              f"current_usage_count={row.current_usage_count} status={row.status.value}")
+        boundary_ok = (granted == args.boundary_uses == row.current_usage_count
+                       and row.status == VerificationCodeStatus.USED)
+        print("OK: limit enforced exactly" if boundary_ok else "FAIL: usage count mismatch")
+        ok &= boundary_ok
+    finally:
+        db.close()
+        cleanup(employee_id, employer_id)
+    sys.exit(0 if ok else 1)
+
+
+def cleanup(employee_id: int, employer_id: int) -> None:
+    db = SessionLocal()
+    try:
+        db.query(AccessLog).filter(AccessLog.employer_id == employer_id).delete()
+        db.query(VerificationCode).filter(VerificationCode.employee_id == employee_id).delete()
+        db.query(Employment).filter(Employment.employee_id == employee_id).delete()
+        db.query(User).filter(User.id.in_([employee_id, employer_id])).delete()
+        db.commit()
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -5,8 +5,14 @@ from contextlib import asynccontextmanager
 import logging
 
 from app.core.config import settings
+from app.core.metrics import metrics
+from app.core.rate_limit import RateLimitMiddleware
+from app.core.redis_client import close_redis
+from app.core.security import init_password_hashing, shutdown_password_hashing
+from app.api import deps
 from app.api.api_v1.api import api_router
 from app.db.init_db import init_db
+from app.db.jobs import start_background_tasks, stop_background_tasks
 from app.db.session import engine
 
 
@@ -22,14 +28,19 @@ logger = logging.getLogger(__name__)
 async def lifespan(app: FastAPI):
     # Startup
     logger.info("Starting up SunLighter API...")
+    init_password_hashing()
     try:
         init_db()
         logger.info("Database initialized successfully")
     except Exception as e:
         logger.error(f"Database initialization failed: {e}")
+    await start_background_tasks()
     yield
     # Shutdown
     logger.info("Shutting down SunLighter API...")
+    await stop_background_tasks()
+    await close_redis()
+    shutdown_password_hashing()
 
 
 # Create FastAPI app
@@ -41,6 +52,10 @@ app = FastAPI(
     lifespan=lifespan
 )
 
+# Rate limiting (added before CORS so rejections still carry CORS headers)
+if settings.RATE_LIMIT_ENABLED:
+    app.add_middleware(RateLimitMiddleware)
+
 # Set all CORS enabled origins
 if settings.BACKEND_CORS_ORIGINS:
     app.add_middleware(
@@ -82,6 +97,12 @@ async def health_check():
     }
 
 
+@app.get("/metrics", dependencies=[Depends(deps.verify_maintenance_token)])
+async def read_metrics():
+    """In-process metrics for this worker"""
+    return metrics.snapshot()
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(
@@ -0,0 +1,32 @@
+"""Add company handle prefix index
+
+Revision ID: 0a7d5e3c9b18
+Revises: f1c4e7a2b9d3
+Create Date: 2026-10-17 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0a7d5e3c9b18'
+down_revision: Union[str, Sequence[str], None] = 'f1c4e7a2b9d3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # LIKE 'prefix%' can only use a btree index with text_pattern_ops under
+    # a non-C collation
+    op.create_index('ix_users_company_handle_pattern', 'users', ['company_handle'],
+                    unique=False,
+                    postgresql_ops={'company_handle': 'text_pattern_ops'})
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_users_company_handle_pattern', table_name='users')
@@ -0,0 +1,81 @@
+"""Store verification codes as integer keys
+
+Revision ID: 1b6f0c8d4e27
+Revises: 0a7d5e3c9b18
+Create Date: 2026-10-17 14:00:00.000000
+
+"""
+import string
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '1b6f0c8d4e27'
+down_revision: Union[str, Sequence[str], None] = '0a7d5e3c9b18'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 10000
+ALPHABET = string.digits + string.ascii_uppercase
+
+codes = sa.table(
+    'verification_codes',
+    sa.column('id', sa.Integer),
+    sa.column('code', sa.String),
+    sa.column('code_key', sa.BigInteger),
+)
+
+
+def _render(value: int) -> str:
+    digits = []
+    for _ in range(12):
+        value, digit = divmod(value, 36)
+        digits.append(ALPHABET[digit])
+    digits = ''.join(reversed(digits))
+    return f"SL-{digits[:4]}-{digits[4:8]}-{digits[8:]}"
+
+
+def _backfill(source, target, convert) -> None:
+    connection = op.get_bind()
+    last_id = 0
+    while True:
+        rows = connection.execute(
+            sa.select(codes.c.id, source)
+            .where(codes.c.id > last_id)
+            .order_by(codes.c.id)
+            .limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        connection.execute(
+            codes.update()
+            .where(codes.c.id == sa.bindparam('_id'))
+            .values({target.name: sa.bindparam('_value')}),
+            [{'_id': row_id, '_value': convert(value)} for row_id, value in rows],
+        )
+        last_id = rows[-1][0]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('verification_codes', sa.Column('code_key', sa.BigInteger(), nullable=True))
+    # SL-XXXX-XXXX-XXXX -> int('XXXXXXXXXXXX', 36)
+    _backfill(codes.c.code, codes.c.code_key,
+              lambda code: int(code.replace('-', '')[2:], 36))
+    op.alter_column('verification_codes', 'code_key', nullable=False)
+    op.create_index(op.f('ix_verification_codes_code_key'), 'verification_codes', ['code_key'], unique=True)
+    op.drop_index(op.f('ix_verification_codes_code'), table_name='verification_codes')
+    op.drop_column('verification_codes', 'code')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.add_column('verification_codes', sa.Column('code', sa.String(), nullable=True))
+    _backfill(codes.c.code_key, codes.c.code, _render)
+    op.alter_column('verification_codes', 'code', nullable=False)
+    op.create_index(op.f('ix_verification_codes_code'), 'verification_codes', ['code'], unique=True)
+    op.drop_index(op.f('ix_verification_codes_code_key'), table_name='verification_codes')
+    op.drop_column('verification_codes', 'code_key')
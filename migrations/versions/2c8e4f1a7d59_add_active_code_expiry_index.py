@@ -0,0 +1,32 @@
+"""Add partial index on active verification code expiry
+
+Revision ID: 2c8e4f1a7d59
+Revises: 1b6f0c8d4e27
+Create Date: 2026-10-17 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2c8e4f1a7d59'
+down_revision: Union[str, Sequence[str], None] = '1b6f0c8d4e27'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # The enum column stores member names, hence 'ACTIVE'
+    op.create_index('ix_verification_codes_active_expires_at', 'verification_codes',
+                    ['expires_at'], unique=False,
+                    postgresql_where=sa.text("status = 'ACTIVE'"),
+                    sqlite_where=sa.text("status = 'ACTIVE'"))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_verification_codes_active_expires_at', table_name='verification_codes')
@@ -0,0 +1,45 @@
+"""Add usage shard rows for hot verification codes
+
+Revision ID: 3d9b2e6f8a14
+Revises: 2c8e4f1a7d59
+Create Date: 2026-10-17 17:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3d9b2e6f8a14'
+down_revision: Union[str, Sequence[str], None] = '2c8e4f1a7d59'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('verification_codes',
+                  sa.Column('usage_shards', sa.Integer(), nullable=False, server_default='0'))
+    op.create_table(
+        'verification_code_usage_shards',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('code_id', sa.Integer(), nullable=False),
+        sa.Column('shard', sa.Integer(), nullable=False),
+        sa.Column('quota', sa.Integer(), nullable=False),
+        sa.Column('used', sa.Integer(), nullable=False, server_default='0'),
+        sa.ForeignKeyConstraint(['code_id'], ['verification_codes.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('code_id', 'shard', name='uq_verification_code_usage_shards_code_shard')
+    )
+    op.create_index(op.f('ix_verification_code_usage_shards_code_id'),
+                    'verification_code_usage_shards', ['code_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_verification_code_usage_shards_code_id'),
+                  table_name='verification_code_usage_shards')
+    op.drop_table('verification_code_usage_shards')
+    op.drop_column('verification_codes', 'usage_shards')
@@ -0,0 +1,59 @@
+"""Add daily access log counters
+
+Revision ID: 4e1c7a9d2b63
+Revises: 3d9b2e6f8a14
+Create Date: 2026-10-17 18:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4e1c7a9d2b63'
+down_revision: Union[str, Sequence[str], None] = '3d9b2e6f8a14'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'access_log_counters',
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('total', sa.Integer(), nullable=False),
+        sa.Column('successful', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('user_id', 'day')
+    )
+    # Count existing logs for their employer and, through the code, their
+    # employee, by UTC day
+    op.execute("""
+        INSERT INTO access_log_counters (user_id, day, total, successful)
+        SELECT user_id, day, SUM(total), SUM(successful)
+        FROM (
+            SELECT l.employer_id AS user_id,
+                   CAST(l.accessed_at AT TIME ZONE 'UTC' AS DATE) AS day,
+                   COUNT(*) AS total,
+                   COUNT(*) FILTER (WHERE l.success) AS successful
+            FROM access_logs l
+            GROUP BY 1, 2
+            UNION ALL
+            SELECT c.employee_id,
+                   CAST(l.accessed_at AT TIME ZONE 'UTC' AS DATE),
+                   COUNT(*),
+                   COUNT(*) FILTER (WHERE l.success)
+            FROM access_logs l
+            JOIN verification_codes c ON c.id = l.verification_code_id
+            GROUP BY 1, 2
+        ) AS counts
+        GROUP BY user_id, day
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('access_log_counters')
@@ -0,0 +1,32 @@
+"""Add access log indexes for time-range scans per employer and code
+
+Revision ID: 5f2d8b0e3c71
+Revises: 4e1c7a9d2b63
+Create Date: 2026-10-17 19:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5f2d8b0e3c71'
+down_revision: Union[str, Sequence[str], None] = '4e1c7a9d2b63'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_access_logs_employer_id_accessed_at', 'access_logs',
+                    ['employer_id', 'accessed_at'], unique=False)
+    op.create_index('ix_access_logs_verification_code_id_accessed_at', 'access_logs',
+                    ['verification_code_id', 'accessed_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_access_logs_verification_code_id_accessed_at', table_name='access_logs')
+    op.drop_index('ix_access_logs_employer_id_accessed_at', table_name='access_logs')
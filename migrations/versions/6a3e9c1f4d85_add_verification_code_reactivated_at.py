@@ -0,0 +1,34 @@
+"""Add reactivated_at to verification codes
+
+Revision ID: 6a3e9c1f4d85
+Revises: 5f2d8b0e3c71
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6a3e9c1f4d85'
+down_revision: Union[str, Sequence[str], None] = '5f2d8b0e3c71'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('verification_codes',
+                  sa.Column('reactivated_at', sa.DateTime(timezone=True), nullable=True))
+    op.create_index('ix_verification_codes_reactivated_at', 'verification_codes',
+                    ['reactivated_at'], unique=False,
+                    postgresql_where=sa.text('reactivated_at IS NOT NULL'),
+                    sqlite_where=sa.text('reactivated_at IS NOT NULL'))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_verification_codes_reactivated_at', table_name='verification_codes')
+    op.drop_column('verification_codes', 'reactivated_at')
@@ -0,0 +1,35 @@
+"""Add counted flag to access logs
+
+Revision ID: 7b4f0d2c9e16
+Revises: 6a3e9c1f4d85
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7b4f0d2c9e16'
+down_revision: Union[str, Sequence[str], None] = '6a3e9c1f4d85'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('access_logs',
+                  sa.Column('counted', sa.Boolean(), server_default=sa.false(), nullable=False))
+    # Existing rows were counted when written (or by the counters backfill)
+    op.execute("UPDATE access_logs SET counted = true")
+    op.create_index('ix_access_logs_uncounted', 'access_logs', ['id'], unique=False,
+                    postgresql_where=sa.text('NOT counted'),
+                    sqlite_where=sa.text('NOT counted'))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_access_logs_uncounted', table_name='access_logs')
+    op.drop_column('access_logs', 'counted')
@@ -0,0 +1,34 @@
+"""Allow access logs without a verification code
+
+Revision ID: d3a98f6c1e52
+Revises: c7e41d9b2a30
+Create Date: 2026-10-17 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd3a98f6c1e52'
+down_revision: Union[str, Sequence[str], None] = 'c7e41d9b2a30'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Unknown-code attempts and throttling summaries have no code to reference
+    op.alter_column('access_logs', 'verification_code_id',
+               existing_type=sa.Integer(),
+               nullable=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DELETE FROM access_logs WHERE verification_code_id IS NULL")
+    op.alter_column('access_logs', 'verification_code_id',
+               existing_type=sa.Integer(),
+               nullable=False)
@@ -0,0 +1,35 @@
+"""Add public ID sequences
+
+Revision ID: f1c4e7a2b9d3
+Revises: e5b2c8a71f04
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f1c4e7a2b9d3'
+down_revision: Union[str, Sequence[str], None] = 'e5b2c8a71f04'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Employee user IDs and employer IDs are keyed permutations of these
+    op.execute(sa.schema.CreateSequence(sa.Sequence(
+        'employee_user_id_seq', start=0, minvalue=0, maxvalue=26 * 36 ** 5 - 1
+    )))
+    op.execute(sa.schema.CreateSequence(sa.Sequence(
+        'employer_id_seq', start=0, minvalue=0, maxvalue=900000 - 1
+    )))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute(sa.schema.DropSequence(sa.Sequence('employer_id_seq')))
+    op.execute(sa.schema.DropSequence(sa.Sequence('employee_user_id_seq')))
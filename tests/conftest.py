@@ -0,0 +1,78 @@
+import os
+import tempfile
+import uuid
+from datetime import datetime, timedelta
+
+# Settings are read at import time; default to a throwaway SQLite database
+TEST_DB = os.path.join(tempfile.gettempdir(), "sunlighter-test.db")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{TEST_DB}")
+os.environ.setdefault("SECRET_KEY", "test")
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+# Tests verify far more codes than the brute-force throttle allows
+os.environ.setdefault("MAX_VERIFICATION_ATTEMPTS", "1000000")
+
+import pytest  # noqa: E402
+
+from app.db.base import Base  # noqa: E402
+from app.db.session import SessionLocal, engine  # noqa: E402
+from app.models.employment import Employment, EmploymentType  # noqa: E402
+from app.models.user import User, UserType  # noqa: E402
+from app.models.verification_code import VerificationCode, VerificationCodeStatus  # noqa: E402
+from app.utils.verification_codes import random_code_values  # noqa: E402
+
+
+@pytest.fixture(scope="session", autouse=True)
+def schema():
+    if engine.dialect.name == "sqlite" and os.path.exists(TEST_DB):
+        os.remove(TEST_DB)
+    Base.metadata.create_all(engine)
+    yield
+
+
+@pytest.fixture
+def db():
+    session = SessionLocal()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def make_code(db):
+    """Create an employee with one employment and return a code factory"""
+    tag = uuid.uuid4().hex[:12]
+    employee = User(email=f"test-{tag}@employee.example", hashed_password="x",
+                    full_name="Test Employee", user_type=UserType.EMPLOYEE)
+    db.add(employee)
+    db.flush()
+    employment = Employment(employee_id=employee.id, company_name="Test Co",
+                            job_title="Engineer", employment_type=EmploymentType.FULL_TIME,
+                            start_date=datetime(2020, 1, 1))
+    db.add(employment)
+    db.commit()
+
+    def make(
+        max_usage_count: int = 1,
+        status: VerificationCodeStatus = VerificationCodeStatus.ACTIVE,
+        current_usage_count: int = 0,
+        expires_in: timedelta = timedelta(hours=1)
+    ) -> VerificationCode:
+        code = VerificationCode(code_key=random_code_values(1)[0], employee_id=employee.id,
+                                employment_id=employment.id, purpose="test", status=status,
+                                max_usage_count=max_usage_count,
+                                current_usage_count=current_usage_count,
+                                expires_at=datetime.utcnow() + expires_in)
+        db.add(code)
+        db.commit()
+        return code
+
+    return make
+
+
+@pytest.fixture
+def employer(db):
+    tag = uuid.uuid4().hex[:12]
+    user = User(email=f"test-{tag}@employer.example", hashed_password="x",
+                full_name="Test Employer", user_type=UserType.EMPLOYER)
+    db.add(user)
+    db.commit()
+    return user
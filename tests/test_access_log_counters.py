@@ -0,0 +1,20 @@
+from app.crud import crud_access_log
+
+
+def test_logs_reach_stats_once_folded(db, make_code, employer):
+    code = make_code()
+    crud_access_log.insert_many(db, [
+        {"employer_id": employer.id, "verification_code_id": code.id, "success": success}
+        for success in (True, True, False)
+    ])
+    db.commit()
+    assert crud_access_log.get_access_stats(db, employer_id=employer.id)["total_requests"] == 0
+
+    crud_access_log.fold_counters(db)
+    crud_access_log.fold_counters(db)
+
+    for stats in (
+        crud_access_log.get_access_stats(db, employer_id=employer.id),
+        crud_access_log.get_access_stats(db, employee_id=code.employee_id),
+    ):
+        assert (stats["total_requests"], stats["successful_requests"]) == (3, 2)
@@ -0,0 +1,29 @@
+from app.crud import crud_access_log
+from app.schemas.access_log import AccessLogWithDetails
+
+
+def test_details_of_log_without_code(db, employer):
+    (log_id,) = crud_access_log.insert_many(db, [
+        {"employer_id": employer.id, "verification_code_id": None, "success": False,
+         "error_message": "Invalid verification code"}
+    ])
+    db.commit()
+
+    details = AccessLogWithDetails.model_validate(crud_access_log.get_with_details(db, id=log_id))
+
+    assert details.verification_code is None
+    assert details.employee_name is None
+    assert details.employer_name == employer.full_name
+
+
+def test_details_of_log_with_code(db, make_code, employer):
+    code = make_code()
+    (log_id,) = crud_access_log.insert_many(db, [
+        {"employer_id": employer.id, "verification_code_id": code.id, "success": True}
+    ])
+    db.commit()
+
+    details = AccessLogWithDetails.model_validate(crud_access_log.get_with_details(db, id=log_id))
+
+    assert details.verification_code == code.code
+    assert details.employee_name == code.employee.full_name
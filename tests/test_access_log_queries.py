@@ -0,0 +1,53 @@
+import pytest
+from sqlalchemy import event
+
+from app.crud import crud_access_log
+from app.db.session import engine
+from app.schemas.access_log import AccessLogWithDetails
+
+PAGE = 20
+
+
+@pytest.fixture
+def logs(db, make_code, employer):
+    codes = [make_code() for _ in range(PAGE // 2)]
+    crud_access_log.insert_many(db, [
+        {"employer_id": employer.id, "verification_code_id": code.id, "success": True}
+        for code in codes
+    ] + [
+        {"employer_id": employer.id, "verification_code_id": None, "success": False}
+        for _ in range(PAGE // 2)
+    ])
+    db.commit()
+    accounts = {"employee": codes[0].employee_id, "employer": employer.id}
+    # Nothing left in the identity map from setup
+    db.expunge_all()
+    return accounts
+
+
+def count_queries(func) -> int:
+    statements = []
+    listener = lambda *args: statements.append(args[2])  # noqa: E731
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        func()
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+    return len(statements)
+
+
+@pytest.mark.parametrize("account", ["employee", "employer"])
+def test_detailed_page_takes_one_query(db, logs, account):
+    def page():
+        if account == "employee":
+            rows = crud_access_log.get_multi_by_employee(
+                db, employee_id=logs["employee"], limit=PAGE
+            )
+        else:
+            rows = crud_access_log.get_multi_by_employer(
+                db, employer_id=logs["employer"], limit=PAGE
+            )
+        details = [AccessLogWithDetails.model_validate(row) for row in rows]
+        assert len(details) == (PAGE // 2 if account == "employee" else PAGE)
+
+    assert count_queries(page) == 1
@@ -0,0 +1,51 @@
+from app.crud import crud_verification_code
+from app.crud.crud_verification_code import LiveCodeFilter
+from app.models.verification_code import VerificationCodeStatus
+
+
+def new_worker_filter(db) -> LiveCodeFilter:
+    live_codes = LiveCodeFilter()
+    live_codes.enabled = True
+    live_codes.load(db)
+    return live_codes
+
+
+def test_sync_adds_code_reactivated_by_another_worker(db, make_code):
+    code = make_code(status=VerificationCodeStatus.REVOKED)
+    worker = new_worker_filter(db)
+    assert not worker.might_contain(db, code.code_key)
+
+    # Reactivated through the API on another worker
+    crud_verification_code.update(
+        db, db_obj=code, obj_in={"status": VerificationCodeStatus.ACTIVE}
+    )
+    worker.sync(db)
+
+    assert worker.might_contain(db, code.code_key)
+
+
+def test_discard_of_key_never_added_leaves_filter_untouched(db, make_code):
+    live = make_code()
+    code = make_code(status=VerificationCodeStatus.REVOKED)
+    worker = new_worker_filter(db)
+    counters = bytes(worker._filter._bits)
+
+    # Reactivated on another worker, then revoked on this one before a sync:
+    # removing the key would decrement counters shared with other codes
+    worker.discard(code.id, code.code_key)
+
+    assert bytes(worker._filter._bits) == counters
+    assert worker.might_contain(db, live.code_key)
+
+
+def test_sync_drops_code_taken_out_of_active_state_by_another_worker(db, make_code):
+    code = make_code()
+    worker = new_worker_filter(db)
+    assert worker.might_contain(db, code.code_key)
+
+    crud_verification_code.update(
+        db, db_obj=code, obj_in={"status": VerificationCodeStatus.REVOKED}
+    )
+    worker.sync(db)
+
+    assert code.code_key not in worker._filter
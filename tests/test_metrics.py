@@ -0,0 +1,14 @@
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from main import app
+
+client = TestClient(app)
+
+
+def test_metrics_require_maintenance_token(monkeypatch):
+    monkeypatch.setattr(settings, "MAINTENANCE_TOKEN", "ops-secret")
+
+    assert client.get("/metrics").status_code == 403
+    assert client.get("/metrics", headers={"X-Maintenance-Token": "wrong"}).status_code == 403
+    assert client.get("/metrics", headers={"X-Maintenance-Token": "ops-secret"}).status_code == 200
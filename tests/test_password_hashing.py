@@ -0,0 +1,22 @@
+from app.core import security
+
+
+def test_calibrated_workers_keep_each_others_hashes():
+    security.configure_password_hashing(5, min_rounds=4, max_rounds=6)
+    slow_hash = security.get_password_hash("secret")
+    security.configure_password_hashing(4, min_rounds=4, max_rounds=6)
+    fast_hash = security.get_password_hash("secret")
+
+    for hashed in (slow_hash, fast_hash):
+        assert security.verify_and_rehash_password("secret", hashed) == (True, None)
+
+
+def test_hashes_below_floor_are_upgraded():
+    security.configure_password_hashing(4)
+    weak_hash = security.get_password_hash("secret")
+    security.configure_password_hashing(6, min_rounds=5, max_rounds=7)
+
+    verified, new_hash = security.verify_and_rehash_password("secret", weak_hash)
+
+    assert verified
+    assert new_hash is not None and new_hash.startswith("$2b$06$")
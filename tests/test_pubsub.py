@@ -0,0 +1,15 @@
+import json
+
+from app.core.pubsub import RedisPubSub
+
+
+def test_received_events_keep_redis_ids_and_local_ids_follow():
+    pubsub = RedisPubSub(history=10, max_channels=10)
+    far_future = 10 ** 17
+    pubsub._receive("approvals", f"{far_future} {json.dumps({'type': 'a'})}".encode())
+
+    events, cursor = pubsub._since("approvals", 0), pubsub.cursor("approvals")
+    assert events == [{"id": far_future, "type": "a"}]
+    assert cursor == far_future
+    # Redis unavailable: a locally delivered event still sorts after it
+    assert pubsub._next_id() > far_future
@@ -0,0 +1,42 @@
+import uuid
+from datetime import datetime, timedelta
+
+from app.crud.crud_revoked_token import CRUDRevokedToken
+from app.models.revoked_token import RevokedToken
+
+
+def new_worker_denylist(db) -> CRUDRevokedToken:
+    denylist = CRUDRevokedToken(RevokedToken)
+    denylist.load(db)
+    return denylist
+
+
+def test_revoking_twice_is_a_no_op(db):
+    denylist = new_worker_denylist(db)
+    jti = uuid.uuid4().hex
+    expires_at = datetime.utcnow() + timedelta(hours=1)
+
+    denylist.revoke(db, jti=jti, expires_at=expires_at)
+    # Another worker's view is stale, so it inserts the same jti again
+    new_worker_denylist(db).revoke(db, jti=jti, expires_at=expires_at)
+
+    assert db.query(RevokedToken).filter(RevokedToken.jti == jti).count() == 1
+    assert denylist.is_revoked(db, jti=jti)
+
+
+def test_sync_picks_up_revocation_committed_below_cursor(db):
+    expires_at = datetime.utcnow() + timedelta(hours=1)
+    late = RevokedToken(jti=uuid.uuid4().hex, expires_at=expires_at)
+    db.add(late)
+    db.flush()
+    db.add(RevokedToken(jti=uuid.uuid4().hex, expires_at=expires_at))
+    db.flush()
+    denylist = CRUDRevokedToken(RevokedToken)
+    # This worker's cursor already passed the id of a revocation that
+    # commits late, out of id order
+    denylist._last_id = late.id + 1
+    db.commit()
+
+    denylist.sync(db)
+
+    assert denylist.is_revoked(db, jti=late.jti)
@@ -0,0 +1,38 @@
+from datetime import timedelta
+
+from app.crud import crud_verification_code
+from app.crud.crud_verification_code import THROTTLED_RESPONSE, verification_throttle
+from app.models.verification_code import VerificationCodeStatus
+from app.utils.verification_codes import random_code_values, render_verification_code
+
+LIMIT = 3
+
+
+def test_expired_and_used_codes_do_not_throttle(db, make_code, employer, monkeypatch):
+    monkeypatch.setattr(verification_throttle.counter, "limit", LIMIT)
+    stale = [
+        make_code(expires_in=timedelta(hours=-1)).code,
+        make_code(status=VerificationCodeStatus.USED).code,
+        make_code(max_usage_count=1, current_usage_count=1).code,
+    ] * 2
+
+    for code in stale:
+        result = crud_verification_code.verify_code(db, code=code, employer_id=employer.id)
+        assert result != THROTTLED_RESPONSE
+    results = crud_verification_code.verify_codes(
+        db, codes=stale + [make_code().code], employer_id=employer.id
+    )
+
+    assert THROTTLED_RESPONSE not in results
+    assert results[-1].success
+
+
+def test_unknown_codes_throttle(db, employer, monkeypatch):
+    monkeypatch.setattr(verification_throttle.counter, "limit", LIMIT)
+    # Scores leak continuously, so the limit is only passed after one more
+    guesses = [render_verification_code(key) for key in random_code_values(LIMIT + 2)]
+
+    results = crud_verification_code.verify_codes(db, codes=guesses, employer_id=employer.id)
+
+    assert THROTTLED_RESPONSE not in results[:LIMIT]
+    assert results[-1] == THROTTLED_RESPONSE
@@ -0,0 +1,95 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.core.config import settings
+from app.crud import crud_verification_code
+from app.db.session import SessionLocal, engine
+from app.models.verification_code import VerificationCode, VerificationCodeStatus
+from app.schemas.verification_code import VerificationCodeCreate
+
+pytestmark = pytest.mark.skipif(
+    engine.dialect.name != "postgresql",
+    reason="needs concurrent writers: set DATABASE_URL to a PostgreSQL database",
+)
+
+USES = 10
+ATTEMPTS = 60
+THREADS = 12
+
+
+@pytest.mark.parametrize("shards", [0, 4])
+def test_concurrent_verifies_grant_exactly_max_usage_count(
+    db, make_code, employer, monkeypatch, shards
+):
+    monkeypatch.setattr(settings, "VERIFICATION_USAGE_SHARDS", shards)
+    monkeypatch.setattr(settings, "VERIFICATION_USAGE_SHARD_MIN_USES", 1)
+    owner = make_code()
+    code = crud_verification_code.create_with_employee(
+        db,
+        obj_in=VerificationCodeCreate(
+            purpose="test", max_usage_count=USES, employment_id=owner.employment_id,
+            expires_at=datetime.utcnow() + timedelta(hours=1)
+        ),
+        employee_id=owner.employee_id
+    )
+    assert code.usage_shards == shards
+
+    def verify(_):
+        session = SessionLocal()
+        try:
+            return crud_verification_code.verify_code(
+                session, code=code.code, employer_id=employer.id, ip_address="203.0.113.7"
+            ).success
+        finally:
+            session.close()
+
+    with ThreadPoolExecutor(max_workers=THREADS) as pool:
+        granted = sum(pool.map(verify, range(ATTEMPTS)))
+
+    crud_verification_code.reconcile_usage(db)
+    db.expire_all()
+    row = db.get(VerificationCode, code.id)
+    assert granted == USES
+    assert row.current_usage_count == USES
+    assert row.status == VerificationCodeStatus.USED
+
+
+def test_batches_and_single_verifies_share_a_sharded_code(
+    db, make_code, employer, monkeypatch
+):
+    monkeypatch.setattr(settings, "VERIFICATION_USAGE_SHARDS", 2)
+    monkeypatch.setattr(settings, "VERIFICATION_USAGE_SHARD_MIN_USES", 1)
+    owner = make_code()
+    code = crud_verification_code.create_with_employee(
+        db,
+        obj_in=VerificationCodeCreate(
+            purpose="test", max_usage_count=USES * 4, employment_id=owner.employment_id,
+            expires_at=datetime.utcnow() + timedelta(hours=1)
+        ),
+        employee_id=owner.employee_id
+    )
+
+    def verify(attempt):
+        # Batches lock the code row before its shards; single verifies take
+        # a shard, then insert their log, which references the code row
+        session = SessionLocal()
+        try:
+            if attempt % 3:
+                return int(crud_verification_code.verify_code(
+                    session, code=code.code, employer_id=employer.id
+                ).success)
+            return sum(result.success for result in crud_verification_code.verify_codes(
+                session, codes=[code.code] * 3, employer_id=employer.id
+            ))
+        finally:
+            session.close()
+
+    with ThreadPoolExecutor(max_workers=THREADS) as pool:
+        granted = sum(pool.map(verify, range(ATTEMPTS)))
+
+    crud_verification_code.reconcile_usage(db)
+    db.expire_all()
+    assert granted == USES * 4
+    assert db.get(VerificationCode, code.id).status == VerificationCodeStatus.USED
@@ -0,0 +1,58 @@
+from datetime import timedelta
+
+from sqlalchemy import event
+
+from app.crud import crud_verification_code
+from app.crud.crud_verification_code import THROTTLED_RESPONSE, verification_throttle
+from app.db.session import engine
+from app.models.verification_code import VerificationCodeStatus
+from app.utils.verification_codes import random_code_values, render_verification_code
+
+
+def codes_of_every_kind(make_code) -> list:
+    return [
+        # Well-formed, but no such code
+        render_verification_code(random_code_values(1)[0]),
+        make_code(expires_in=timedelta(hours=-1)).code,
+        make_code(status=VerificationCodeStatus.USED).code,
+        make_code(max_usage_count=2, current_usage_count=2).code,
+        make_code().code,
+        "not-a-code",
+    ]
+
+
+def answers(results) -> list:
+    return [(result.success, result.message) for result in results]
+
+
+def test_batch_answers_like_single_verifies(db, make_code, employer):
+    single = [
+        crud_verification_code.verify_code(db, code=code, employer_id=employer.id)
+        for code in codes_of_every_kind(make_code)
+    ]
+    batch = crud_verification_code.verify_codes(
+        db, codes=codes_of_every_kind(make_code), employer_id=employer.id
+    )
+
+    assert answers(batch) == answers(single)
+    assert [result.success for result in batch] == [False] * 4 + [True, False]
+
+
+def test_throttled_batch_runs_no_query(db, make_code, employer, monkeypatch):
+    codes = codes_of_every_kind(make_code)
+    monkeypatch.setattr(verification_throttle.counter, "limit", 1)
+    # Scores leak continuously, so go past the limit
+    for _ in range(2):
+        verification_throttle.record_failure(employer.id, "203.0.113.9")
+    statements = []
+    listener = lambda *args: statements.append(args[2])  # noqa: E731
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        results = crud_verification_code.verify_codes(
+            db, codes=codes, employer_id=employer.id, ip_address="203.0.113.9"
+        )
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+
+    assert results == [THROTTLED_RESPONSE] * len(codes)
+    assert statements == []